@@ -8,6 +8,18 @@ FRAMERATE = 1000//FPS
 
 AUTOTILE_FRAMES = 16
 
+# Number of worker processes used to plan the AI units' turns in parallel at the start of each AI phase
+# 0 to have each AI unit think on its own, one at a time
+AI_PLANNING_WORKERS = 0
+
+# Whether the AI should score attacks by following every way the combat could go,
+# rather than estimating from the hit, crit and damage of a single strike
+AI_EXACT_COMBAT_OUTCOMES = False
+
+# Whether to remember the result of each equation for a unit until the unit changes.
+# Only safe if none of the project's stat changes depend on other units
+MEMOIZE_EQUATIONS = False
+
 VERSION = "2025.09.14a"
 
 if __name__ == '__main__':
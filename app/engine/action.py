@@ -24,11 +24,16 @@ from app.engine import engine
 from app.utilities import utils, static_random
 from app.utilities.typing import Pos
 from app.engine.source_type import SourceType
+from app.engine.utils import ltcache
 
 def alters_game_state(func):
     @functools.wraps(func)
     def wrapper(*args, **kwargs):
-        func(*args, **kwargs)
+        ltcache.begin_mutation()
+        try:
+            func(*args, **kwargs)
+        finally:
+            ltcache.end_mutation()
         game.on_alter_game_state()
     return wrapper
 
@@ -125,6 +130,9 @@ def recalc_unit(unit):
     # Currently Equipped Item may have changed
     unit.autoequip()
     if unit.position and game.tilemap:
+        # Valid moves may have changed
+        if game.board:
+            game.board.reachability_cache.invalidate_unit(unit.nid)
         # Boundaries may have changed
         if game.boundary:
             game.boundary.recalculate_unit(unit)
@@ -515,6 +523,11 @@ class MarkActionGroupEnd(Action):
     def __init__(self, state: str):
         self.state = state
 
+    def do(self):
+        # Any ranges changed during the action group get recalculated together
+        if game.boundary:
+            game.boundary.flush()
+
 
 class ChangePhaseMusic(Action):
     def __init__(self, phase, music):
@@ -1592,12 +1605,14 @@ class AddItemComponent(Action):
         component.item = self.item
         if component.defines('init'):
             component.init(self.item)
+        self.item.reset_hook_index()
         self._did_add = True
 
     def reverse(self):
         if self._did_add:
             self.item.components.remove_key(self.component_nid)
             del self.item.__dict__[self.component_nid]
+            self.item.reset_hook_index()
             self._did_add = False
 
 class ModifyItemComponent(Action):
@@ -1650,6 +1665,7 @@ class RemoveItemComponent(Action):
             self.component_value = component.value
             self.item.components.remove_key(self.component_nid)
             del self.item.__dict__[self.component_nid]
+            self.item.reset_hook_index()
             self._did_remove = True
         else:
             logging.warning("remove_item_component: component with nid %s not found for item %s", self.component_nid, self.item)
@@ -1662,8 +1678,15 @@ class RemoveItemComponent(Action):
             self.item.__dict__[self.component_nid] = component
             # Assign parent to component
             component.item = self.item
+            self.item.reset_hook_index()
             self._did_remove = False
 
+def _reset_skill_owner(skill):
+    # The owner's skill hook index needs to know about the changed components
+    owner = game.get_unit(skill.owner_nid)
+    if owner:
+        owner.reset_skills_cache()
+
 class AddSkillComponent(Action):
     def __init__(self, skill, component_nid, component_value):
         self.skill = skill
@@ -1684,12 +1707,14 @@ class AddSkillComponent(Action):
         component.skill = self.skill
         if component.defines('init'):
             component.init(self.skill)
+        _reset_skill_owner(self.skill)
         self._did_add = True
 
     def reverse(self):
         if self._did_add:
             self.skill.components.remove_key(self.component_nid)
             del self.skill.__dict__[self.component_nid]
+            _reset_skill_owner(self.skill)
             self._did_add = False
 
 class ModifySkillComponent(Action):
@@ -1741,6 +1766,7 @@ class RemoveSkillComponent(Action):
             self.component_value = component.value
             self.skill.components.remove_key(self.component_nid)
             del self.skill.__dict__[self.component_nid]
+            _reset_skill_owner(self.skill)
             self._did_remove = True
         else:
             logging.warning("remove_skill_component: component with nid %s not found for skill %s", self.component_nid, self.skill)
@@ -1753,6 +1779,7 @@ class RemoveSkillComponent(Action):
             self.skill.__dict__[self.component_nid] = component
             # Assign parent to component
             component.skill = self.skill
+            _reset_skill_owner(self.skill)
             self._did_remove = False
 
 class SetObjData(Action):
@@ -2296,7 +2323,7 @@ class SetNid(Action):
             if orig_pos:
                 game.leave(self.unit)
             if self.unit.nid in game.unit_registry:
-                del game.unit_registry[self.unit.nid]
+                game.unregister_unit(self.unit)
             self.unit.nid = self.new_nid
             if game.initiative:
                 game.initiative.replace_unit_nid(self.old_nid, self.new_nid)
@@ -2310,7 +2337,7 @@ class SetNid(Action):
             if orig_pos:
                 game.leave(self.unit)
             if self.unit.nid in game.unit_registry:
-                del game.unit_registry[self.unit.nid]
+                game.unregister_unit(self.unit)
             self.unit.nid = self.old_nid
             if game.initiative:
                 game.initiative.replace_unit_nid(self.new_nid, self.old_nid)
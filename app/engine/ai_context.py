@@ -0,0 +1,140 @@
+"""
+Information about the units on the board that every AI behaviour asks for,
+gathered once and then shared by every AI unit in the phase.
+
+Without this, every PrimaryAI and SecondaryAI would rescan all the units on the
+map to find its targets and the positions of its enemies. Like ltcached, the
+context is thrown away whenever the game state changes, since any action can
+change who a unit targets (tags, factions, parties, teams, skills that alter
+allegiance). It is also thrown away whenever a unit leaves or arrives on the map,
+since units can move without an action, and is rebuilt the next time it is needed.
+"""
+from __future__ import annotations
+
+from typing import Dict, Hashable, List, Optional, Set, Tuple
+
+from app.engine import skill_system
+from app.engine.game_state import game
+from app.engine.objects.unit import UnitObject
+from app.engine.utils import ltcache
+from app.utilities.typing import Pos
+
+# Target specs whose value can be looked up directly on the unit
+SPEC_ATTRIBUTES = {
+    'Tag': None,  # Tags are a set, so they are handled separately
+    'Class': 'klass',
+    'Name': 'name',
+    'Faction': 'faction',
+    'Party': 'party',
+    'ID': 'nid',
+    'Team': 'team',
+}
+
+class AIContext():
+    def __init__(self):
+        # Whether an AI phase is going on, so the context can be kept around between units
+        self.active: bool = False
+        self.invalidate()
+
+    def start_phase(self):
+        self.active = True
+        self.invalidate()
+
+    def end_phase(self):
+        self.active = False
+        self.invalidate()
+
+    def invalidate(self):
+        self.built: bool = False
+        # The game state the context was built in
+        self.state = None
+        # Every unit on the map along with its position, in the same order as game.units
+        self.units_on_map: List[Tuple[UnitObject, Pos]] = []
+        # Key: (Target Spec, Value), Value: Positions of the units that match
+        self.positions_by_spec: Dict[Tuple[str, Hashable], Set[Pos]] = {}
+        # Positions with more than one unit on them
+        self.crowded_positions: Set[Pos] = set()
+        # Key: Who is asking, Value: Positions of their enemies or allies
+        self.enemy_positions: Dict[Hashable, List[Pos]] = {}
+        self.ally_positions: Dict[Hashable, List[Pos]] = {}
+
+    def build(self):
+        self.invalidate()
+        occupied = set()
+        for unit in game.units:
+            if not unit.position:
+                continue
+            pos = unit.position
+            self.units_on_map.append((unit, pos))
+            if pos in occupied:
+                self.crowded_positions.add(pos)
+            occupied.add(pos)
+            for tag in unit.tags:
+                self.positions_by_spec.setdefault(('Tag', tag), set()).add(pos)
+            for spec, attr in SPEC_ATTRIBUTES.items():
+                if attr:
+                    self.positions_by_spec.setdefault((spec, getattr(unit, attr)), set()).add(pos)
+        self.built = True
+        self.state = ltcache.get_state()
+
+    def _check(self):
+        if not self.built or self.state != ltcache.get_state():
+            self.build()
+
+    def get_all_positions(self) -> List[Pos]:
+        self._check()
+        return [pos for unit, pos in self.units_on_map]
+
+    def get_other_positions(self, unit: UnitObject) -> Set[Pos]:
+        """Positions of every unit on the map other than this one"""
+        self._check()
+        return {pos for other, pos in self.units_on_map if other is not unit}
+
+    def _get_key(self, unit: UnitObject, hook_name: str) -> Hashable:
+        # Units whose skills do not change who they consider enemies or allies
+        # only care about their team, so they can share the answer
+        if skill_system.get_hook_components(unit, hook_name):
+            return (unit.nid, )
+        return unit.team
+
+    def get_enemy_positions(self, unit: UnitObject) -> List[Pos]:
+        self._check()
+        key = self._get_key(unit, 'check_enemy')
+        if key not in self.enemy_positions:
+            self.enemy_positions[key] = \
+                [pos for other, pos in self.units_on_map if skill_system.check_enemy(unit, other)]
+        return self.enemy_positions[key]
+
+    def get_ally_positions(self, unit: UnitObject) -> List[Pos]:
+        self._check()
+        key = self._get_key(unit, 'check_ally')
+        if key not in self.ally_positions:
+            self.ally_positions[key] = \
+                [pos for other, pos in self.units_on_map if skill_system.check_ally(unit, other)]
+        return self.ally_positions[key]
+
+    def filter_by_spec(self, positions: List[Pos], target_spec: Optional[Tuple[str, Hashable]], invert: bool) -> List[Pos]:
+        """Keeps the positions that have a unit matching the target spec on them (or not matching, if inverted)"""
+        if not target_spec:
+            return positions
+        spec = target_spec[0]
+        if spec not in SPEC_ATTRIBUTES:
+            return positions
+        self._check()
+        matching = self.positions_by_spec.get((spec, target_spec[1]), set())
+        if not invert:
+            return [pos for pos in positions if pos in matching]
+        # A position with several units on it is kept if any one of them does not match
+        return [pos for pos in positions if pos not in matching or
+                (pos in self.crowded_positions and any(not self._matches(u, spec, target_spec[1]) for u in game.board.get_units(pos)))]
+
+    def _matches(self, unit: UnitObject, spec: str, value: Hashable) -> bool:
+        if spec == 'Tag':
+            return value in unit.tags
+        return getattr(unit, SPEC_ATTRIBUTES[spec]) == value
+
+def get_context() -> AIContext:
+    """The AI phase's shared context, or a throwaway one when not in an AI phase"""
+    if game.ai and game.ai.context.active:
+        return game.ai.context
+    return AIContext()
@@ -1,28 +1,35 @@
 import logging
-import functools
 import math
-from typing import List, Set
+from typing import Dict, List, NamedTuple, Set
 
-from app.constants import FRAMERATE
+from app.constants import AI_EXACT_COMBAT_OUTCOMES, FRAMERATE
 from app.data.database.database import DB
-from app.engine import (action, combat_calcs, engine, equations, evaluate,
-                        item_funcs, item_system, line_of_sight,
+from app.engine import (action, ai_context, ai_planner, combat_calcs, engine, equations,
+                        evaluate, item_funcs, item_system, line_of_sight,
                         skill_system)
-from app.engine.objects.unit import UnitObject
-from app.engine.pathfinding import pathfinding
-from app.engine.combat import interaction
+from app.engine.objects.unit import UnitObject, UnitSkill
+from app.engine.combat import interaction, outcome_solver
 from app.engine.game_state import game
 from app.engine.movement import movement_funcs
+from app.engine.utils import ltcache
 from app.events import triggers
 from app.events.regions import RegionType
 from app.utilities import utils
-from app.utilities.typing import Point, Pos
+from app.utilities.typing import NID, Point, Pos
 
+# What a sure kill is worth to the offense term of an attack. Anything short of a kill
+# is worth at most 1 per hit (all of the target's remaining hp), so a kill always
+# beats chipping damage, even with several attacks
+KILL_VALUE = 3
 
 class AIController():
     def __init__(self):
         # Controls whether we should be skipping through the AI's turns
         self.do_skip: bool = False
+        # Key: Unit nid, Value: What the unit planned to do at the start of the phase
+        self.plans: Dict[NID, ai_planner.AIPlan] = {}
+        # What every AI unit needs to know about the board this phase
+        self.context = ai_context.AIContext()
 
         self.reset()
 
@@ -54,6 +61,28 @@ class AIController():
         self.reset()
         self.unit = unit
 
+    def plan_units(self, units: List[UnitObject]):
+        self.plans = ai_planner.plan_units(units)
+
+    def use_plan(self, plan: ai_planner.AIPlan) -> bool:
+        if not plan.is_valid(self.unit):
+            logging.info("Board has changed since %s planned its turn", self.unit.nid)
+            return False
+        goal_item = plan.get_goal_item(self.unit)
+        if plan.goal_item_uid is not None and not goal_item:
+            return False
+        behaviours = DB.ai.get(self.unit.get_ai()).behaviours
+        if plan.behaviour_idx is None:
+            self.behaviour_idx, self.behaviour = 0, None
+        else:
+            self.behaviour_idx, self.behaviour = plan.behaviour_idx + 1, behaviours[plan.behaviour_idx]
+        self.goal_target = plan.goal_target
+        self.goal_position = plan.goal_position
+        self.goal_item = goal_item
+        self.did_something = plan.did_something
+        logging.info("Using plan for %s", self.unit.nid)
+        return True
+
     def is_done(self):
         return self.move_ai_complete and \
             self.attack_ai_complete and self.canto_ai_complete
@@ -188,7 +217,7 @@ class AIController():
 
     def canto_retreat(self):
         valid_positions = self.get_true_valid_moves()
-        enemy_positions = {u.position for u in game.units if u.position and skill_system.check_enemy(self.unit, u)}
+        enemy_positions = set(ai_context.get_context().get_enemy_positions(self.unit))
         self.goal_position = utils.farthest_away_pos(self.unit.position, valid_positions, enemy_positions)
 
     def smart_retreat(self) -> bool:
@@ -225,7 +254,7 @@ class AIController():
             return {self.unit.position}
         else:
             valid_moves = game.path_system.get_valid_moves(self.unit)
-            other_unit_positions = {unit.position for unit in game.units if unit.position and unit is not self.unit}
+            other_unit_positions = ai_context.get_context().get_other_positions(self.unit)
             valid_moves -= other_unit_positions
             return valid_moves
 
@@ -237,6 +266,10 @@ class AIController():
 
         logging.info("*** AI Thinking... ***")
 
+        plan = self.plans.pop(self.unit.nid, None)
+        if plan and self.state == 'Init' and self.use_plan(plan):
+            return True
+
         while True:
             # Can spend up to half a frame thinking
             over_time: bool = engine.get_true_time() - time >= FRAMERATE/2
@@ -347,12 +380,85 @@ class AIController():
     def build_secondary(self):
         return SecondaryAI(self.unit, self.behaviour)
 
+class CombatForecast(NamedTuple):
+    """The combat stats the default AI priority is computed from"""
+    raw_damage: int
+    crit_damage: int
+    hit: int
+    crit: int
+    target_damage: int
+    target_accuracy: int
+    num_attacks: int
+
+def get_active_conditional_skills(unit: UnitObject) -> tuple:
+    """The uids of the unit's skills that have a condition which currently holds"""
+    return tuple(skill.uid for skill in unit.skills
+                 if any(component.defines('condition') for component in skill.components)
+                 and skill_system.condition(skill, unit))
+
+class HypotheticalPosition():
+    """
+    Stands a unit at positions it is only considering moving to, so that combat_calcs,
+    the target system and skill hooks see it there.
+
+    Unlike QuickLeave/QuickArrive, this does not go through the action system
+    and never touches the board or the boundary. The skills the unit gets from the
+    terrain, status regions and auras at each position are worked out once and
+    remembered, so going back to a position is just a swap of the unit's skill list.
+    """
+    def __init__(self, unit: UnitObject):
+        self.unit: UnitObject = unit
+        self.orig_pos: Pos = unit.position
+        # Restored as is whenever the unit comes back to its original position
+        self.orig_skills: List[UnitSkill] = unit.get_skill_list()
+        # Key: Position, Value: Skills the unit gets from standing there
+        self.position_skills: Dict[Pos, List[UnitSkill]] = {}
+        if self.orig_pos:
+            game.leave(unit, test=True)
+            remaining = {id(s) for s in unit.get_skill_list()}
+            self.position_skills[self.orig_pos] = [s for s in self.orig_skills if id(s) not in remaining]
+            unit.position = self.orig_pos
+            unit.set_skill_list(self.orig_skills)
+
+    def move(self, pos: Pos):
+        unit = self.unit
+        old_position_skills = {id(s) for s in self.position_skills.get(unit.position, [])}
+        base_skills = [s for s in unit.get_skill_list() if id(s) not in old_position_skills]
+
+        if pos == self.orig_pos:
+            skills = self._get_orig_skill_list(base_skills)
+        else:
+            if pos not in self.position_skills:
+                unit.position = None
+                unit.set_skill_list(base_skills)
+                game.arrive(unit, pos, test=True)
+                # Arriving only ever appends skills
+                self.position_skills[pos] = unit.get_skill_list()[len(base_skills):]
+            skills = base_skills + self.position_skills[pos]
+
+        unit.position = pos
+        unit.set_skill_list(skills)
+        # Skill conditions are cached for the current game state and may depend on position
+        ltcache.alter_state()
+
+    def _get_orig_skill_list(self, base_skills: List[UnitSkill]) -> List[UnitSkill]:
+        """
+        The original skill list, in its original order. Skills the unit gained
+        somewhere else (such as from equipping an item) are kept at the end,
+        and skills it lost are left out
+        """
+        kept = {id(s) for s in base_skills} | {id(s) for s in self.position_skills[self.orig_pos]}
+        orig = {id(s) for s in self.orig_skills}
+        skills = [s for s in self.orig_skills if id(s) in kept]
+        return skills + [s for s in base_skills if id(s) not in orig]
+
 class PrimaryAI():
     def __init__(self, unit: UnitObject, valid_moves: Set[Pos], behaviour):
         self.max_tp = 0
 
         self.unit: UnitObject = unit
         self.orig_pos = self.unit.position
+        self.hypothetical = HypotheticalPosition(self.unit)
         self.orig_item = self.unit.items[0] if self.unit.items else None
         self.behaviour = behaviour
 
@@ -396,6 +502,11 @@ class PrimaryAI():
         self.best_position = None
         self.best_item = None
 
+        # Key: (Item, Target, Position signature), Value: Combat stats against that target
+        self.combat_forecasts: Dict[tuple, CombatForecast] = {}
+        # Key: Unit nid, Value: Whether the unit has any support pair that can give a bonus
+        self.support_partners: Dict[NID, bool] = {}
+
         self.item_setup()
 
     def item_setup(self):
@@ -429,8 +540,8 @@ class PrimaryAI():
             return []
 
     def quick_move(self, move):
-        action.QuickLeave(self.unit, True).do()
-        action.QuickArrive(self.unit, move, True).do()
+        if self.unit.position != move:
+            self.hypothetical.move(move)
 
     def run(self):
         if self.item_index >= len(self.items):
@@ -452,41 +563,32 @@ class PrimaryAI():
         else:
             target = self.valid_targets[self.target_index]
             item = self.items[self.item_index]
-            # If too many legal targets, just try for the best move first
-            # Otherwise it spends way too long trying every possible position to strike from
-            if len(self.valid_targets) > 10:
-                enemy_positions = {u.position for u in game.units if u.position and skill_system.check_enemy(self.unit, u)}
-                move = utils.farthest_away_pos(self.orig_pos, self.possible_moves, enemy_positions)
-                if not move:
-                    move = self.possible_moves[self.move_index]
-            else:
-                move = self.possible_moves[self.move_index]
-
-            if self.unit.position != move:
-                self.quick_move(move)
-
-            # Check line of sight
-            line_of_sight_flag = True
-            if DB.constants.value('line_of_sight') and not item_system.ignore_line_of_sight(self.unit, item):
-                item_range = item_funcs.get_range(self.unit, item)
-                if item_range:
-                    max_item_range = max(item_range)
-                    valid_targets = line_of_sight.line_of_sight([move], [target], max_item_range)
-                    if not valid_targets:
-                        line_of_sight_flag = False
-                else:
-                    line_of_sight_flag = False
-
-            if line_of_sight_flag:
-                self.determine_utility(move, target, item)
+            move = self.possible_moves[self.move_index]
+            self.score_move(target, item, move)
             self.move_index += 1
-            # If too many legal targets, do not bother with every possible move
-            if len(self.valid_targets) > 10:
-                self.move_index = len(self.possible_moves)
 
         # Not done yet
         return (False, self.best_target, self.best_position, self.best_item)
 
+    def score_move(self, target_pos, item, move):
+        if self.unit.position != move:
+            self.quick_move(move)
+
+        # Check line of sight
+        line_of_sight_flag = True
+        if DB.constants.value('line_of_sight') and not item_system.ignore_line_of_sight(self.unit, item):
+            item_range = item_funcs.get_range(self.unit, item)
+            if item_range:
+                max_item_range = max(item_range)
+                valid_targets = line_of_sight.line_of_sight([move], [target_pos], max_item_range)
+                if not valid_targets:
+                    line_of_sight_flag = False
+            else:
+                line_of_sight_flag = False
+
+        if line_of_sight_flag:
+            self.determine_utility(move, target_pos, item)
+
     def determine_utility(self, move, target_pos, item):
         tp = 0
         assert self.unit.position == move
@@ -556,38 +658,80 @@ class PrimaryAI():
                     tp -= ai_priority * ai_priority_multiplier
         return tp
 
+    def has_support_partners(self, unit) -> bool:
+        if unit.nid not in self.support_partners:
+            self.support_partners[unit.nid] = any(pair.unlocked_ranks for pair in game.supports.get_bonus_pairs(unit.nid))
+        return self.support_partners[unit.nid]
+
+    def get_position_signature(self, main_target, move) -> tuple:
+        """
+        Everything about standing at move that the combat forecast against main_target depends on:
+        the skills from terrain, status regions and auras there, which conditional skills are
+        active on either unit (conditions can depend on where the units stand), the distance
+        to the target, and which support partners would lend a bonus
+        """
+        position_skills = tuple(id(s) for s in self.hypothetical.position_skills[move])
+        active_skills = (get_active_conditional_skills(self.unit), get_active_conditional_skills(main_target))
+        distance = utils.calculate_distance(move, main_target.position)
+        # Units without any unlocked support pair never get a bonus, so there is no need to look for allies
+        support_allies = tuple(
+            tuple(ally.nid for ally in combat_calcs.get_support_rank_bonus(unit, target)[1])
+            for unit, target in ((self.unit, None), (self.unit, main_target), (main_target, self.unit))
+            if self.has_support_partners(unit))
+        return (position_skills, active_skills, distance, support_allies)
+
+    def get_combat_forecast(self, main_target, item, move) -> CombatForecast:
+        """
+        The combat stats against main_target are the same from every position with the same signature,
+        so they are only gathered once per signature
+        """
+        key = (item, main_target, self.get_position_signature(main_target, move))
+        if key in self.combat_forecasts:
+            return self.combat_forecasts[key]
+
+        target_weapon = main_target.get_weapon()
+        raw_damage = combat_calcs.compute_damage(self.unit, main_target, item, target_weapon, "attack", (0, 0))
+        crit_damage = combat_calcs.compute_damage(self.unit, main_target, item, target_weapon, "attack", (0, 0), crit=True)
+        hit_comp = combat_calcs.compute_hit(self.unit, main_target, item, target_weapon, "attack", (0, 0))
+        crit_comp = combat_calcs.compute_crit(self.unit, main_target, item, target_weapon, "attack", (0, 0))
+        target_damage = combat_calcs.compute_damage(main_target, self.unit, target_weapon, item, "defense", (0, 0))
+        target_accuracy = combat_calcs.compute_hit(main_target, self.unit, target_weapon, item, "defense", (0, 0))
+        num_attacks = combat_calcs.compute_attack_phases(self.unit, main_target, item, target_weapon, "attack", (0, 0))
+        num_attacks *= combat_calcs.compute_multiattacks(self.unit, main_target, item, "attack", (0, 0))
+
+        forecast = CombatForecast(raw_damage, crit_damage, hit_comp, crit_comp, target_damage, target_accuracy, num_attacks)
+        self.combat_forecasts[key] = forecast
+        return forecast
+
     def default_priority(self, main_target, item, move):
         # Default method
         terms = []
         offense_term = 0
         defense_term = 1
 
-        raw_damage = combat_calcs.compute_damage(self.unit, main_target, item, main_target.get_weapon(), "attack", (0, 0))
-        crit_damage = combat_calcs.compute_damage(self.unit, main_target, item, main_target.get_weapon(), "attack", (0, 0), crit=True)
+        forecast = self.get_combat_forecast(main_target, item, move)
 
         # Damage I do compared to target's current hp
-        lethality = utils.clamp(raw_damage / float(main_target.get_hp()), 0, 1)
-        crit_lethality = utils.clamp(crit_damage / float(main_target.get_hp()), 0, 1)
+        lethality = utils.clamp(forecast.raw_damage / float(main_target.get_hp()), 0, 1)
+        crit_lethality = utils.clamp(forecast.crit_damage / float(main_target.get_hp()), 0, 1)
         # Accuracy
-        hit_comp = combat_calcs.compute_hit(self.unit, main_target, item, main_target.get_weapon(), "attack", (0, 0))
-        if hit_comp:
-            accuracy = utils.clamp(hit_comp/100., 0, 1)
+        if forecast.hit:
+            accuracy = utils.clamp(forecast.hit/100., 0, 1)
         else:
             accuracy = 0
-        crit_comp = combat_calcs.compute_crit(self.unit, main_target, item, main_target.get_weapon(), "attack", (0, 0))
-        if crit_comp:
-            crit_accuracy = utils.clamp(crit_comp/100., 0, 1)
+        if forecast.crit:
+            crit_accuracy = utils.clamp(forecast.crit/100., 0, 1)
         else:
             crit_accuracy = 0
 
         # Determine if I would get countered
         # Even if I wouldn't get countered, check anyway how much damage I would take
         target_weapon = main_target.get_weapon()
-        target_damage = combat_calcs.compute_damage(main_target, self.unit, target_weapon, item, "defense", (0, 0))
+        target_damage = forecast.target_damage
         if not target_damage:
             target_damage = 0
         target_damage = utils.clamp(target_damage/main_target.get_hp(), 0, 1)
-        target_accuracy = combat_calcs.compute_hit(main_target, self.unit, target_weapon, item, "defense", (0, 0))
+        target_accuracy = forecast.target_accuracy
         if not target_accuracy:
             target_accuracy = 0
         target_accuracy = utils.clamp(target_accuracy/100., 0, 1)
@@ -596,18 +740,25 @@ class PrimaryAI():
             target_damage *= 0.3
             target_accuracy *= 0.3
 
-        num_attacks = combat_calcs.compute_attack_phases(self.unit, main_target, item, target_weapon, "attack", (0, 0))
-        num_attacks *= combat_calcs.compute_multiattacks(self.unit, main_target, item, "attack", (0, 0))
+        num_attacks = forecast.num_attacks
         first_strike = lethality * accuracy if lethality >= 1 else 0
 
         if num_attacks > 1 and target_damage >= 1:
             # Calculate chance I actually get to strike more than once
             num_attacks -= (target_accuracy * (1 - first_strike))
 
-        offense_term += 3 if lethality * accuracy >= 1 else lethality * accuracy * num_attacks
+        offense_term += KILL_VALUE if lethality * accuracy >= 1 else lethality * accuracy * num_attacks
         crit_term = (crit_lethality - lethality) * crit_accuracy * accuracy * num_attacks
         offense_term += crit_term
         defense_term -= target_damage * target_accuracy * (1 - first_strike)
+        if AI_EXACT_COMBAT_OUTCOMES:
+            outcome = outcome_solver.get_outcome(self.unit, item, main_target)
+            kill_chance = outcome.defender_death_chance
+            damage_dealt = utils.clamp(outcome.expected_damage_to_defender / main_target.get_hp(), 0, 1)
+            damage_taken = utils.clamp(outcome.expected_damage_to_attacker / self.unit.get_hp(), 0, 1)
+            # The same weighting as above, but with the exact chance of a kill
+            offense_term = KILL_VALUE * kill_chance + damage_dealt * (1 - kill_chance)
+            defense_term = 1 - damage_taken
         if offense_term <= 0:
             if accuracy <= 0 and DB.constants.value('attack_zero_hit'):
                 logging.info("Accuracy is bad, but continuing with stupid AI")
@@ -638,35 +789,16 @@ class PrimaryAI():
         return utils.process_terms(terms)
 
 def handle_unit_spec(all_targets, behaviour):
-    target_spec = behaviour.target_spec
-    if not target_spec:
-        return all_targets
-    invert = bool(behaviour.invert_targeting)
-    # Uses ^ (which is XOR) to handle inverting the targeting
-    if target_spec[0] == "Tag":
-        all_targets = [pos for pos in all_targets if any((target_spec[1] in u.tags) ^ invert for u in game.board.get_units(pos))]
-    elif target_spec[0] == "Class":
-        all_targets = [pos for pos in all_targets if any((u.klass == target_spec[1]) ^ invert for u in game.board.get_units(pos))]
-    elif target_spec[0] == "Name":
-        all_targets = [pos for pos in all_targets if any((u.name == target_spec[1]) ^ invert for u in game.board.get_units(pos))]
-    elif target_spec[0] == 'Faction':
-        all_targets = [pos for pos in all_targets if any((u.faction == target_spec[1]) ^ invert for u in game.board.get_units(pos))]
-    elif target_spec[0] == 'Party':
-        all_targets = [pos for pos in all_targets if any((u.party == target_spec[1]) ^ invert for u in game.board.get_units(pos))]
-    elif target_spec[0] == 'ID':
-        all_targets = [pos for pos in all_targets if any((u.nid == target_spec[1]) ^ invert for u in game.board.get_units(pos))]
-    elif target_spec[0] == 'Team':
-        all_targets = [pos for pos in all_targets if any((u.team == target_spec[1]) ^ invert for u in game.board.get_units(pos))]
-    return all_targets
+    return ai_context.get_context().filter_by_spec(all_targets, behaviour.target_spec, bool(behaviour.invert_targeting))
 
 def get_targets(unit, behaviour) -> List[Point]:
     all_targets = []
     if behaviour.target == 'Unit':
-        all_targets = [u.position for u in game.units if u.position]
+        all_targets = ai_context.get_context().get_all_positions()
     elif behaviour.target == 'Enemy':
-        all_targets = [u.position for u in game.units if u.position and skill_system.check_enemy(unit, u)]
+        all_targets = list(ai_context.get_context().get_enemy_positions(unit))
     elif behaviour.target == 'Ally':
-        all_targets = [u.position for u in game.units if u.position and skill_system.check_ally(unit, u)]
+        all_targets = list(ai_context.get_context().get_ally_positions(unit))
     elif behaviour.target == 'Event':
         target_spec = behaviour.target_spec
         for region in game.level.regions:
@@ -719,8 +851,8 @@ class SecondaryAI():
 
         movement_group = movement_funcs.get_movement_group(self.unit)
         self.grid = game.board.get_movement_grid(movement_group)
-        self.pathfinder = \
-            pathfinding.AStar(self.unit.position, None, self.grid)
+        # Paths to every target come from a single search, done the first time a path is needed
+        self.distance_field = None
 
         self.widen_flag = False  # Determines if we've widened our search
         self.reset()
@@ -785,7 +917,8 @@ class SecondaryAI():
         return False, None
 
     def get_path(self, goal_pos):
-        self.pathfinder.set_goal_pos(goal_pos)
+        if not self.distance_field:
+            self.distance_field = game.path_system.get_distance_field(self.unit)
 
         if self.behaviour.target == 'Event':
             adj_good_enough = False
@@ -797,14 +930,7 @@ class SecondaryAI():
             adj_good_enough = True
 
         limit = self.get_limit()
-        if skill_system.pass_through(self.unit):
-            can_move_through = lambda adj: True
-        else:
-            can_move_through = functools.partial(game.board.can_move_through, self.unit.team)
-        max_movement_limit = self.unit.get_movement()
-        path = self.pathfinder.process(can_move_through, adj_good_enough=adj_good_enough, limit=limit, max_movement_limit=max_movement_limit)
-        self.pathfinder.reset()
-        return path
+        return self.distance_field.get_path(goal_pos, adj_good_enough=adj_good_enough, limit=limit)
 
     def default_priority(self, enemy):
         hp_max = equations.parser.hitpoints(enemy)
@@ -0,0 +1,200 @@
+"""
+Plans the turns of many AI units at once in a pool of worker processes.
+
+The workers are spawned, not forked, so this works the same on every platform.
+Each worker loads the project once, headless. At the start of an AI phase, the
+game is saved into the same picklable dict a suspend save uses, and each worker
+restores its own copy of the game from that dict, thinks about its share of the
+units, and only sends back small picklable AIPlans. The plans are then used in
+the usual unit order. Since an earlier unit's turn can change the board, a plan
+is only used if nothing it could depend on has changed since; otherwise that
+unit just thinks again on the main process.
+
+Turned on by setting AI_PLANNING_WORKERS in app/constants.py
+"""
+from __future__ import annotations
+
+import atexit
+import logging
+import multiprocessing
+import os
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+from app.constants import AI_PLANNING_WORKERS
+from app.data.database.database import DB
+from app.engine import item_funcs, skill_system
+from app.engine.game_state import game
+from app.engine.objects.unit import UnitObject
+from app.utilities import utils
+from app.utilities.typing import NID, Pos
+
+def get_unit_state(unit: UnitObject) -> tuple:
+    """Everything about a unit that another unit's plan could depend on"""
+    return (unit.position, unit.get_hp(), unit.get_mana(), unit.team, unit.ai, unit.ai_group,
+            unit.faction, unit.party, unit.traveler, unit.dead, tuple(sorted(unit.tags)),
+            tuple(skill.uid for skill in unit.skills),
+            tuple((item.uid, item.data.get('uses'), item.data.get('c_uses')) for item in unit.items),
+            unit.equipped_weapon.uid if unit.equipped_weapon else None,
+            unit.equipped_accessory.uid if unit.equipped_accessory else None)
+
+@dataclass
+class BoardSnapshot():
+    # Key: Unit nid, Value: State of the unit
+    units: Dict[NID, tuple]
+    game_vars: dict
+    level_vars: dict
+    regions: list
+
+def take_snapshot() -> BoardSnapshot:
+    regions = [region.save() for region in game.level.regions] if game.level else []
+    return BoardSnapshot({unit.nid: get_unit_state(unit) for unit in game.units},
+                         dict(game.game_vars), dict(game.level_vars), regions)
+
+@dataclass
+class AIPlan():
+    unit_nid: NID
+    orig_pos: Pos
+    # Index of the behaviour the plan came from, or None if the unit ran out of behaviours
+    behaviour_idx: Optional[int]
+    goal_target: Optional[Pos]
+    goal_position: Optional[Pos]
+    goal_item_uid: Optional[int]
+    did_something: bool
+    # How far away a change to a unit could affect the plan, or None if any change anywhere could
+    reach: Optional[int]
+    # The board the plan was made on. Filled in by the main process
+    snapshot: Optional[BoardSnapshot] = field(default=None)
+
+    def is_valid(self, unit: UnitObject) -> bool:
+        """
+        Whether the plan can still be used. The planning unit itself, the game and level vars,
+        and the regions must not have changed at all. Other units may only have changed
+        outside of the plan's reach
+        """
+        if unit.nid != self.unit_nid or unit.position != self.orig_pos:
+            return False
+        current = take_snapshot()
+        if current.game_vars != self.snapshot.game_vars or current.level_vars != self.snapshot.level_vars or \
+                current.regions != self.snapshot.regions:
+            return False
+        if current.units.get(self.unit_nid) != self.snapshot.units.get(self.unit_nid):
+            return False
+        for nid in self.snapshot.units.keys() | current.units.keys():
+            if nid == self.unit_nid:
+                continue
+            old, new = self.snapshot.units.get(nid), current.units.get(nid)
+            if old == new:
+                continue
+            if self.reach is None:
+                return False
+            for state in (old, new):
+                if state and state[0] and utils.calculate_distance(state[0], self.orig_pos) <= self.reach:
+                    return False
+        return True
+
+    def get_goal_item(self, unit: UnitObject):
+        if self.goal_item_uid is None:
+            return None
+        items = item_funcs.get_all_items(unit) + list(skill_system.get_extra_abilities(unit).values())
+        for item in items:
+            if item.uid == self.goal_item_uid:
+                return item
+        return None
+
+def can_plan(unit: UnitObject) -> bool:
+    # AI groups change shared state when they trigger, so they must think in order
+    return not unit.ai_group and not DB.constants.value('initiative')
+
+def get_reach(unit: UnitObject) -> int:
+    return unit.get_movement() + item_funcs.get_max_range(unit) + 1
+
+def get_game_snapshot() -> dict:
+    """The game as a suspend save would store it, minus the turnwheel history, which the AI never looks at"""
+    from app.engine import turnwheel
+    s_dict, _ = game.save()
+    s_dict['action_log'] = turnwheel.ActionLog().save()
+    return s_dict
+
+def _init_worker(proj_dir: str):
+    """Runs once in each worker process. Loads the project the way the engine does on start up, but headless"""
+    os.environ['SDL_VIDEODRIVER'] = 'dummy'
+    os.environ['SDL_AUDIODRIVER'] = 'dummy'
+    from app.data.resources.resources import RESOURCES
+    from app.data.serialization.versions import CURRENT_SERIALIZATION_VERSION
+    from app.engine import driver
+    RESOURCES.load(proj_dir, CURRENT_SERIALIZATION_VERSION)
+    DB.load(proj_dir, CURRENT_SERIALIZATION_VERSION)
+    driver.start(DB.constants.value('title'))
+
+def _plan_unit(unit_nid: NID) -> Optional[AIPlan]:
+    from app.engine.ai_controller import AIController
+    unit = game.get_unit(unit_nid)
+    orig_pos = unit.position
+    try:
+        controller = AIController()
+        controller.load_unit(unit)
+        while not controller.think():
+            pass
+    except Exception as e:
+        logging.error("Could not plan for %s: %s", unit_nid, e)
+        return None
+    behaviours = DB.ai.get(unit.get_ai()).behaviours
+    behaviour_idx = behaviours.index(controller.behaviour) if controller.behaviour in behaviours else None
+    goal_item_uid = controller.goal_item.uid if controller.goal_item else None
+    # An attack only ever looked at targets within reach. Anything else,
+    # such as moving towards a far away target, could depend on the whole map
+    reach = get_reach(unit) if controller.goal_target else None
+    return AIPlan(unit_nid, orig_pos, behaviour_idx, controller.goal_target, controller.goal_position,
+                  goal_item_uid, controller.did_something, reach)
+
+def _plan_units(s_dict: dict, unit_nids: List[NID]) -> List[AIPlan]:
+    """Runs in a worker process, on its own copy of the game restored from the snapshot"""
+    from app.engine import save
+    game.build_new()
+    game.load(s_dict)
+    save.set_next_uids(game)
+    plans = [_plan_unit(unit_nid) for unit_nid in unit_nids]
+    return [plan for plan in plans if plan]
+
+_pool = None
+
+def _get_pool():
+    global _pool
+    if _pool is None:
+        context = multiprocessing.get_context('spawn')
+        _pool = context.Pool(AI_PLANNING_WORKERS, initializer=_init_worker, initargs=(str(DB.current_proj_dir),))
+        atexit.register(shutdown)
+    return _pool
+
+def shutdown():
+    global _pool
+    if _pool is not None:
+        # Let the workers exit on their own, since the display library
+        # may catch the signal that terminating the pool would send them
+        _pool.close()
+        _pool.join()
+        _pool = None
+
+def plan_units(units: List[UnitObject]) -> Dict[NID, AIPlan]:
+    """
+    Plans every unit that can be planned ahead of time in parallel.
+    Returns nothing if planning is turned off
+    """
+    unit_nids = [unit.nid for unit in units if can_plan(unit)]
+    if AI_PLANNING_WORKERS <= 0 or len(unit_nids) < 2:
+        return {}
+    snapshot = take_snapshot()
+    s_dict = get_game_snapshot()
+    num_workers = min(AI_PLANNING_WORKERS, len(unit_nids))
+    chunks = [unit_nids[i::num_workers] for i in range(num_workers)]
+    try:
+        results = _get_pool().starmap(_plan_units, [(s_dict, chunk) for chunk in chunks])
+    except Exception as e:
+        logging.error("Could not plan AI units in parallel: %s", e)
+        return {}
+    plans = {}
+    for plan in (plan for result in results for plan in result):
+        plan.snapshot = snapshot
+        plans[plan.unit_nid] = plan
+    return plans
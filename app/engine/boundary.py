@@ -1,6 +1,6 @@
 from app.engine.objects.unit import UnitObject
-from app.utilities.typing import Color3, NID, Point
-from typing import Dict, Tuple
+from app.utilities.typing import Color3, NID, Point, Pos
+from typing import Dict, FrozenSet, Set, Tuple
 from app.constants import TILEWIDTH, TILEHEIGHT
 
 from app.data.database.database import DB
@@ -30,7 +30,8 @@ class BoundaryInterface():
         # grid of sets. Each set contains the unit nids that are capable
         # of attacking that spot
         # The movement portion -- unit's have an area of influence
-        # If they move, they affect all other units in their area of influence
+        # This is every tile their movement flood fill reached or was stopped at
+        # If a unit arrives or leaves one of these tiles, the unit's valid moves may change
         self.grids = {'attack': self.init_grid(),
                       'spell': self.init_grid(),
                       'movement': self.init_grid()}
@@ -39,6 +40,12 @@ class BoundaryInterface():
         self.dictionaries = {'attack': {},
                              'spell': {},
                              'movement': {}}
+        # Key: Unit NID, Value: the valid moves the unit's attacks were computed from
+        self.valid_moves: Dict[NID, FrozenSet[Pos]] = {}
+        # Units whose ranges may have changed, but have not been recalculated yet
+        # Recalculated all at once, either at the end of the action group or
+        # the next time the boundary needs to be redrawn
+        self.pending_units: Set[NID] = set()
 
         self.draw_flag = False
         self.all_on_flag = False
@@ -110,6 +117,10 @@ class BoundaryInterface():
             for x in range(self.width):
                 for y in range(self.height):
                     self.grids[m][x * self.height + y].clear()
+            self.dictionaries[m].clear()
+        if not mode:
+            self.valid_moves.clear()
+            self.pending_units.clear()
         self.reset_surf()
         self.reset_fog_of_war()
 
@@ -129,8 +140,19 @@ class BoundaryInterface():
             del self.registered_auras[key]
         self.should_reset_aura_surf = True
 
-    def _add_unit(self, unit):
-        valid_moves = game.path_system.get_valid_moves(unit, force=True)
+    def _get_area_of_influence(self, valid_moves: Set[Pos]) -> Set[Pos]:
+        """The valid moves plus every tile the flood fill could have stepped onto next"""
+        area_of_influence = set(valid_moves)
+        for (x, y) in valid_moves:
+            area_of_influence.update(((x, y - 1), (x - 1, y), (x + 1, y), (x, y + 1)))
+        return {pos for pos in area_of_influence if game.board.check_bounds(pos)}
+
+    def _add_unit(self, unit, valid_moves: Set[Pos] = None):
+        if valid_moves is None:
+            valid_moves = game.path_system.get_valid_moves(unit, force=True)
+        self.valid_moves[unit.nid] = frozenset(valid_moves)
+        self._set(self._get_area_of_influence(valid_moves), 'movement', unit.nid)
+
         if DB.constants.value('zero_move') and unit.get_ai() and not game.ai_group_active(unit.ai_group):
             ai_prefab = DB.ai.get(unit.get_ai())
             guard = ai_prefab.guard_ai()
@@ -142,10 +164,6 @@ class BoundaryInterface():
         self._set(valid_attacks, 'attack', unit.nid)
         self._set(valid_spells, 'spell', unit.nid)
 
-        area_of_influence = game.target_system.find_manhattan_spheres(set(range(1, unit.get_movement() + 1)), *unit.position)
-        area_of_influence = {pos for pos in area_of_influence if game.board.check_bounds(pos)}
-        self._set(area_of_influence, 'movement', unit.nid)
-
         self.reset_surf()
 
     def _remove_unit(self, unit):
@@ -154,51 +172,62 @@ class BoundaryInterface():
                 for (x, y) in self.dictionaries[mode][unit.nid]:
                     grid[x * self.height + y].discard(unit.nid)
                 # del self.dictionaries[mode][unit.nid]
+        self.valid_moves.pop(unit.nid, None)
         self.reset_surf()
 
+    def _update_unit(self, unit):
+        """Only recalculates the unit's attack and spell ranges
+        if its valid moves actually changed"""
+        if not unit.position:
+            self._remove_unit(unit)
+            return
+        valid_moves = game.path_system.get_valid_moves(unit, force=True)
+        if self.valid_moves.get(unit.nid) == valid_moves:
+            return
+        self._remove_unit(unit)
+        self._add_unit(unit, valid_moves)
+
     def recalculate_unit(self, unit: UnitObject):
         if unit.team in self.enemy_teams:
+            self.pending_units.discard(unit.nid)
             self._remove_unit(unit)
             if unit.position:
                 self._add_unit(unit)
 
+    def _mark_affected_units(self, unit, pos: Pos):
+        """Other units whose flood fill reached this position may have
+        had their valid moves changed by this unit leaving or arriving"""
+        x, y = pos
+        for nid in self.grids['movement'][x * self.height + y]:
+            other_unit = game.get_unit(nid)
+            if other_unit and unit.team not in DB.teams.get_allies(other_unit.team):
+                self.pending_units.add(nid)
+        if self.pending_units:
+            self.reset_surf()
+
+    def flush(self):
+        """Recalculates the ranges of every unit whose range may have changed since the last flush"""
+        while self.pending_units:
+            unit = game.get_unit(self.pending_units.pop())
+            if unit:
+                self._update_unit(unit)
+
     def leave(self, unit):
         if unit.team in self.enemy_teams:
+            self.pending_units.discard(unit.nid)
             self._remove_unit(unit)
 
         # Update ranges of other units that might be affected by my leaving
         if unit.position:
-            x, y = unit.position
-            other_units = {game.get_unit(nid) for nid in self.grids['movement'][x * self.height + y]}
-            other_units = {other_unit for other_unit in other_units if unit.team not in DB.teams.get_allies(other_unit.team)}
-
-            # Set unit's position to non-existent for a brief momement
-            game.board.remove_unit(unit.position, unit)
-            unit.position = None
-            for other_unit in other_units:
-                self._remove_unit(other_unit)
-            for other_unit in other_units:
-                if other_unit.position:
-                    self._add_unit(other_unit)
-            unit.position = (x, y)  # Reset it back for future
-            game.board.set_unit(unit.position, unit)
+            self._mark_affected_units(unit, unit.position)
 
     def arrive(self, unit):
         if unit.position:
             if unit.team in self.enemy_teams:
-                self._add_unit(unit)
+                self.pending_units.add(unit.nid)
 
             # Update ranges of other units that might be affected by my arrival
-            x, y = unit.position
-            # print(self.grids['movement'][x * self.height + y])
-            other_units = {game.get_unit(nid) for nid in self.grids['movement'][x * self.height + y]}
-            other_units = {other_unit for other_unit in other_units if unit.team not in DB.teams.get_allies(other_unit.team)}
-
-            for other_unit in other_units:
-                self._remove_unit(other_unit)
-            for other_unit in other_units:
-                if other_unit.position:
-                    self._add_unit(other_unit)
+            self._mark_affected_units(unit, unit.position)
 
     # Called when map changes
     def reset(self):
@@ -252,6 +281,7 @@ class BoundaryInterface():
             return surf
 
         if self.should_reset_surf and not self.frozen:
+            self.flush()
             self.surf = None
             self.should_reset_surf = False
 
@@ -360,6 +390,7 @@ class BoundaryInterface():
         return surf
 
     def print_grid(self, mode):
+        self.flush()
         for y in range(self.height):
             print("%02d|" % y, end="")
             for x in range(self.width):
@@ -0,0 +1,264 @@
+"""
+Works out every way a combat could go without actually doing it.
+
+The OutcomeSolver steps through the same state machine as the CombatPhaseSolver,
+so brave weapons, multiattacks, vantage, desperation and strike partners all
+happen in the same order as they would in the real combat. But instead of rolling
+for each strike and doing the results, it follows every miss, hit, glancing hit and
+crit branch at once, keeping track of how likely each is and how much hp each side
+would have left afterwards.
+
+Only hp loss from the main weapons is followed. Proc skills, splash damage,
+lifelink, pair up guard and similar effects are not.
+"""
+from __future__ import annotations
+
+from collections import defaultdict
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from app.data.database.database import DB
+from app.data.database.difficulty_modes import RNGOption
+from app.engine import combat_calcs, skill_system
+from app.engine.combat.solver import CombatPhaseSolver, InitState
+from app.engine.combat.utils import resolve_weapon
+from app.engine.game_state import game
+from app.engine.objects.item import ItemObject
+from app.engine.objects.unit import UnitObject
+from app.engine.utils.ltcache import ltcached
+from app.utilities import utils
+from app.utilities.typing import Pos
+
+# No real combat has anywhere near this many strikes, so anything past it is stuck in a loop
+MAX_STRIKES = 64
+
+def _get_roll_table(num_dice: int) -> List[float]:
+    """Index: x, Value: Chance that the average of num_dice rolls from 0 - 99 is less than x"""
+    counts = [0] * 100
+    totals = {0: 1}
+    for _ in range(num_dice):
+        new_totals = defaultdict(int)
+        for total, count in totals.items():
+            for roll in range(100):
+                new_totals[total + roll] += count
+        totals = new_totals
+    for total, count in totals.items():
+        counts[total // num_dice] += count
+    table = [0.]
+    num_outcomes = 100 ** num_dice
+    for count in counts:
+        table.append(table[-1] + count / num_outcomes)
+    return table
+
+ROLL_TABLES = {1: _get_roll_table(1), 2: _get_roll_table(2), 3: _get_roll_table(3)}
+
+def chance_roll_below(x: float, num_dice: int = 1) -> float:
+    """Chance that a combat roll comes out less than x"""
+    if x <= 0:
+        return 0.
+    if x >= 100:
+        return 1.
+    return ROLL_TABLES[num_dice][int(x) if x == int(x) else int(x) + 1]
+
+class CombatOutcome(NamedTuple):
+    # Key: (Attacker's hp, Defender's hp) after combat, Value: Chance
+    hp_distribution: Dict[Tuple[int, int], float]
+    attacker_death_chance: float
+    defender_death_chance: float
+    expected_damage_to_attacker: float
+    expected_damage_to_defender: float
+
+class OutcomeSolver(CombatPhaseSolver):
+    def __init__(self, attacker: UnitObject, main_item: ItemObject, defender: UnitObject, def_item: Optional[ItemObject],
+                 total_rounds: int = 1):
+        super().__init__(attacker, main_item, [main_item], [defender], [[]],
+                         [defender.position], defender, def_item, total_rounds=total_rounds)
+        # What the hp and uses would be at this point in the branch being looked at
+        self.attacker_hp: int = attacker.get_hp()
+        self.defender_hp: int = defender.get_hp()
+        self.uses_left: Optional[int] = self._get_starting_uses()
+        self.can_use_item: bool = super().item_has_uses()
+
+    def _get_starting_uses(self) -> Optional[int]:
+        """Returns None if the item will not run out of uses partway through combat"""
+        item = self.main_item
+        if 'uses' not in item.data or not item.uses_options or item.uses_options.one_loss_per_combat():
+            return None
+        return item.data['uses']
+
+    def attacker_alive(self):
+        return self.attacker_hp > 0 or skill_system.ignore_dying_in_combat(self.attacker)
+
+    def defender_alive(self):
+        return self.defender_hp > 0 or skill_system.ignore_dying_in_combat(self.defender)
+
+    def item_has_uses(self):
+        return self.can_use_item and (self.uses_left is None or self.uses_left > 0)
+
+    def get_node(self) -> tuple:
+        return (self.state.name, self.state.num_multiattacks, self.num_attacks, self.num_defends,
+                self.num_subattacks, self.num_subdefends, self.num_rounds,
+                self.attacker_hp, self.defender_hp, self.uses_left)
+
+    def set_node(self, node: tuple):
+        name, num_multiattacks, self.num_attacks, self.num_defends, \
+            self.num_subattacks, self.num_subdefends, self.num_rounds, \
+            self.attacker_hp, self.defender_hp, self.uses_left = node
+        self.state = self.states[name]()
+        self.state.num_multiattacks = num_multiattacks
+
+    def get_strike(self) -> tuple:
+        """Returns who strikes whom with what in the current state, the same as the state's process does"""
+        name = self.state.name
+        if name == 'attacker':
+            return self.attacker, self.defender, self.main_item, resolve_weapon(self.defender), 'attack', self.get_attack_info(), False
+        elif name == 'attacker_partner':
+            partner = self.attacker.strike_partner
+            return partner, self.defender, partner.get_weapon(), resolve_weapon(self.defender), 'attack', self.get_attack_info(), True
+        elif name == 'defender':
+            return self.defender, self.attacker, self.def_item, self.main_item, 'defense', self.get_defense_info(), False
+        else:
+            partner = self.defender.strike_partner
+            return partner, self.attacker, partner.get_weapon(), self.main_item, 'defense', self.get_defense_info(), True
+
+    def get_strike_results(self) -> List[Tuple[float, int, bool]]:
+        """
+        Returns (Chance, Damage, Whether it hit) for every way the current strike can go.
+        Mirrors the rolls in CombatPhaseSolver.process
+        """
+        unit, target, item, def_item, mode, attack_info, assist = self.get_strike()
+        unclamped_hit = combat_calcs.compute_hit(unit, target, item, def_item, mode, attack_info, clamp_hit=False)
+        if unclamped_hit is None:
+            return [(1., 0, False)]
+        rng_mode = game.rng_mode
+        if rng_mode == RNGOption.FATES_HIT:
+            to_hit = self.calculate_fates_hit(utils.clamp(unclamped_hit, 0, 100))
+            unclamped_hit = self.calculate_fates_hit(unclamped_hit)
+        else:
+            to_hit = utils.clamp(unclamped_hit, 0, 100)
+        glancing_cutoff = unclamped_hit - DB.constants.value('glancing_hit')
+
+        if rng_mode == RNGOption.LUCKY:
+            hit_chance = 1. if self._lucky_roll(unit, target) < to_hit else 0.
+            glancing_chance = hit_chance if self._lucky_roll(unit, target) >= glancing_cutoff else 0.
+        elif rng_mode == RNGOption.GRANDMASTER:
+            hit_chance = 1. if to_hit > 0 else 0.
+            glancing_chance = hit_chance if glancing_cutoff <= 0 else 0.
+        else:
+            num_dice = {RNGOption.CLASSIC: 1, RNGOption.FATES_HIT: 1, RNGOption.TRUE_HIT_PLUS: 3}.get(rng_mode, 2)
+            hit_chance = chance_roll_below(to_hit, num_dice)
+            glancing_chance = max(0., hit_chance - chance_roll_below(glancing_cutoff, num_dice))
+
+        crit_chance = 0.
+        if DB.constants.value('crit') or skill_system.crit_anyway(unit):
+            to_crit = combat_calcs.compute_crit(unit, target, item, def_item, mode, attack_info)
+            if to_crit is not None:
+                if rng_mode == RNGOption.LUCKY:
+                    crit_chance = 1. if self._lucky_roll(unit, target) < to_crit else 0.
+                else:
+                    crit_chance = chance_roll_below(to_crit)
+
+        damage = self._get_damage(unit, target, item, def_item, mode, attack_info, assist, crit=False)
+        crit_damage = self._get_damage(unit, target, item, def_item, mode, attack_info, assist, crit=True)
+        results = [(1. - hit_chance, 0, False)]
+        results.append((hit_chance * crit_chance, crit_damage, True))
+        results.append((glancing_chance * (1. - crit_chance), damage // 2, True))
+        results.append(((hit_chance - glancing_chance) * (1. - crit_chance), damage, True))
+        return [result for result in results if result[0] > 0]
+
+    def _lucky_roll(self, unit: UnitObject, target: UnitObject) -> int:
+        if DB.teams.is_allied(unit.team, 'player') and not DB.teams.is_allied(target.team, 'player'):
+            return 0
+        elif DB.teams.is_allied(unit.team, 'player') or DB.teams.is_allied(target.team, 'player'):
+            return 99
+        return 0
+
+    def _get_damage(self, unit, target, item, def_item, mode, attack_info, assist: bool, crit: bool) -> int:
+        damage = combat_calcs.compute_damage(unit, target, item, def_item, mode, attack_info, crit=crit, assist=assist)
+        if damage is None:
+            return 0
+        if game.rng_mode == RNGOption.GRANDMASTER:
+            hit = utils.clamp(combat_calcs.compute_hit(unit, target, item, def_item, mode, attack_info), 0, 100)
+            damage = int(damage * float(hit) / 100)
+        return damage
+
+    def finish_strike(self, attack_info: tuple):
+        """Moves the strike counters along, the same as the state's process does"""
+        name = self.state.name
+        if name == 'attacker':
+            self.num_subattacks += 1
+            self.state.num_multiattacks = combat_calcs.compute_multiattacks(self.attacker, self.defender, self.main_item, 'attack', attack_info)
+            if self.num_subattacks >= self.state.num_multiattacks:
+                self.num_attacks += 1
+        elif name == 'attacker_partner':
+            partner = self.attacker.strike_partner
+            self.num_subattacks += 1
+            self.state.num_multiattacks = combat_calcs.compute_multiattacks(partner, self.defender, resolve_weapon(partner), 'attack', attack_info)
+        elif name == 'defender':
+            self.num_subdefends += 1
+            self.state.num_multiattacks = combat_calcs.compute_multiattacks(self.defender, self.attacker, self.def_item, 'defense', attack_info)
+            if self.num_subdefends >= self.state.num_multiattacks:
+                self.num_defends += 1
+        else:
+            partner = self.defender.strike_partner
+            self.num_subdefends += 1
+            self.state.num_multiattacks = combat_calcs.compute_multiattacks(partner, self.attacker, resolve_weapon(partner), 'defense', attack_info)
+
+    def solve(self) -> CombatOutcome:
+        start_attacker_hp, start_defender_hp = self.attacker_hp, self.defender_hp
+        final: Dict[Tuple[int, int], float] = defaultdict(float)
+
+        self.state = InitState()
+        self.setup_next_state()
+        if not self.state:
+            return self._make_outcome({(start_attacker_hp, start_defender_hp): 1.}, start_attacker_hp, start_defender_hp)
+        # Key: Everything about the combat so far that affects what happens next, Value: Chance
+        frontier: Dict[tuple, float] = {self.get_node(): 1.}
+        for _ in range(MAX_STRIKES):
+            if not frontier:
+                break
+            next_frontier: Dict[tuple, float] = defaultdict(float)
+            for node, chance in frontier.items():
+                self.set_node(node)
+                strike_results = self.get_strike_results()
+                for result_chance, damage, did_hit in strike_results:
+                    self.set_node(node)
+                    attack_info = self.get_attack_info() if self.state.name.startswith('attacker') else self.get_defense_info()
+                    if self.state.name.startswith('attacker'):
+                        self.defender_hp = max(0, self.defender_hp - damage)
+                    else:
+                        self.attacker_hp = max(0, self.attacker_hp - damage)
+                    if self.state.name == 'attacker' and self.uses_left is not None and \
+                            (did_hit or self.main_item.uses_options.lose_uses_on_miss()):
+                        self.uses_left -= 1
+                    self.finish_strike(attack_info)
+                    self.setup_next_state()
+                    if self.state:
+                        next_frontier[self.get_node()] += chance * result_chance
+                    else:
+                        final[(self.attacker_hp, self.defender_hp)] += chance * result_chance
+            frontier = next_frontier
+        # Stop following anything that somehow never ends
+        for node, chance in frontier.items():
+            final[(node[7], node[8])] += chance
+        return self._make_outcome(dict(final), start_attacker_hp, start_defender_hp)
+
+    def _make_outcome(self, hp_distribution: Dict[Tuple[int, int], float], start_attacker_hp: int, start_defender_hp: int) -> CombatOutcome:
+        attacker_death_chance = sum(chance for (attacker_hp, _), chance in hp_distribution.items() if attacker_hp <= 0)
+        defender_death_chance = sum(chance for (_, defender_hp), chance in hp_distribution.items() if defender_hp <= 0)
+        damage_to_attacker = sum((start_attacker_hp - attacker_hp) * chance for (attacker_hp, _), chance in hp_distribution.items())
+        damage_to_defender = sum((start_defender_hp - defender_hp) * chance for (_, defender_hp), chance in hp_distribution.items())
+        return CombatOutcome(hp_distribution, attacker_death_chance, defender_death_chance, damage_to_attacker, damage_to_defender)
+
+@ltcached
+def _get_outcome(attacker: UnitObject, main_item: ItemObject, defender: UnitObject, def_item: Optional[ItemObject],
+                 attacker_pos: Pos, defender_pos: Pos) -> CombatOutcome:
+    return OutcomeSolver(attacker, main_item, defender, def_item).solve()
+
+def get_outcome(attacker: UnitObject, main_item: ItemObject, defender: UnitObject, def_item: Optional[ItemObject] = None) -> CombatOutcome:
+    """
+    Every way a combat between attacker and defender could end, and how likely each is.
+    Remembered until the game state changes, for each pair of units, items and positions
+    """
+    if def_item is None:
+        def_item = resolve_weapon(defender)
+    return _get_outcome(attacker, main_item, defender, def_item, attacker.position, defender.position)
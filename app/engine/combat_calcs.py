@@ -1,3 +1,4 @@
+from functools import cached_property
 from typing import List, Optional, Tuple
 from app.engine.utils.ltcache import ltcached
 from app.engine.combat_calcs_utils import resolve_defensive_formula, resolve_offensive_formula
@@ -369,11 +370,89 @@ def defense_speed(unit, item, item_to_avoid=None):
 
     return speed
 
+class CombatStatSnapshot():
+    """
+    The stats of both sides of a combat between unit (using item) and target (using def_item)
+    that do not change from strike to strike. Each one is only computed the first time it is needed,
+    and the snapshot is shared by every compute_* call until the game state changes, so the forecast,
+    the combat solver and the AI do not have to rerun the same equations and hooks over and over
+    """
+    def __init__(self, unit, item, target, def_item):
+        self.unit = unit
+        self.item = item
+        self.target = target
+        self.def_item = def_item
+
+    @cached_property
+    def accuracy(self):
+        return accuracy(self.unit, self.item)
+
+    @cached_property
+    def crit_accuracy(self):
+        return crit_accuracy(self.unit, self.item)
+
+    @cached_property
+    def damage(self):
+        return damage(self.unit, self.item)
+
+    @cached_property
+    def attack_speed(self):
+        return attack_speed(self.unit, self.item)
+
+    @cached_property
+    def target_avoid(self):
+        return avoid(self.target, self.def_item, self.item)
+
+    @cached_property
+    def target_crit_avoid(self):
+        return crit_avoid(self.target, self.def_item, self.item)
+
+    @cached_property
+    def target_defense(self):
+        return defense(self.unit, self.target, self.def_item, self.item)
+
+    @cached_property
+    def target_defense_speed(self):
+        return defense_speed(self.target, self.def_item, self.item)
+
+    @cached_property
+    def unit_support_bonuses(self) -> list:
+        """Three Houses style support bonuses the unit gets when attacking the target"""
+        return get_support_rank_bonus(self.unit, self.target)[0]
+
+    @cached_property
+    def target_support_bonuses(self) -> list:
+        """Three Houses style support bonuses the target gets when the unit is counterattacking them"""
+        return get_support_rank_bonus(self.target, self.unit)[0]
+
+    @cached_property
+    def crit_multiplier(self):
+        equation = skill_system.critical_multiplier_formula(self.unit)
+        return equations.parser.get(equation, self.unit)
+
+    @cached_property
+    def crit_addition(self):
+        equation = skill_system.critical_addition_formula(self.unit)
+        crit_add = equations.parser.get(equation, self.unit)
+        crit_add += item_system.modify_crit_damage(self.unit, self.item)
+        crit_add += skill_system.modify_crit_damage(self.unit, self.item)
+        return crit_add
+
+    @cached_property
+    def thracia_crit_multiplier(self):
+        equation = skill_system.thracia_critical_multiplier_formula(self.unit)
+        return equations.parser.get(equation, self.unit)
+
+@ltcached
+def get_stat_snapshot(unit, item, target, def_item) -> CombatStatSnapshot:
+    return CombatStatSnapshot(unit, item, target, def_item)
+
 def compute_hit(unit, target, item, def_item, mode, attack_info, *, clamp_hit=True):
     if not item:
         return None
 
-    hit = accuracy(unit, item)
+    snapshot = get_stat_snapshot(unit, item, target, def_item)
+    hit = snapshot.accuracy
     if hit is None:
         return 10000
 
@@ -389,17 +468,15 @@ def compute_hit(unit, target, item, def_item, mode, attack_info, *, clamp_hit=Tr
     # Three Houses style support bonus (only works on attack)
     if mode in ('attack', 'splash'):
         # Attacker's accuracy bonus
-        support_rank_bonuses, support_allies = get_support_rank_bonus(unit, target)
-        for bonus in support_rank_bonuses:
+        for bonus in snapshot.unit_support_bonuses:
             hit += float(bonus.accuracy)
     if mode == 'defense':
         # Attacker's avoid bonus
-        support_rank_bonuses, support_allies = get_support_rank_bonus(target, unit)
-        for bonus in support_rank_bonuses:
+        for bonus in snapshot.target_support_bonuses:
             hit -= float(bonus.avoid)
     hit = int(hit)
 
-    hit -= avoid(target, def_item, item)
+    hit -= snapshot.target_avoid
 
     hit += skill_system.dynamic_accuracy(unit, item, target, resolve_weapon(target), mode, attack_info, hit)
     hit -= skill_system.dynamic_avoid(target, resolve_weapon(target), unit, item, mode, attack_info, hit)
@@ -413,7 +490,8 @@ def compute_crit(unit, target, item, def_item, mode, attack_info):
     if not item:
         return None
 
-    crit = crit_accuracy(unit, item)
+    snapshot = get_stat_snapshot(unit, item, target, def_item)
+    crit = snapshot.crit_accuracy
     if crit is None:
         return None
 
@@ -429,17 +507,15 @@ def compute_crit(unit, target, item, def_item, mode, attack_info):
     # Three Houses style support bonus (only works on attack)
     if mode in ('attack', 'splash'):
         # Attacker's crit bonus
-        support_rank_bonuses, support_allies = get_support_rank_bonus(unit, target)
-        for bonus in support_rank_bonuses:
+        for bonus in snapshot.unit_support_bonuses:
             crit += float(bonus.crit)
     if mode == 'defense':
         # Attacker's dodge bonus
-        support_rank_bonuses, support_allies = get_support_rank_bonus(target, unit)
-        for bonus in support_rank_bonuses:
+        for bonus in snapshot.target_support_bonuses:
             crit -= float(bonus.dodge)
     crit = int(crit)
 
-    crit -= crit_avoid(target, def_item, item)
+    crit -= snapshot.target_crit_avoid
 
     crit += skill_system.dynamic_crit_accuracy(unit, item, target, resolve_weapon(target), mode, attack_info, crit)
     crit -= skill_system.dynamic_crit_avoid(target, resolve_weapon(target), unit, item, mode, attack_info, crit)
@@ -453,7 +529,8 @@ def compute_damage(unit, target, item, def_item, mode, attack_info, crit=False,
     if not item:
         return None
 
-    might = damage(unit, item)
+    snapshot = get_stat_snapshot(unit, item, target, def_item)
+    might = snapshot.damage
     if might is None:
         return None
 
@@ -470,19 +547,17 @@ def compute_damage(unit, target, item, def_item, mode, attack_info, crit=False,
     # Three Houses style support bonus (only works on attack)
     if mode in ('attack', 'splash'):
         # Attacker's damage bonus
-        support_rank_bonuses, support_allies = get_support_rank_bonus(unit, target)
-        for bonus in support_rank_bonuses:
+        for bonus in snapshot.unit_support_bonuses:
             might += float(bonus.damage)
     if mode == 'defense':
         # Attacker's resist bonus
-        support_rank_bonuses, support_allies = get_support_rank_bonus(target, unit)
-        for bonus in support_rank_bonuses:
+        for bonus in snapshot.target_support_bonuses:
             might -= float(bonus.resist)
     might = int(might)
 
     total_might = might
 
-    might -= defense(unit, target, def_item, item)
+    might -= snapshot.target_defense
     might -= skill_system.dynamic_resist(target, resolve_weapon(target), unit, item, mode, attack_info, might)
 
     if assist:
@@ -493,20 +568,13 @@ def compute_damage(unit, target, item, def_item, mode, attack_info, crit=False,
 
     if crit or skill_system.crit_anyway(unit):
         # Multiply Damage
-        equation = skill_system.critical_multiplier_formula(unit)
-        crit_mult = equations.parser.get(equation, unit)
-        might *= crit_mult
+        might *= snapshot.crit_multiplier
 
         # Add damage
-        equation = skill_system.critical_addition_formula(unit)
-        crit_add = equations.parser.get(equation, unit)
-        crit_add += item_system.modify_crit_damage(unit, item)
-        crit_add += skill_system.modify_crit_damage(unit, item)
-        might += crit_add
+        might += snapshot.crit_addition
 
         # Thracia Crit
-        equation = skill_system.thracia_critical_multiplier_formula(unit)
-        thracia_crit = equations.parser.get(equation, unit)
+        thracia_crit = snapshot.thracia_crit_multiplier
         if thracia_crit:
             might += total_might * thracia_crit
 
@@ -519,7 +587,8 @@ def compute_assist_damage(unit, target, item, def_item, mode, attack_info, crit=
     return compute_damage(unit, target, item, def_item, mode, attack_info, crit, assist=True)
 
 def compute_true_speed(unit, target, item, def_item, mode, attack_info) -> int:
-    speed = attack_speed(unit, item)
+    snapshot = get_stat_snapshot(unit, item, target, def_item)
+    speed = snapshot.attack_speed
 
     # Handles things like effective damage
     speed += item_system.dynamic_attack_speed(unit, item, target, resolve_weapon(target), mode, attack_info, speed)
@@ -533,17 +602,15 @@ def compute_true_speed(unit, target, item, def_item, mode, attack_info) -> int:
     # Three Houses style support bonus (only works on attack)
     if mode in ('attack', 'splash'):
         # Attacker's attack_speed bonus
-        support_rank_bonuses, support_allies = get_support_rank_bonus(unit, target)
-        for bonus in support_rank_bonuses:
+        for bonus in snapshot.unit_support_bonuses:
             speed += float(bonus.attack_speed)
     if mode == 'defense':
         # Attacker's defense_speed bonus
-        support_rank_bonuses, support_allies = get_support_rank_bonus(target, unit)
-        for bonus in support_rank_bonuses:
+        for bonus in snapshot.target_support_bonuses:
             speed -= float(bonus.defense_speed)
     speed = int(speed)
 
-    speed -= defense_speed(target, def_item, item)
+    speed -= snapshot.target_defense_speed
 
     speed += skill_system.dynamic_attack_speed(unit, item, target, resolve_weapon(target), mode, attack_info, speed)
     speed -= skill_system.dynamic_defense_speed(target, resolve_weapon(target), unit, item, mode, attack_info, speed)
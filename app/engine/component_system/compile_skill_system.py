@@ -8,10 +8,10 @@ SKILL_HOOKS: Dict[str, HookInfo] = {
     'available':                            HookInfo(['unit', 'item'], ResolvePolicy.ALL_DEFAULT_TRUE),
     'can_counter':                          HookInfo(['unit'], ResolvePolicy.ALL_DEFAULT_TRUE),
     # false priority (set to False if result is False in any component, False if not defined)
-    'pass_through':                         HookInfo(['unit'], ResolvePolicy.ALL_DEFAULT_FALSE),
+    'pass_through':                         HookInfo(['unit'], ResolvePolicy.ALL_DEFAULT_FALSE, is_pure=True),
     'vantage':                              HookInfo(['unit'], ResolvePolicy.ALL_DEFAULT_FALSE),
     'desperation':                          HookInfo(['unit'], ResolvePolicy.ALL_DEFAULT_FALSE),
-    'ignore_terrain':                       HookInfo(['unit'], ResolvePolicy.ALL_DEFAULT_FALSE),
+    'ignore_terrain':                       HookInfo(['unit'], ResolvePolicy.ALL_DEFAULT_FALSE, is_pure=True),
     'ignore_terrain_traversal':             HookInfo(['unit', 'effect'], ResolvePolicy.ALL_DEFAULT_FALSE),
     'crit_anyway':                          HookInfo(['unit'], ResolvePolicy.ALL_DEFAULT_FALSE),
     'ignore_region_status':                 HookInfo(['unit'], ResolvePolicy.ALL_DEFAULT_FALSE),
@@ -21,8 +21,8 @@ SKILL_HOOKS: Dict[str, HookInfo] = {
     'ignore_forced_movement':               HookInfo(['unit'], ResolvePolicy.ALL_DEFAULT_FALSE),
     'distant_counter':                      HookInfo(['unit'], ResolvePolicy.ALL_DEFAULT_FALSE),
     'ignore_fatigue':                       HookInfo(['unit'], ResolvePolicy.ALL_DEFAULT_FALSE),
-    'no_attack_after_move':                 HookInfo(['unit'], ResolvePolicy.ALL_DEFAULT_FALSE),
-    'has_dynamic_range':                    HookInfo(['unit'], ResolvePolicy.ALL_DEFAULT_FALSE),
+    'no_attack_after_move':                 HookInfo(['unit'], ResolvePolicy.ALL_DEFAULT_FALSE, is_pure=True),
+    'has_dynamic_range':                    HookInfo(['unit'], ResolvePolicy.ALL_DEFAULT_FALSE, is_pure=True),
     'disvantage':                           HookInfo(['unit'], ResolvePolicy.ALL_DEFAULT_FALSE),
     'close_counter':                        HookInfo(['unit'], ResolvePolicy.ALL_DEFAULT_FALSE),
     'attack_stance_double':                 HookInfo(['unit'], ResolvePolicy.ALL_DEFAULT_FALSE),
@@ -38,17 +38,17 @@ SKILL_HOOKS: Dict[str, HookInfo] = {
     'alternate_splash':                     HookInfo(['unit'], ResolvePolicy.UNIQUE),
     'change_map_palette':                   HookInfo(['unit'], ResolvePolicy.UNIQUE),
     # exclusive (returns last component value, has default value if not defined)
-    'can_select':                           HookInfo(['unit'], ResolvePolicy.UNIQUE, has_default_value=True),
-    'movement_type':                        HookInfo(['unit'], ResolvePolicy.UNIQUE, has_default_value=True),
-    'num_items_offset':                     HookInfo(['unit'], ResolvePolicy.UNIQUE, has_default_value=True),
-    'num_accessories_offset':               HookInfo(['unit'], ResolvePolicy.UNIQUE, has_default_value=True),
+    'can_select':                           HookInfo(['unit'], ResolvePolicy.UNIQUE, has_default_value=True, is_pure=True),
+    'movement_type':                        HookInfo(['unit'], ResolvePolicy.UNIQUE, has_default_value=True, is_pure=True),
+    'num_items_offset':                     HookInfo(['unit'], ResolvePolicy.UNIQUE, has_default_value=True, is_pure=True),
+    'num_accessories_offset':               HookInfo(['unit'], ResolvePolicy.UNIQUE, has_default_value=True, is_pure=True),
     'change_variant':                       HookInfo(['unit'], ResolvePolicy.UNIQUE, has_default_value=True),
     'change_animation':                     HookInfo(['unit'], ResolvePolicy.UNIQUE, has_default_value=True),
     'change_ai':                            HookInfo(['unit'], ResolvePolicy.UNIQUE, has_default_value=True),
     'change_roam_ai':                       HookInfo(['unit'], ResolvePolicy.UNIQUE, has_default_value=True),
     'witch_warp':                           HookInfo(['unit'], ResolvePolicy.UNIQUE, has_default_value=True, is_cached=True),
     # numeric accum (adds together all values. 0 if no values are defined)
-    'sight_range':                          HookInfo(['unit'], ResolvePolicy.NUMERIC_ACCUM, has_default_value=True),
+    'sight_range':                          HookInfo(['unit'], ResolvePolicy.NUMERIC_ACCUM, has_default_value=True, is_pure=True),
     'xcom_movement':                        HookInfo(['unit'], ResolvePolicy.NUMERIC_ACCUM, has_default_value=True),
     # formula (as exclusive)
     'damage_formula':                       HookInfo(['unit'], ResolvePolicy.UNIQUE),
@@ -76,8 +76,8 @@ SKILL_HOOKS: Dict[str, HookInfo] = {
     'modify_sell_price':                    HookInfo(['unit', 'item'], ResolvePolicy.UNIQUE, has_default_value=True),
     'limit_maximum_range':                  HookInfo(['unit', 'item'], ResolvePolicy.UNIQUE, has_default_value=True),
     # targeted (as exclusive)
-    'check_ally':                           HookInfo(['unit', 'target'], ResolvePolicy.UNIQUE, has_default_value=True),
-    'check_enemy':                          HookInfo(['unit', 'target'], ResolvePolicy.UNIQUE, has_default_value=True),
+    'check_ally':                           HookInfo(['unit', 'target'], ResolvePolicy.UNIQUE, has_default_value=True, is_pure=True),
+    'check_enemy':                          HookInfo(['unit', 'target'], ResolvePolicy.UNIQUE, has_default_value=True, is_pure=True),
     'can_trade':                            HookInfo(['unit', 'target'], ResolvePolicy.UNIQUE, has_default_value=True),
     'exp_multiplier':                       HookInfo(['unit', 'target'], ResolvePolicy.UNIQUE, has_default_value=True),
     'enemy_exp_multiplier':                 HookInfo(['unit', 'target'], ResolvePolicy.UNIQUE, has_default_value=True),
@@ -162,37 +162,43 @@ def generate_skill_hook_str(hook_name: str, hook_info: HookInfo):
 
     conditional_check = "condition(skill, unit)" if 'item' not in args else 'condition(skill, unit, item)'
     default_handling = "return result"
-    unconditional_handling = ""
     cache_handling = ""
     if hook_info.has_default_value:
         default_handling = "return result if values else Defaults.{hook_name}({args})".format(hook_name=hook_name, args=', '.join(args))
-    if hook_info.has_unconditional:
-        unconditional_handling = """
-            if component.defines('{hook_name}_unconditional'):
-                values.append(component.{hook_name}_unconditional({args}))
-""".format(hook_name=hook_name, args=', '.join(args))
     if hook_info.is_cached:
         cache_handling = """
 @ltcached"""
+    elif hook_info.is_pure:
+        cache_handling = """
+@hook_cached"""
+
+    # Only iterate over the components that define the hook, using the unit's hook index
+    if hook_info.has_unconditional:
+        component_loop = """
+    for skill, component in get_hook_components(unit, '{hook_name}', '{hook_name}_unconditional'):
+        if component.defines('{hook_name}'):
+            if component.ignore_conditional or {conditional_check}:
+                values.append(component.{hook_name}({args}))
+        if component.defines('{hook_name}_unconditional'):
+            values.append(component.{hook_name}_unconditional({args}))
+""".format(hook_name=hook_name, conditional_check=conditional_check, args=', '.join(args))
+    else:
+        component_loop = """
+    for skill, component in get_hook_components(unit, '{hook_name}'):
+        if component.ignore_conditional or {conditional_check}:
+            values.append(component.{hook_name}({args}))
+""".format(hook_name=hook_name, conditional_check=conditional_check, args=', '.join(args))
 
     func_text = """{cache_handling}
 def {hook_name}({func_signature}):
-    values = []
-    for skill in unit.skills[:]:
-        for component in skill.components:
-            if component.defines('{hook_name}'):
-                if component.ignore_conditional or {conditional_check}:
-                    values.append(component.{hook_name}({args}))
-{unconditional_handling}
+    values = []{component_loop}
     result = utils.{policy_resolution}(values)
     {default_handling}
 """.format(hook_name=hook_name,
            func_signature=', '.join(func_signature),
-           conditional_check=conditional_check,
-           args=', '.join(args),
+           component_loop=component_loop,
            policy_resolution=hook_info.policy.value,
            default_handling=default_handling,
-           unconditional_handling=unconditional_handling,
            cache_handling=cache_handling)
 
     return func_text
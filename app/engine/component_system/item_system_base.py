@@ -5,10 +5,10 @@ from typing import TYPE_CHECKING, List, Optional, Set, Tuple, Any, Callable
 import app.engine.combat.playback as pb
 
 from app.engine.component_system import utils
-from app.engine.utils.ltcache import ltcached
+from app.engine.objects.item import ItemObject
+from app.engine.utils.ltcache import hook_cached, ltcached
 
 if TYPE_CHECKING:
-    from app.engine.objects.item import ItemObject
     from app.engine.objects.unit import UnitObject
     from app.engine.info_menu.multi_desc_utils import RawPages
 
@@ -97,6 +97,30 @@ def get_all_components(unit: UnitObject, item: ItemObject) -> list:
     all_components = [c for c in item.components] + override_components
     return all_components
 
+def get_item_hook_components(item: ItemObject, hook_name: str) -> list:
+    """
+    Returns the item's own components that define the hook, using the item's hook index
+    """
+    if isinstance(item, ItemObject):
+        return item.get_hook_components(hook_name)
+    return [component for component in item.components if component.defines(hook_name)]
+
+def get_hook_components(unit: UnitObject, item: ItemObject, hook_name: str) -> list:
+    """
+    Same as the components from get_all_components that define the hook, in the same order.
+    Only the item override components from the unit's skills need to be checked each time
+    """
+    from app.engine import skill_system
+    override_components = skill_system.item_override(unit, item)
+    if override_components:
+        override_components = [component for component in override_components if component.defines(hook_name)]
+    if not item:
+        return override_components
+    hook_components = get_item_hook_components(item, hook_name)
+    if override_components:
+        return hook_components + override_components
+    return hook_components
+
 @ltcached
 def get_multi_desc(item, unit) -> list[RawPages]:
     all_descs: list[RawPages] = []
@@ -109,146 +133,115 @@ def available(unit: UnitObject, item: ItemObject) -> bool:
     """
     If any hook reports false, then it is false
     """
-    all_components = get_all_components(unit, item)
-    for component in all_components:
-        if component.defines('available'):
-            if not component.available(unit, item):
-                return False
+    for component in get_hook_components(unit, item, 'available'):
+        if not component.available(unit, item):
+            return False
     if item.parent_item:
-        for component in item.parent_item.components:
-            if component.defines('available'):
-                if not component.available(unit, item.parent_item):
-                    return False
+        for component in get_item_hook_components(item.parent_item, 'available'):
+            if not component.available(unit, item.parent_item):
+                return False
     return True
 
 def exp(playback: List[pb.PlaybackBrush], unit: UnitObject, item: ItemObject):
-    all_components = get_all_components(unit, item)
     val = 0
-    for component in all_components:
-        if component.defines('exp'):
-            val += component.exp(playback, unit, item)
+    for component in get_hook_components(unit, item, 'exp'):
+        val += component.exp(playback, unit, item)
     return val
 
 def stat_change(unit: UnitObject, item: ItemObject, stat_nid) -> int:
     bonus = 0
-    all_components = get_all_components(unit, item)
-    for component in all_components:
-        if component.defines('stat_change'):
-            d = component.stat_change(unit)
-            bonus += d.get(stat_nid, 0)
+    for component in get_hook_components(unit, item, 'stat_change'):
+        d = component.stat_change(unit)
+        bonus += d.get(stat_nid, 0)
     return bonus
 
 def stat_change_contribution(unit: UnitObject, item: ItemObject, stat_nid) -> list:
     contribution = {}
-    all_components = get_all_components(unit, item)
-    for component in all_components:
-        if component.defines('stat_change'):
-            d = component.stat_change(unit)
-            val = d.get(stat_nid, 0)
-            if val != 0:
-                if item.name in contribution:
-                    contribution[item.name] += val
-                else:
-                    contribution[item.name] = val
+    for component in get_hook_components(unit, item, 'stat_change'):
+        d = component.stat_change(unit)
+        val = d.get(stat_nid, 0)
+        if val != 0:
+            if item.name in contribution:
+                contribution[item.name] += val
+            else:
+                contribution[item.name] = val
     return contribution
 
 def is_broken(unit: UnitObject, item: ItemObject) -> bool:
     """
     If any hook reports true, then it is true
     """
-    all_components = get_all_components(unit, item)
-    for component in all_components:
-        if component.defines('is_broken'):
-            if component.is_broken(unit, item):
-                return True
+    for component in get_hook_components(unit, item, 'is_broken'):
+        if component.is_broken(unit, item):
+            return True
     if item.parent_item:
-        for component in item.parent_item.components:
-            if component.defines('is_broken'):
-                if component.is_broken(unit, item.parent_item):
-                    return True
+        for component in get_item_hook_components(item.parent_item, 'is_broken'):
+            if component.is_broken(unit, item.parent_item):
+                return True
     return False
 
 def on_broken(unit: UnitObject, item: ItemObject):
-    all_components = get_all_components(unit, item)
-    for component in all_components:
-        if component.defines('on_broken'):
-            component.on_broken(unit, item)
+    for component in get_hook_components(unit, item, 'on_broken'):
+        component.on_broken(unit, item)
     if item.parent_item:
-        for component in item.parent_item.components:
-            if component.defines('on_broken'):
-                component.on_broken(unit, item.parent_item)
+        for component in get_item_hook_components(item.parent_item, 'on_broken'):
+            component.on_broken(unit, item.parent_item)
 
 def is_unusable(unit: UnitObject, item: ItemObject) -> bool:
     """
     If any hook reports true, then it is true
     """
-    all_components = get_all_components(unit, item)
-    for component in all_components:
-        if component.defines('is_unusable'):
-            if component.is_unusable(unit, item):
-                return True
+    for component in get_hook_components(unit, item, 'is_unusable'):
+        if component.is_unusable(unit, item):
+            return True
     if item.parent_item:
-        for component in item.parent_item.components:
-            if component.defines('is_unusable'):
-                if component.is_unusable(unit, item.parent_item):
-                    return True
+        for component in get_item_hook_components(item.parent_item, 'is_unusable'):
+            if component.is_unusable(unit, item.parent_item):
+                return True
     return False
 
 def on_unusable(unit: UnitObject, item: ItemObject):
-    all_components = get_all_components(unit, item)
-    for component in all_components:
-        if component.defines('on_unusable'):
-            component.on_unusable(unit, item)
+    for component in get_hook_components(unit, item, 'on_unusable'):
+        component.on_unusable(unit, item)
     if item.parent_item:
-        for component in item.parent_item.components:
-            if component.defines('on_unusable'):
-                component.on_unusable(unit, item.parent_item)
+        for component in get_item_hook_components(item.parent_item, 'on_unusable'):
+            component.on_unusable(unit, item.parent_item)
 
 def valid_targets(unit: UnitObject, item: ItemObject) -> set:
     targets = set()
-    all_components = get_all_components(unit, item)
-    for component in all_components:
-        if component.defines('valid_targets'):
-            targets |= component.valid_targets(unit, item)
+    for component in get_hook_components(unit, item, 'valid_targets'):
+        targets |= component.valid_targets(unit, item)
     return targets
 
 def target_restrict(unit: UnitObject, item: ItemObject, def_pos, splash) -> bool:
-    all_components = get_all_components(unit, item)
-    for component in all_components:
-        if component.defines('target_restrict'):
-            if not component.target_restrict(unit, item, def_pos, splash):
-                return False
+    for component in get_hook_components(unit, item, 'target_restrict'):
+        if not component.target_restrict(unit, item, def_pos, splash):
+            return False
     return True
 
 def range_restrict(unit: UnitObject, item: ItemObject) -> Tuple[Set, bool]:
     restricted_range = set()
     any_defined = False
-    all_components = get_all_components(unit, item)
-    for component in all_components:
-        if component.defines('range_restrict'):
-            any_defined = True
-            restricted_range |= component.range_restrict(unit, item)
+    for component in get_hook_components(unit, item, 'range_restrict'):
+        any_defined = True
+        restricted_range |= component.range_restrict(unit, item)
     if any_defined:
         return restricted_range
     else:
         return None
 
 def item_restrict(unit: UnitObject, item: ItemObject, defender, def_item: ItemObject) -> bool:
-    all_components = get_all_components(unit, item)
-    for component in all_components:
-        if component.defines('item_restrict'):
-            if not component.item_restrict(unit, item, defender, def_item):
-                return False
+    for component in get_hook_components(unit, item, 'item_restrict'):
+        if not component.item_restrict(unit, item, defender, def_item):
+            return False
     return True
 
 def ai_priority(unit: UnitObject, item: ItemObject, target: UnitObject, move) -> float:
     custom_ai_flag: bool = False
     ai_priority = 0
-    all_components = get_all_components(unit, item)
-    for component in all_components:
-        if component.defines('ai_priority'):
-            custom_ai_flag = True
-            ai_priority += component.ai_priority(unit, item, target, move)
+    for component in get_hook_components(unit, item, 'ai_priority'):
+        custom_ai_flag = True
+        ai_priority += component.ai_priority(unit, item, target, move)
     if custom_ai_flag:
         return ai_priority
     else:
@@ -261,12 +254,10 @@ def splash(unit: UnitObject, item: ItemObject, position) -> tuple:
     """
     main_target = []
     splash = []
-    all_components = get_all_components(unit, item)
-    for component in all_components:
-        if component.defines('splash'):
-            new_target, new_splash = component.splash(unit, item, position)
-            main_target.append(new_target)
-            splash += new_splash
+    for component in get_hook_components(unit, item, 'splash'):
+        new_target, new_splash = component.splash(unit, item, position)
+        main_target.append(new_target)
+        splash += new_splash
     # Handle having multiple main targets
     if len(main_target) > 1:
         splash += main_target
@@ -290,10 +281,8 @@ def splash(unit: UnitObject, item: ItemObject, position) -> tuple:
 
 def splash_positions(unit: UnitObject, item: ItemObject, position) -> set:
     positions = set()
-    all_components = get_all_components(unit, item)
-    for component in all_components:
-        if component.defines('splash_positions'):
-            positions |= component.splash_positions(unit, item, position)
+    for component in get_hook_components(unit, item, 'splash_positions'):
+        positions |= component.splash_positions(unit, item, position)
     # DEFAULT
     if not positions:
         from app.engine import skill_system
@@ -314,24 +303,18 @@ def find_hp(actions, target):
     return starting_hp
 
 def after_strike(actions, playback: List[pb.PlaybackBrush], unit: UnitObject, item: ItemObject, target: UnitObject, item2: ItemObject, mode, attack_info, strike):
-    all_components = get_all_components(unit, item)
-    for component in all_components:
-        if component.defines('after_strike'):
-            component.after_strike(actions, playback, unit, item, target, item2, mode, attack_info, strike)
+    for component in get_hook_components(unit, item, 'after_strike'):
+        component.after_strike(actions, playback, unit, item, target, item2, mode, attack_info, strike)
     if item.parent_item:
-        for component in item.parent_item.components:
-            if component.defines('after_strike'):
-                component.after_strike(actions, playback, unit, item.parent_item, target, mode, attack_info, strike)
+        for component in get_item_hook_components(item.parent_item, 'after_strike'):
+            component.after_strike(actions, playback, unit, item.parent_item, target, mode, attack_info, strike)
 
 def on_hit(actions, playback: List[pb.PlaybackBrush], unit: UnitObject, item: ItemObject, target: UnitObject, item2: ItemObject, target_pos, mode, attack_info, first_item: ItemObject):
-    all_components = get_all_components(unit, item)
-    for component in all_components:
-        if component.defines('on_hit'):
-            component.on_hit(actions, playback, unit, item, target, item2, target_pos, mode, attack_info)
+    for component in get_hook_components(unit, item, 'on_hit'):
+        component.on_hit(actions, playback, unit, item, target, item2, target_pos, mode, attack_info)
     if item.parent_item and first_item:
-        for component in item.parent_item.components:
-            if component.defines('on_hit'):
-                component.on_hit(actions, playback, unit, item.parent_item, target, item2, target_pos, mode, attack_info)
+        for component in get_item_hook_components(item.parent_item, 'on_hit'):
+            component.on_hit(actions, playback, unit, item.parent_item, target, item2, target_pos, mode, attack_info)
 
     # Default playback
     if target and find_hp(actions, target) <= target.get_hp(): # only trigger these brushes if damage was net dealt
@@ -399,32 +382,25 @@ def on_glancing_hit(actions, playback: List[pb.PlaybackBrush], unit: UnitObject,
             playback.append(pb.UnitTintAdd(target, (255, 255, 255)))
 
 def on_miss(actions, playback: List[pb.PlaybackBrush], unit: UnitObject, item: ItemObject, target: UnitObject, item2: ItemObject, target_pos, mode, attack_info, first_item: ItemObject):
-    all_components = get_all_components(unit, item)
-    for component in all_components:
-        if component.defines('on_miss'):
-            component.on_miss(actions, playback, unit, item, target, item2, target_pos, mode, attack_info)
+    for component in get_hook_components(unit, item, 'on_miss'):
+        component.on_miss(actions, playback, unit, item, target, item2, target_pos, mode, attack_info)
     if item.parent_item and first_item:
-        for component in item.parent_item.components:
-            if component.defines('on_miss'):
-                component.on_miss(actions, playback, unit, item.parent_item, target, item2, target_pos, mode, attack_info)
+        for component in get_item_hook_components(item.parent_item, 'on_miss'):
+            component.on_miss(actions, playback, unit, item.parent_item, target, item2, target_pos, mode, attack_info)
 
     # Default playback
     playback.append(pb.HitSound('Attack Miss 2'))
     playback.append(pb.HitAnim('MapMiss', target))
 
 def item_icon_mod(unit: UnitObject, item: ItemObject, target: UnitObject, item2: ItemObject, sprite):
-    all_components = get_all_components(unit, item)
-    for component in all_components:
-        if component.defines('item_icon_mod'):
-            sprite = component.item_icon_mod(unit, item, target, item2, sprite)
+    for component in get_hook_components(unit, item, 'item_icon_mod'):
+        sprite = component.item_icon_mod(unit, item, target, item2, sprite)
     return sprite
 
 def can_unlock(unit: UnitObject, item: ItemObject, region) -> bool:
-    all_components = get_all_components(unit, item)
-    for component in all_components:
-        if component.defines('can_unlock'):
-            if component.can_unlock(unit, item, region):
-                return True
+    for component in get_hook_components(unit, item, 'can_unlock'):
+        if component.can_unlock(unit, item, region):
+            return True
     return False
 
 def init(item: ItemObject):
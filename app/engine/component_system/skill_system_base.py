@@ -1,16 +1,17 @@
 from __future__ import annotations
 
 from collections import defaultdict
-from typing import TYPE_CHECKING, Callable, Optional
+from typing import TYPE_CHECKING, Callable, Dict, List, Optional, Tuple
 
 from app.engine.component_system import utils
-from app.engine.utils.ltcache import ltcached
+from app.engine.utils.ltcache import hook_cached, ltcached
 
 if TYPE_CHECKING:
     from app.engine.objects.item import ItemObject
     from app.engine.objects.unit import UnitObject
     from app.engine.objects.skill import SkillObject
     from app.data.database.components import ComponentType
+    from app.data.database.skill_components import SkillComponent
     from app.engine.info_menu.multi_desc_utils import RawPages
 
 class Defaults():
@@ -174,6 +175,44 @@ class Defaults():
     def thracia_critical_multiplier_formula(unit) -> str:
         return 'THRACIA_CRIT'
 
+class SkillList(list):
+    """
+    The list of skills returned by `UnitObject.skills`.
+
+    Also remembers which of its skills' components define each hook,
+    so a hook only has to look at the components that actually define it.
+    The unit clears or replaces this list whenever its skills change,
+    which throws away the index along with it.
+    """
+    def __init__(self, skills=()):
+        super().__init__(skills)
+        self.hook_index: Dict[Tuple[str, ...], List[Tuple[SkillObject, SkillComponent]]] = {}
+
+    def clear(self):
+        super().clear()
+        self.hook_index.clear()
+
+    def get_hook_components(self, hook_names: Tuple[str, ...]) -> List[Tuple[SkillObject, SkillComponent]]:
+        hook_components = self.hook_index.get(hook_names)
+        if hook_components is None:
+            hook_components = find_hook_components(self, hook_names)
+            self.hook_index[hook_names] = hook_components
+        return hook_components
+
+def find_hook_components(skills: List[SkillObject], hook_names: Tuple[str, ...]) -> List[Tuple[SkillObject, SkillComponent]]:
+    return [(skill, component) for skill in skills for component in skill.components
+            if any(component.defines(hook_name) for hook_name in hook_names)]
+
+def get_hook_components(unit, *hook_names: str) -> List[Tuple[SkillObject, SkillComponent]]:
+    """
+    Returns every (skill, component) pair among the unit's skills where the component
+    defines at least one of the hook names, in the same order as the unit's skills
+    """
+    skills = unit.skills
+    if isinstance(skills, SkillList):
+        return skills.get_hook_components(hook_names)
+    return find_hook_components(skills, hook_names)
+
 @ltcached
 def condition(skill, unit: UnitObject, item=None) -> bool:
     # print('Checking condition for', skill, unit, item)
@@ -193,84 +232,71 @@ def hidden(skill, unit) -> bool:
 
 def stat_change(unit, stat_nid) -> int:
     bonus = 0
-    for skill in unit.skills:
-        for component in skill.components:
-            if component.defines('stat_change'):
-                d = component.stat_change(unit)
-                d_bonus = d.get(stat_nid, 0)
-                if d_bonus == 0:
-                    continue
-                # Why did we write the component condition check after the evaluation of the bonus?
-                # Was there a good reason?
-                if component.ignore_conditional or condition(skill, unit):
-                    bonus += d_bonus
+    for skill, component in get_hook_components(unit, 'stat_change'):
+        d = component.stat_change(unit)
+        d_bonus = d.get(stat_nid, 0)
+        if d_bonus == 0:
+            continue
+        # Why did we write the component condition check after the evaluation of the bonus?
+        # Was there a good reason?
+        if component.ignore_conditional or condition(skill, unit):
+            bonus += d_bonus
     return bonus
 
 def subtle_stat_change(unit, stat_nid) -> int:
     bonus = 0
-    for skill in unit.skills:
-        for component in skill.components:
-            if component.defines('subtle_stat_change'):
-                d = component.subtle_stat_change(unit)
-                d_bonus = d.get(stat_nid, 0)
-                if d_bonus == 0:
-                    continue
-                if component.ignore_conditional or condition(skill, unit):
-                    bonus += d_bonus
+    for skill, component in get_hook_components(unit, 'subtle_stat_change'):
+        d = component.subtle_stat_change(unit)
+        d_bonus = d.get(stat_nid, 0)
+        if d_bonus == 0:
+            continue
+        if component.ignore_conditional or condition(skill, unit):
+            bonus += d_bonus
     return bonus
 
 def stat_change_contribution(unit, stat_nid) -> dict:
     contribution = {}
-    for skill in unit.skills:
-        for component in skill.components:
-            if component.defines('stat_change') and not component.defines('subtle_stat_change'):
-                if component.ignore_conditional or condition(skill, unit):
-                    d = component.stat_change(unit)
-                    val = d.get(stat_nid, 0)
-                    if val != 0:
-                        if skill.name in contribution:
-                            contribution[skill.name] += val
-                        else:
-                            contribution[skill.name] = val
+    for skill, component in get_hook_components(unit, 'stat_change'):
+        if not component.defines('subtle_stat_change'):
+            if component.ignore_conditional or condition(skill, unit):
+                d = component.stat_change(unit)
+                val = d.get(stat_nid, 0)
+                if val != 0:
+                    if skill.name in contribution:
+                        contribution[skill.name] += val
+                    else:
+                        contribution[skill.name] = val
     return contribution
 
 def growth_change(unit, stat_nid) -> int:
     bonus = 0
-    for skill in unit.skills:
-        for component in skill.components:
-            if component.defines('growth_change'):
-                if component.ignore_conditional or condition(skill, unit):
-                    d = component.growth_change(unit)
-                    bonus += d.get(stat_nid, 0)
+    for skill, component in get_hook_components(unit, 'growth_change'):
+        if component.ignore_conditional or condition(skill, unit):
+            d = component.growth_change(unit)
+            bonus += d.get(stat_nid, 0)
     return bonus
 
 def unit_sprite_flicker_tint(unit) -> list:
     flicker = []
-    for skill in unit.skills:
-        for component in skill.components:
-            if component.defines('unit_sprite_flicker_tint'):
-                if component.ignore_conditional or condition(skill, unit):
-                    d = component.unit_sprite_flicker_tint(unit, skill)
-                    flicker.append(d)
+    for skill, component in get_hook_components(unit, 'unit_sprite_flicker_tint'):
+        if component.ignore_conditional or condition(skill, unit):
+            d = component.unit_sprite_flicker_tint(unit, skill)
+            flicker.append(d)
     return flicker
 
 def should_draw_anim(unit) -> list:
     avail = []
-    for skill in unit.skills:
-        for component in skill.components:
-            if component.defines('should_draw_anim'):
-                if component.ignore_conditional or condition(skill, unit):
-                    d = component.should_draw_anim(unit, skill)
-                    avail.append(d)
+    for skill, component in get_hook_components(unit, 'should_draw_anim'):
+        if component.ignore_conditional or condition(skill, unit):
+            d = component.should_draw_anim(unit, skill)
+            avail.append(d)
     return avail
 
 def additional_tags(unit) -> set:
     new_tags = set()
-    for skill in unit.skills:
-        for component in skill.components:
-            if component.defines('additional_tags'):
-                if component.ignore_conditional or condition(skill, unit):
-                    new_tags = new_tags | set(component.additional_tags(unit, skill))
+    for skill, component in get_hook_components(unit, 'additional_tags'):
+        if component.ignore_conditional or condition(skill, unit):
+            new_tags = new_tags | set(component.additional_tags(unit, skill))
     return new_tags
 
 def before_crit(actions, playback, attacker, item, defender, item2, mode, attack_info) -> bool:
@@ -446,11 +472,9 @@ def get_extra_abilities(unit: UnitObject, categorized: bool = False):
 
 def ai_priority_multiplier(unit) -> float:
     ai_priority_multiplier = 1
-    for skill in unit.skills:
-        for component in skill.components:
-            if component.defines('ai_priority_multiplier'):
-                if component.ignore_conditional or condition(skill, unit):
-                    ai_priority_multiplier *= component.ai_priority_multiplier(unit)
+    for skill, component in get_hook_components(unit, 'ai_priority_multiplier'):
+        if component.ignore_conditional or condition(skill, unit):
+            ai_priority_multiplier *= component.ai_priority_multiplier(unit)
     return ai_priority_multiplier
 
 def get_combat_arts(unit: UnitObject, categorized: bool = False):
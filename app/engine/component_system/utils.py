@@ -38,6 +38,8 @@ class HookInfo():
     has_unconditional: bool = False
     inherits_parent: bool = False
     is_cached: bool = False
+    # Result only depends on the units and items passed in, so it is cached until one of them changes
+    is_pure: bool = False
 
 
 """
@@ -1,6 +1,26 @@
 import re, functools
+from typing import Callable, Dict, List, Set
 
+from app.constants import MEMOIZE_EQUATIONS
 from app.data.database.database import DB
+from app.engine.utils.ltcache import clear_hook_cache, hook_cached
+from app.utilities.typing import NID
+
+class StatValues(dict):
+    """
+    The stats of a unit used while evaluating an equation.
+    Each stat (base + bonus) is only looked up the first time it is used, and then shared
+    with every sub equation, so each stat bonus is computed at most once per evaluation
+    """
+    __slots__ = ['unit']
+
+    def __init__(self, unit):
+        super().__init__()
+        self.unit = unit
+
+    def __missing__(self, stat_nid: NID) -> int:
+        value = self[stat_nid] = self.unit.stats[stat_nid] + self.unit.stat_bonus(stat_nid)
+        return value
 
 class Parser():
     def __init__(self):
@@ -9,54 +29,89 @@ class Parser():
             if equation.expression:
                 self.equations[equation.nid] = self.tokenize(equation.expression)
 
+        self.stat_nids: Set[NID] = {stat.nid for stat in DB.stats}
+        # Key: Equation nid, Value: Stats and equations the equation uses directly
+        self.dependencies: Dict[NID, Set[NID]] = \
+            {nid: {token for token in tokens if token in self.stat_nids or token in self.equations}
+             for nid, tokens in self.equations.items()}
+        # Key: Equation nid, Value: Every stat the equation uses, including through sub equations
+        self.stat_dependencies: Dict[NID, Set[NID]] = \
+            {nid: self.get_stat_dependencies(nid) for nid in self.equations}
         self.replacement_dict = self.create_replacement_dict()
+        # Key: One-off expression, Value: The expression compiled to a function
+        self.expressions: Dict[str, Callable] = {}
 
-        for nid in list(self.equations.keys()):
+        self.equations['__StatValues'] = StatValues
+        for nid in list(self.dependencies.keys()):
             expression = self.equations[nid]
             self.fix(nid, expression, self.replacement_dict)
 
         # Now add these equations as local functions
-        for nid in self.equations.keys():
+        for nid in self.dependencies.keys():
             if not nid.startswith('__'):
-                setattr(self, nid.lower(), functools.partial(self.equations[nid], self.equations))
+                setattr(self, nid.lower(), functools.partial(self.get, nid))
 
-    def tokenize(self, s: str) -> str:
+    def tokenize(self, s: str) -> List[str]:
         return re.split('([^a-zA-Z_])', s)
 
+    def get_stat_dependencies(self, nid: NID) -> Set[NID]:
+        stats = set()
+        seen = set()
+        to_check = [nid]
+        # Circular equations are still caught when they are evaluated
+        while to_check:
+            current = to_check.pop()
+            if current in seen:
+                continue
+            seen.add(current)
+            for dependency in self.dependencies.get(current, ()):
+                if dependency in self.equations:
+                    to_check.append(dependency)
+                else:
+                    stats.add(dependency)
+        return stats
+
     def create_replacement_dict(self):
         dic = {}
         for stat in DB.stats:
-            dic[stat.nid] = ("(unit.stats['%s'] + unit.stat_bonus('%s'))" % (stat.nid, stat.nid))
+            dic[stat.nid] = ("stats['%s']" % stat.nid)
         for nid in self.equations.keys():
-            dic[nid] = ("equations['%s'](equations, unit)" % nid)
+            dic[nid] = ("equations['%s'](equations, unit, stats)" % nid)
         return dic
 
-    def fix(self, lhs, rhs, dic):
-        rhs = [dic.get(n, n) for n in rhs]
+    def _compile(self, name: str, tokens: List[str], dic: Dict[str, str], uses_stats: bool) -> Callable:
+        rhs = [dic.get(n, n) for n in tokens]
         rhs = ''.join(rhs)
         if 'float' in rhs:
             pass  # Don't need to convert if you are turning it into a float
         else:
             rhs = 'int(%s)' % rhs
-        exec("def %s(equations, unit): return %s" % (lhs, rhs), self.equations)
+        lines = ["def %s(equations, unit, stats=None):" % name]
+        if uses_stats:
+            lines.append("    if stats is None:")
+            lines.append("        stats = __StatValues(unit)")
+        lines.append("    return %s" % rhs)
+        local_namespace = {}
+        exec('\n'.join(lines), self.equations, local_namespace)
+        return local_namespace[name]
+
+    def fix(self, lhs, rhs, dic):
+        self.equations[lhs] = self._compile(lhs, rhs, dic, bool(self.stat_dependencies[lhs]))
 
     def get(self, lhs, unit):
         if lhs in self.equations:
+            if MEMOIZE_EQUATIONS:
+                return _get_memoized(lhs, unit)
             return self.equations[lhs](self.equations, unit)
         return 0
 
     def get_expression(self, expr, unit):
         # For one time use
-        # Can't seem to be used with any sub equations
-        expr = self.tokenize(expr)
-        expr = [self.replacement_dict.get(n, n) for n in expr]
-        expr = ''.join(expr)
-        if 'float' in expr:
-            pass  # Don't need to convert if you are turning it into a float
-        else:
-            expr = 'int(%s)' % expr
-        equations = self.equations
-        return eval(expr)
+        if expr not in self.expressions:
+            tokens = self.tokenize(expr)
+            uses_stats = any(token in self.stat_nids or token in self.equations for token in tokens)
+            self.expressions[expr] = self._compile('expression', tokens, self.replacement_dict, uses_stats)
+        return self.expressions[expr](self.equations, unit)
 
     def get_mana(self, unit):
         if hasattr(self, 'mana'):
@@ -102,6 +157,11 @@ class Parser():
 
 PARSER = Parser()
 
+@hook_cached
+def _get_memoized(lhs: NID, unit) -> int:
+    """Remembers the result of an equation for a unit until the unit is touched"""
+    return PARSER.equations[lhs](PARSER.equations, unit)
+
 def __getattr__(name):
     if name == 'parser':
         return PARSER
@@ -114,3 +174,4 @@ def clear():
     """
     global PARSER
     PARSER = Parser()
+    clear_hook_cache()
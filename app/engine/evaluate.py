@@ -1,6 +1,6 @@
 import logging
 import math, random, re
-from typing import Any, Dict
+from typing import Any, Dict, Tuple
 
 from app.utilities import utils, static_random
 from app.data.database.database import DB
@@ -11,12 +11,36 @@ from app.engine.persistent_records import RECORDS
 from app.engine import engine, item_funcs, item_system, skill_system, \
     combat_calcs, unit_funcs
 from app.engine.movement import movement_funcs
+from app.engine.utils import expression_cache
 
 """
 Essentially just a repository that imports a lot of different things so that many different eval calls
 will be accepted
 """
 
+# (Game, Query Engine, Target System, Namespace) the base namespace was last built for
+_base_namespace: Tuple = (None, None, None, {})
+
+def _get_base_namespace(game) -> Dict:
+    """
+    The part of the context that is the same for every expression evaluated with this game.
+    Built once and then copied, instead of rebuilt from scratch for every expression
+    """
+    global _base_namespace
+    query_engine, target_system = game.query_engine, game.target_system
+    old_game, old_query_engine, old_target_system, namespace = _base_namespace
+    if game is not old_game or query_engine is not old_query_engine or target_system is not old_target_system:
+        namespace = globals().copy()
+        # Do not keep the previous game alive through the namespace
+        del namespace['_base_namespace']
+        namespace.update({
+            'game': game,
+            'target_system': target_system,
+        })
+        namespace.update(query_engine.func_dict)
+        _base_namespace = (game, query_engine, target_system, namespace)
+    return namespace
+
 def get_context(unit1=None, unit2=None, position=None,
                 local_args: Dict = None, game=None) -> Dict:
     """
@@ -47,8 +71,9 @@ def get_context(unit1=None, unit2=None, position=None,
         else:
             return False
 
-    temp_globals = globals().copy()
-    temp_globals.update({
+    base_namespace = _get_base_namespace(game)
+    temp_globals = base_namespace.copy()
+    per_call = {
         'unit1': unit1,
         'unit': unit1,
         'unit2': unit2,
@@ -56,11 +81,10 @@ def get_context(unit1=None, unit2=None, position=None,
         'position': position,
         'check_pair': check_pair,
         'check_default': check_default,
-        'game': game,
-        'target_system': game.target_system,
-    })
-    if game:
-        temp_globals.update(game.query_engine.func_dict)
+    }
+    # Query functions take priority over these, same as if they had been added last
+    query_funcs = game.query_engine.func_dict
+    temp_globals.update({k: v for k, v in per_call.items() if k not in query_funcs})
     if local_args:
         temp_globals.update(local_args)
     return temp_globals
@@ -68,5 +92,5 @@ def get_context(unit1=None, unit2=None, position=None,
 def evaluate(string: str, unit1=None, unit2=None, position=None,
              local_args: Dict = None, game=None) -> Any:
     context = get_context(unit1, unit2, position, local_args, game)
-    string = string.strip()
-    return eval(string, context)
+    code = expression_cache.compile_expression(string.strip())
+    return eval(code, context)
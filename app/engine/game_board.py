@@ -3,8 +3,10 @@ from __future__ import annotations
 from typing import Dict, List, Optional, Set, Tuple, TYPE_CHECKING
 
 from app.data.database.database import DB
-from app.engine import line_of_sight
+from app.engine import line_of_sight, skill_system
+from app.engine.pathfinding.cost_grid import CostGrid
 from app.engine.pathfinding.node import Node
+from app.engine.pathfinding.reachability_cache import ReachabilityCache
 from app.engine.game_state import game
 from app.engine.fog_of_war import FogOfWarType
 from app.engine.objects.unit import UnitObject
@@ -20,6 +22,16 @@ class GameBoard(object):
         self.height: int = tilemap.height
         self.bounds: Tuple[int, int, int, int] = (0, 0, self.width - 1, self.height - 1)
         self.mcost_grids: Dict[NID, Grid[Node]] = {}
+        # Flat array version of the mcost grids, used for flood fills
+        self.cost_grids: Dict[NID, CostGrid] = {}
+        # Remembers valid moves. Must be cleared whenever
+        # movement costs, unit positions, bounds, or fog of war changes
+        self.reachability_cache = ReachabilityCache()
+        # Remembers line of sight results. Must be cleared whenever opacity changes
+        self.los_cache = line_of_sight.LineOfSightCache()
+        # For Fog of War line of sight
+        # Key: (Team nid, Default fog radius), Value: Positions any unit on the team can see
+        self.team_los: Dict[Tuple[NID, int], Set[Pos]] = {}
 
         self.reset_tile_grids(tilemap)
 
@@ -27,15 +39,24 @@ class GameBoard(object):
         self.team_grid: Grid[List[NID]] = self.initialize_list_grid()
         # Keeps track of which unit occupies which tile
         self.unit_grid: Grid[List[UnitObject]] = self.initialize_list_grid()
+        # Every position that currently has at least one unit on it
+        self.occupied_positions: Set[Pos] = set()
 
         # Fog of War -- one for each team
-        self.fog_of_war_grids = {}
+        # Each cell counts how many units on that team can see the tile
+        self.fog_of_war_grids: Dict[NID, Grid[int]] = {}
         for team in DB.teams:
-            self.fog_of_war_grids[team.nid] = self.init_set_grid()
+            self.fog_of_war_grids[team.nid] = self.init_count_grid()
         self.fow_vantage_point = {}  # Unit: Position where the unit is that's looking
-        self.fog_regions = self.init_set_grid()
+        # Key: Unit nid, Value: (Team nid, Positions the unit added to that team's grid)
+        self.fow_contributions: Dict[NID, Tuple[NID, Set[Pos]]] = {}
+        # Each cell counts how many fog/vision regions cover the tile
+        self.fog_regions: Grid[int] = self.init_count_grid()
         self.fog_region_set: Set[NID] = set()  # Set of Fog region nids so we can tell how many fog regions exist at all times
-        self.vision_regions = self.init_set_grid()
+        self.vision_regions: Grid[int] = self.init_count_grid()
+        # Key: Region nid, Value: Positions the region added to the fog/vision region grid
+        self.fog_region_contributions: Dict[NID, Set[Pos]] = {}
+        self.vision_region_contributions: Dict[NID, Set[Pos]] = {}
         self.previously_visited_tiles: Set[Pos] = set()  # Used for Hybrid Fog to mark where we have seen in the past
 
         # For Auras
@@ -48,6 +69,7 @@ class GameBoard(object):
 
     def set_bounds(self, min_x: int, min_y: int, max_x: int, max_y: int):
         self.bounds = (min_x, min_y, max_x, max_y)
+        self.reachability_cache.clear()
 
     def check_bounds(self, pos: Pos) -> bool:
         return self.bounds[0] <= pos[0] <= self.bounds[2] and self.bounds[1] <= pos[1] <= self.bounds[3]
@@ -70,7 +92,9 @@ class GameBoard(object):
                 mtype_grid.append(terrain.mtype)
         for mode in DB.mcost.unit_types:
             self.mcost_grids[mode] = self.init_movement_grid(mode, tilemap, mtype_grid)
+            self.cost_grids[mode] = CostGrid.from_node_grid(self.mcost_grids[mode])
         self.opacity_grid = self.init_opacity_grid(tilemap)
+        self.reset_los()
 
     def reset_pos(self, tilemap, pos: Pos):
         terrain_nid = game.get_terrain_nid(tilemap, pos)
@@ -78,6 +102,7 @@ class GameBoard(object):
         if not terrain:
             terrain = DB.terrain[0]
         mtype = terrain.mtype
+        self.reachability_cache.clear()
 
         # Movement reset
         for movement_group in DB.mcost.unit_types:
@@ -87,12 +112,14 @@ class GameBoard(object):
             else:
                 tile_cost = 1
             mcost_grid.insert(pos, Node(*pos, tile_cost < 99, tile_cost))
+            self.cost_grids[movement_group].set_cost(pos, tile_cost, tile_cost < 99)
 
         # Opacity reset
         if terrain:
             self.opacity_grid.insert(pos, terrain.opaque)
         else:
             self.opacity_grid.insert(pos, False)
+        self.reset_los()
 
     # For movement
     def init_movement_grid(self, movement_group: NID, tilemap, mtype_grid: Grid[NID]) -> Grid[Node]:
@@ -111,6 +138,9 @@ class GameBoard(object):
     def get_movement_grid(self, movement_group: NID) -> BoundedGrid[Node]:
         return self.mcost_grids[movement_group].apply_bounds(self.bounds)
 
+    def get_cost_grid(self, movement_group: NID) -> CostGrid:
+        return self.cost_grids[movement_group]
+
     def initialize_list_grid(self) -> Grid[List]:
         grid = Grid[List[NID]]((self.width, self.height))
         for x in range(self.width):
@@ -118,15 +148,27 @@ class GameBoard(object):
                 grid.append([])
         return grid
 
+    def init_count_grid(self) -> Grid[int]:
+        grid = Grid[int]((self.width, self.height))
+        for x in range(self.width):
+            for y in range(self.height):
+                grid.append(0)
+        return grid
+
     def set_unit(self, pos: Pos, unit: UnitObject):
         if unit not in self.unit_grid.get(pos):
             self.unit_grid.get(pos).append(unit)
             self.team_grid.get(pos).append(unit.team)
+            self.occupied_positions.add(pos)
+            self.reachability_cache.clear()
 
     def remove_unit(self, pos: Pos, unit: UnitObject):
         if unit in self.unit_grid.get(pos):
             self.unit_grid.get(pos).remove(unit)
             self.team_grid.get(pos).remove(unit.team)
+            if not self.unit_grid.get(pos):
+                self.occupied_positions.discard(pos)
+            self.reachability_cache.clear()
 
     def get_unit(self, pos: Pos) -> Optional[UnitObject]:
         if not pos:
@@ -160,6 +202,12 @@ class GameBoard(object):
                 return True  # Can always move through what you can't see
         return False
 
+    def get_blocked_positions(self, team: NID) -> Set[Pos]:
+        """Returns every position a unit of the given team cannot move through.
+        Only occupied positions can ever block, so this is the same as
+        asking can_move_through for every tile, but much cheaper"""
+        return {pos for pos in self.occupied_positions if not self.can_move_through(team, pos)}
+
     def can_move_through_ally_block(self, team: NID, pos: Pos) -> bool:
         unit_team = self.get_team(pos)
         if not unit_team:
@@ -172,18 +220,21 @@ class GameBoard(object):
     # === Fog of War ===
     def update_fow(self, pos: Optional[Pos], unit: UnitObject, sight_range: int):
         """Modifies the state of the fog of war game board to reflect the unit moving to the pos"""
-        grid: Grid[List[UnitObject]] = self.fog_of_war_grids[unit.team]
+        # What units can see affects where they can move
+        self.reachability_cache.clear()
+        self.team_los.clear()
         # Remove the old vision
         self.fow_vantage_point[unit.nid] = None
-        for cell in grid.cells():
-            cell.discard(unit.nid)
+        if unit.nid in self.fow_contributions:
+            old_team, old_positions = self.fow_contributions.pop(unit.nid)
+            self._decrement(self.fog_of_war_grids[old_team], old_positions)
         # Add new vision
         if pos:
             self.fow_vantage_point[unit.nid] = pos
             positions = game.target_system.find_manhattan_spheres(range(sight_range + 1), *pos)
             positions = {pos for pos in positions if 0 <= pos[0] < self.width and 0 <= pos[1] < self.height}
-            for position in positions:
-                grid.get(position).add(unit.nid)
+            self._increment(self.fog_of_war_grids[unit.team], positions)
+            self.fow_contributions[unit.nid] = (unit.team, positions)
             self._update_previously_visited(positions, unit.team)
 
     def change_sight_range(self, unit: UnitObject, new_sight_range: int):
@@ -206,17 +257,37 @@ class GameBoard(object):
                     # No need to recheck if we have already visited
                     if position in self.previously_visited_tiles:
                         continue
-                    valid: bool = False  # Can we see the pos?
-                    # We can if any of our allies can see the pos.
-                    for team_nid in DB.teams.get_allies(team):
-                        valid |= line_of_sight.simple_check(position, team_nid, fog_of_war_radius, self.fow_vantage_point)
-                    if valid:
+                    # We can see the pos if any of our allies can see the pos.
+                    if any(position in self.get_team_los(team_nid, fog_of_war_radius) for team_nid in DB.teams.get_allies(team)):
                         self.previously_visited_tiles.add(position)
             else:
                 for position in positions:
                     self.previously_visited_tiles.add(position)
 
+    def reset_los(self):
+        """Called whenever the opacity of the board changes"""
+        self.los_cache.clear()
+        self.team_los.clear()
+
+    def get_team_los(self, team: NID, default_range: int) -> Set[Pos]:
+        """
+        Returns every position the team can see with line of sight.
+        Each unit's line of sight is only recalculated when it moves, its
+        sight range changes, or the opacity of the board changes
+        """
+        key = (team, default_range)
+        if key not in self.team_los:
+            visible = set()
+            for unit in game.units:
+                vantage_point = self.fow_vantage_point.get(unit.nid)
+                if unit.team == team and vantage_point:
+                    sight_range = default_range + skill_system.sight_range(unit)
+                    visible |= line_of_sight.get_visible_positions(vantage_point, sight_range)
+            self.team_los[key] = visible
+        return self.team_los[key]
+
     def add_fog_region(self, region):
+        self.reachability_cache.clear()
         if region.position:
             self.fog_region_set.add(region.nid)
             fog_range = int(region.sub_nid) if region.sub_nid else 0
@@ -224,29 +295,41 @@ class GameBoard(object):
             for pos in region.get_all_positions():
                 positions |= game.target_system.find_manhattan_spheres(range(fog_range + 1), pos[0], pos[1])
             positions = {pos for pos in positions if 0 <= pos[0] < self.width and 0 <= pos[1] < self.height}
-            for position in positions:
-                self.fog_regions.get(position).add(region.nid)
+            # Adding the same region twice should not count it twice
+            self._decrement(self.fog_regions, self.fog_region_contributions.pop(region.nid, ()))
+            self._increment(self.fog_regions, positions)
+            self.fog_region_contributions[region.nid] = positions
 
     def remove_fog_region(self, region):
+        self.reachability_cache.clear()
         self.fog_region_set.discard(region.nid)
-        for cell in self.fog_regions.cells():
-            cell.discard(region.nid)
+        self._decrement(self.fog_regions, self.fog_region_contributions.pop(region.nid, ()))
 
     def add_vision_region(self, region):
+        self.reachability_cache.clear()
         if region.position:
             vision_range = int(region.sub_nid) if region.sub_nid else 0
             positions = set()
             for pos in region.get_all_positions():
                 positions |= game.target_system.find_manhattan_spheres(range(vision_range + 1), pos[0], pos[1])
             positions = {pos for pos in positions if 0 <= pos[0] < self.width and 0 <= pos[1] < self.height}
-            for position in positions:
-                self.vision_regions.get(position).add(region.nid)
-                # Anyone can see a vision region
-                self.previously_visited_tiles.add(position)
+            self._decrement(self.vision_regions, self.vision_region_contributions.pop(region.nid, ()))
+            self._increment(self.vision_regions, positions)
+            self.vision_region_contributions[region.nid] = positions
+            # Anyone can see a vision region
+            self.previously_visited_tiles |= positions
 
     def remove_vision_region(self, region):
-        for cell in self.vision_regions.cells():
-            cell.discard(region.nid)
+        self.reachability_cache.clear()
+        self._decrement(self.vision_regions, self.vision_region_contributions.pop(region.nid, ()))
+
+    def _increment(self, grid: Grid[int], positions: Set[Pos]):
+        for pos in positions:
+            grid.insert(pos, grid.get(pos) + 1)
+
+    def _decrement(self, grid: Grid[int], positions: Set[Pos]):
+        for pos in positions:
+            grid.insert(pos, grid.get(pos) - 1)
 
     def in_vision(self, pos: Tuple[int, int], team: NID = 'player') -> bool:
         # Anybody can see things in vision regions no matter what
@@ -260,13 +343,10 @@ class GameBoard(object):
                 # Since I'm not sure how we'd handle cases where a vision region is obscured by an opaque tile
                 if DB.constants.value('fog_los'):
                     fog_of_war_radius = game.get_current_fog_info().default_radius
-                    valid: bool = False  # Can we see the pos?
-                    # We can if any of our allies can see the pos.
-                    for team_nid in DB.teams.get_allies(team):
-                        valid |= line_of_sight.simple_check(pos, team_nid, fog_of_war_radius, self.fow_vantage_point)
-                    if not valid:
+                    # We can see the pos if any of our allies can see the pos.
+                    if not any(pos in self.get_team_los(team_nid, fog_of_war_radius) for team_nid in DB.teams.get_allies(team)):
                         return False
-                
+
                 for team_nid in DB.teams.get_allies(team):
                     team_grid = self.fog_of_war_grids[team_nid]
                     if team_grid.get(pos):
@@ -274,8 +354,7 @@ class GameBoard(object):
             else:
                 if DB.constants.value('fog_los'):
                     fog_of_war_radius = self.get_fog_of_war_radius(team)
-                    valid = line_of_sight.simple_check(pos, team, fog_of_war_radius, self.fow_vantage_point)
-                    if not valid:
+                    if pos not in self.get_team_los(team, fog_of_war_radius):
                         return False
                 grid = self.fog_of_war_grids[team]
                 if grid.get(pos):
@@ -7,6 +7,7 @@ from collections import Counter
 from typing import TYPE_CHECKING, Dict, Set, Iterable, List, Optional, Tuple
 
 from app.engine.query_engine import GameQueryEngine
+from app.engine.unit_index import UnitIndex
 from app.engine.utils import ltcache
 from app.utilities.primitive_counter import PrimitiveCounter
 
@@ -68,6 +69,7 @@ class GameState():
         - playtime (int): The total playtime of the game in milliseconds.
         - current_save_slot (int): The current save slot.
         - unit_registry (Dict[NID, UnitObject]): A dictionary mapping unit NIDs to UnitObjects.
+        - unit_index (UnitIndex): Finds registered units by position and team.
         - item_registry (Dict[UID, ItemObject]): A dictionary mapping item UIDs to ItemObjects.
         - skill_registry (Dict[UID, SkillObject]): A dictionary mapping skill UIDs to SkillObjects.
         - region_registry (Dict[NID, RegionObject]): A dictionary mapping region NIDs to RegionObjects.
@@ -103,6 +105,8 @@ class GameState():
         self.current_save_slot: int = None
 
         # global registries
+        # Finds registered units by position and team. Kept up to date by the registry and the units
+        self.unit_index: UnitIndex = UnitIndex()
         self.unit_registry: Dict[NID, UnitObject] = {}
         self.item_registry: Dict[UID, ItemObject] = {}
         self.skill_registry: Dict[UID, SkillObject] = {}
@@ -192,6 +196,7 @@ class GameState():
         from app.engine import records, supports
         logging.info("Building New Game")
         self.playtime = 0
+        ltcache.clear_hook_cache()
 
         self.unit_registry = {}
         self.item_registry = {}
@@ -337,6 +342,7 @@ class GameState():
         """
         self.boundary = None
         self.generic()
+        ltcache.clear_hook_cache()
         logging.debug("Starting Level %s", level_nid)
 
         from app.engine.level_cursor import LevelCursor
@@ -462,6 +468,7 @@ class GameState():
         from app.events import event_manager, speak_style
 
         logging.info("Loading Game...")
+        ltcache.clear_hook_cache()
         self.game_vars = PrimitiveCounter(s_dict.get('game_vars', {}))
         static_random.set_seed(self.game_vars.get('_random_seed', 0))
         self.level_vars = PrimitiveCounter(s_dict.get('level_vars', {}))
@@ -844,6 +851,15 @@ class GameState():
         nid, name, leader = party_prefab.nid, party_prefab.name, party_prefab.leader
         self.parties[self.current_party] = PartyObject(nid, name, leader)
 
+    @property
+    def unit_registry(self) -> Dict[NID, UnitObject]:
+        return self._unit_registry
+
+    @unit_registry.setter
+    def unit_registry(self, unit_registry: Dict[NID, UnitObject]):
+        self._unit_registry = unit_registry
+        self.unit_index.reset(unit_registry.values())
+
     @property
     def units(self) -> List[UnitObject]:
         """
@@ -866,11 +882,13 @@ class GameState():
 
     def register_unit(self, unit):
         logging.debug("Registering unit %s as %s", unit, unit.nid)
+        old_unit = self.unit_registry.get(unit.nid)
         self.unit_registry[unit.nid] = unit
+        self.unit_index.add(unit, old_unit)
 
     def unregister_unit(self, unit):
         logging.debug("Unregistering unit %s as %s", unit, unit.nid)
-        del self.unit_registry[unit.nid]
+        self.unit_index.remove(self.unit_registry.pop(unit.nid))
 
     def register_item(self, item):
         logging.debug("Registering item %s as %s", item, item.uid)
@@ -1369,7 +1387,10 @@ class GameState():
         # Board
         if not test:
             self.board.remove_unit(unit.position, unit)
+            if self.ai:
+                self.ai.context.invalidate()
         unit.position = None
+        ltcache.touch(unit)
 
     def remove_terrain_skills(self, unit, test=False):
         from app.engine import action
@@ -1409,8 +1430,11 @@ class GameState():
 
         # Set position
         unit.position = position
+        ltcache.touch(unit)
         if not test:
             self.board.set_unit(unit.position, unit)
+            if self.ai:
+                self.ai.context.invalidate()
 
         # Tiles and Terrain Regions
         if not skill_system.ignore_terrain(unit):
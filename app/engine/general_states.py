@@ -2690,6 +2690,14 @@ class AIState(MapState):
         self.cur_unit = None
         self.cur_group = None
 
+        game.ai.context.start_phase()
+        game.ai.plan_units([
+            unit for unit in game.units if
+            unit.position and
+            not unit.finished and
+            not unit.has_run_ai and
+            unit.team == game.phase.get_current()])
+
     def begin(self):
         phase.fade_in_phase_music()
 
@@ -2797,6 +2805,7 @@ class AIState(MapState):
 
     def finish(self):
         logging.info("Finishing AI State")
+        game.ai.context.end_phase()
         for unit in game.units:
             unit.has_run_ai = False
 
@@ -1,40 +1,114 @@
 from __future__ import annotations
-from typing import Dict
+from typing import Dict, FrozenSet, Iterable, Optional, Set, Tuple
 from app.utilities.typing import NID, Pos
 
 from app.utilities import utils
-from enum import IntEnum
 
 from app.engine.game_state import game
 from app.engine import skill_system
 from app.engine.bresenham_line_algorithm import get_line
 
-class Visibility(IntEnum):
-    Unknown = 0
-    Dark = 1
-    Lit = 2
+class LineOfSightCache():
+    """
+    Remembers line of sight results for the current opacity of the board.
+    Owned by the game board, which clears it whenever the opacity grid changes
+    """
+    def __init__(self):
+        # Key: (Source position, Destination position), Value: Whether there is a clear line
+        self.lines: Dict[Tuple[Pos, Pos], bool] = {}
+        # Key: (Source position, Max range), Value: Every position the source can see
+        self.visible: Dict[Tuple[Pos, int], FrozenSet[Pos]] = {}
+        # Whether there are no opaque tiles at all, in which case every line is clear
+        self.board_is_clear: Optional[bool] = None
+
+    def clear(self):
+        self.lines.clear()
+        self.visible.clear()
+        self.board_is_clear = None
+
+def _is_board_clear(cache: LineOfSightCache) -> bool:
+    if cache.board_is_clear is None:
+        cache.board_is_clear = not any(game.board.opacity_grid.cells())
+    return cache.board_is_clear
+
+def has_line(s_pos: Pos, dest_pos: Pos) -> bool:
+    """
+    Returns whether there is a clear line from s_pos to dest_pos, ignoring range
+    """
+    cache = game.board.los_cache
+    if _is_board_clear(cache):
+        return True
+    key = (s_pos, dest_pos)
+    valid = cache.lines.get(key)
+    if valid is None:
+        valid = get_line(s_pos, dest_pos, game.board.opacity_grid.get)
+        cache.lines[key] = valid
+    return valid
 
 def line_of_sight(source_pos: list, dest_pos: list, max_range: int) -> list:
-    all_tiles = {}
+    """
+    Returns the destination positions that at least one of the source positions
+    can see, in the same order as dest_pos
+    """
+    cache = game.board.los_cache
+    board_is_clear = _is_board_clear(cache)
+    # When asking about more positions than each source could possibly see,
+    # it is cheaper to find everything each source can see in one pass
+    max_visible = min(game.board.width * game.board.height, 2 * max_range * (max_range + 1) + 1)
+    if len(dest_pos) >= max_visible:
+        visible_sets = [get_visible_positions(s_pos, max_range) for s_pos in source_pos]
+    else:
+        visible_sets = [cache.visible.get((s_pos, max_range)) for s_pos in source_pos]
+
+    lit_tiles = []
     for pos in dest_pos:
-        if pos in source_pos:
-            all_tiles[pos] = Visibility.Lit
-        else:
-            all_tiles[pos] = Visibility.Unknown
-
-    # Iterate over remaining tiles
-    for pos, vis in all_tiles.items():
-        if vis == Visibility.Unknown:
-            for s_pos in source_pos:
-                if utils.calculate_distance(pos, s_pos) <= max_range and get_line(s_pos, pos, game.board.get_opacity):
-                    all_tiles[pos] = Visibility.Lit
+        for s_pos, visible in zip(source_pos, visible_sets):
+            if pos == s_pos:
+                break
+            elif visible is not None:
+                if pos in visible:
                     break
-            else:
-                all_tiles[pos] = Visibility.Dark
-
-    lit_tiles = [pos for pos in dest_pos if all_tiles[pos] != Visibility.Dark]
+            elif utils.calculate_distance(pos, s_pos) <= max_range and (board_is_clear or has_line(s_pos, pos)):
+                break
+        else:
+            continue
+        lit_tiles.append(pos)
     return lit_tiles
 
+def get_visible_positions(s_pos: Pos, max_range: int) -> FrozenSet[Pos]:
+    """
+    Returns every position on the board that can be seen from s_pos
+    with line of sight, up to max_range away.
+    Same as asking simple_check about every position for a single vantage point
+    """
+    cache = game.board.los_cache
+    key = (s_pos, max_range)
+    if key in cache.visible:
+        return cache.visible[key]
+
+    board_is_clear = _is_board_clear(cache)
+    visible = {s_pos}
+    x, y = s_pos
+    for dest_x in range(max(0, x - max_range), min(game.board.width, x + max_range + 1)):
+        remaining = max_range - abs(dest_x - x)
+        for dest_y in range(max(0, y - remaining), min(game.board.height, y + remaining + 1)):
+            dest_pos = (dest_x, dest_y)
+            if board_is_clear or has_line(s_pos, dest_pos):
+                visible.add(dest_pos)
+    visible = frozenset(visible)
+    cache.visible[key] = visible
+    return visible
+
+def get_visible_from_sources(source_pos: Iterable[Pos], max_range: int) -> Set[Pos]:
+    """
+    Returns every position on the board that can be seen from at least one of the
+    source positions with line of sight, up to max_range away
+    """
+    visible = set()
+    for s_pos in source_pos:
+        visible |= get_visible_positions(s_pos, max_range)
+    return visible
+
 def simple_check(dest_pos: Pos, team: NID, default_range: int, fow_vantage_point: Dict[NID, Pos] = None) -> bool:
     """
     Returns true if can see position with line of sight
@@ -43,21 +117,53 @@ def simple_check(dest_pos: Pos, team: NID, default_range: int, fow_vantage_point
     for s_pos, extra_range in info:
         if s_pos == dest_pos:
             return True
-        elif utils.calculate_distance(dest_pos, s_pos) <= default_range + extra_range and get_line(s_pos, dest_pos, game.board.get_opacity):
+        elif utils.calculate_distance(dest_pos, s_pos) <= default_range + extra_range and has_line(s_pos, dest_pos):
             return True
     return False
 
 if __name__ == '__main__':
+    # Benchmark: python -m app.engine.line_of_sight
     import random, time
-    num_trials = 100000  # 400 +/- 30 ms
+    from app.utilities.grid import Grid
+
+    class BenchmarkBoard():
+        def __init__(self, width: int, height: int, opaque_chance: float):
+            self.width, self.height = width, height
+            self.opacity_grid = Grid[bool]((width, height))
+            for _ in range(width * height):
+                self.opacity_grid.append(random.random() < opaque_chance)
+            self.los_cache = LineOfSightCache()
+
+    def time_ms(func) -> float:
+        start = time.perf_counter_ns()
+        func()
+        return (time.perf_counter_ns() - start) / 1e6
+
+    random.seed(0)
+    num_trials = 100000
     random_nums = [random.randint(0, 9) for i in range(num_trials * 4)]
-    start = time.time_ns() / 1e6
-    for x in range(num_trials):
-        out = bool(get_line(
-            (random_nums[x * 4], random_nums[x * 4 + 1]), 
-            (random_nums[x * 4 + 2], random_nums[x * 4 + 3]),
-            lambda x: False))
-    end = time.time_ns() / 1e6
-    print(end - start)
-
-    print(out)
+    ms = time_ms(lambda: [get_line(
+        (random_nums[x * 4], random_nums[x * 4 + 1]),
+        (random_nums[x * 4 + 2], random_nums[x * 4 + 3]),
+        lambda x: False) for x in range(num_trials)])
+    print("%d raw get_line calls: %.1f ms" % (num_trials, ms))
+
+    print("%-8s %-8s %14s %14s %14s %14s" % ("Size", "Opaque", "pairwise", "cold", "warm", "10 sources"))
+    for size in (20, 40, 80):
+        for opaque_chance in (0, 0.2):
+            game.board = BenchmarkBoard(size, size, opaque_chance)
+            all_positions = [(x, y) for x in range(size) for y in range(size)]
+            sources = random.sample(all_positions, 10)
+            max_range = 8
+
+            # What line_of_sight used to do: one uncached line per source/destination pair
+            uncached = time_ms(lambda: [
+                [pos for pos in all_positions if any(
+                    pos == s_pos or (utils.calculate_distance(pos, s_pos) <= max_range and get_line(s_pos, pos, game.board.opacity_grid.get))
+                    for s_pos in sources)]])
+            game.board.los_cache.clear()
+            cold = time_ms(lambda: line_of_sight(sources, all_positions, max_range))
+            warm = time_ms(lambda: line_of_sight(sources, all_positions, max_range))
+            game.board.los_cache.clear()
+            batch = time_ms(lambda: get_visible_from_sources(sources, max_range))
+            print("%-8s %-8s %11.2f ms %11.2f ms %11.2f ms %11.2f ms" % ("%dx%d" % (size, size), opaque_chance, uncached, cold, warm, batch))
@@ -8,6 +8,7 @@ from app.engine import action, engine
 from app.engine.movement.movement_component import MovementComponent
 from app.engine.movement import movement_funcs
 from app.engine.sound import get_sound_thread
+from app.engine.utils import ltcache
 from app.utilities import utils
 
 import logging
@@ -98,6 +99,7 @@ class UnitPathMovementComponent(MovementComponent):
                 return
 
         self.unit.position = next_position
+        ltcache.touch(self.unit)
 
     def finish(self, surprise=False):
         """
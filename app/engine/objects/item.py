@@ -1,6 +1,6 @@
 from __future__ import annotations
 import logging
-from typing import TYPE_CHECKING, Optional
+from typing import TYPE_CHECKING, Dict, List, Optional
 
 import app.engine.item_component_access as ICA
 from app.data.database.database import DB
@@ -32,6 +32,8 @@ class ItemObject():
             self.__dict__[component_key] = component_value
             # Assign parent to component
             component_value.item = self
+        # Key: Hook name, Value: The components that define that hook
+        self._hook_index: Dict[str, List[ItemComponent]] = {}
 
         self.data = {}
 
@@ -53,6 +55,18 @@ class ItemObject():
             all_tags |= set(tag_comp.value)
         return all_tags
 
+    def get_hook_components(self, hook_name: str) -> List[ItemComponent]:
+        """Returns the item's components that define the hook, in order"""
+        hook_components = self._hook_index.get(hook_name)
+        if hook_components is None:
+            hook_components = [component for component in self.components if component.defines(hook_name)]
+            self._hook_index[hook_name] = hook_components
+        return hook_components
+
+    def reset_hook_index(self):
+        """Call whenever a component is added to or removed from the item"""
+        self._hook_index.clear()
+
     def change_owner(self, nid):
         self.owner_nid = nid
         for item in self.subitems:
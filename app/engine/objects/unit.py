@@ -12,6 +12,7 @@ from app.engine.objects.difficulty_mode import DifficultyModeObject
 from app.engine.objects.item import ItemObject
 from app.engine.objects.skill import SkillObject
 from app.engine.source_type import SourceType
+from app.engine.utils import ltcache
 from app.utilities import utils
 from app.utilities.data import Prefab
 from app.utilities.typing import NID
@@ -60,7 +61,7 @@ class UnitObject(Prefab):
     ai_group: NID = None  #: All units in the same AI group will be notified of an enemy entering their range and activate
     roam_ai: NID = None  #: NID of this unit's base roaming AI (skills might modify this)
     faction: NID = None  #: NID of the unit's faction. Usually only for generic units
-    team: NID = "player"  #: NID of the unit's team
+    _team: NID = "player"
     portrait_nid: NID = None  #: NID of the unit's current portrait
     affinity: NID = None  #: NID of the unit's affinity
     notes: List[Tuple[str, str]] = field(default_factory=list)
@@ -80,7 +81,7 @@ class UnitObject(Prefab):
     stat_cap_modifiers: Dict[NID, int] = field(default_factory=dict)  #: Personal stat cap modifiers
     wexp: Dict[NID, int] = field(default_factory=dict)  #: Current wexp in each weapon type
 
-    position: Tuple[int, int] = None  #: Current position on the map
+    _position: Tuple[int, int] = None
     starting_position: Tuple[int, int] = None  #: Where the unit was placed on the map in the editor
     previous_position: Tuple[int, int] = None  #: Where the unit started their turn
     current_hp: int = 0
@@ -119,6 +120,7 @@ class UnitObject(Prefab):
     _sound = None
     _battle_anim = None
     current_move = None
+    _unit_index = None  # UnitIndex of the game the unit is registered in, kept up to date with its position and team
 
     # If the attribute is not found
     def __getattr__(self, attr):
@@ -327,6 +329,8 @@ class UnitObject(Prefab):
         # Reset these so max hp can be changed by skills and items
         self.current_hp = self.get_max_hp()
         self.current_mana = self.get_max_mana()
+        # Forget anything cached about a previous unit with the same nid
+        ltcache.touch(self)
 
         return self
 
@@ -443,6 +447,7 @@ class UnitObject(Prefab):
         if not test:
             self._skills.append(UnitSkill(skill, source, source_type))
             self._visible_skills_cache.clear()
+            ltcache.touch(self)
         return popped_skill
 
     def remove_skill(self, skill, source, source_type=SourceType.DEFAULT, test=False):
@@ -462,6 +467,7 @@ class UnitObject(Prefab):
         if not test and to_remove:
             self._skills.remove(to_remove)
             self._visible_skills_cache.clear()
+            ltcache.touch(self)
         return removed_skill_info
 
     @property
@@ -498,10 +504,24 @@ class UnitObject(Prefab):
             else:
                 skills.append(skill)
                 skill_nids.add(skill.nid)
-        skills = list(reversed(skills)) # Reverse back to correct direction
+        skills = skill_system.SkillList(reversed(skills)) # Reverse back to correct direction
         self._visible_skills_cache = skills
         return skills
 
+    def reset_skills_cache(self):
+        """Call whenever the components of one of the unit's skills change"""
+        self._visible_skills_cache.clear()
+        ltcache.touch(self)
+
+    def get_skill_list(self) -> List[UnitSkill]:
+        """Returns a copy of every skill the unit has received, with their sources"""
+        return list(self._skills)
+
+    def set_skill_list(self, skills: List[UnitSkill]):
+        """Replaces every skill the unit has received. Does not run any skill hooks"""
+        self._skills = list(skills)
+        self.reset_skills_cache()
+
     def stat_bonus(self, stat_nid: NID) -> int:
         """Given a stat NID, determines the unit's bonus for that stat.
 
@@ -615,6 +635,28 @@ class UnitObject(Prefab):
             self._sound = unit_sound.UnitSound(self)
         return self._sound
 
+    @property
+    def position(self) -> Optional[Tuple[int, int]]:
+        """Current position on the map"""
+        return self._position
+
+    @position.setter
+    def position(self, pos: Optional[Tuple[int, int]]):
+        if self._unit_index:
+            self._unit_index.move(self, self._position, pos)
+        self._position = pos
+
+    @property
+    def team(self) -> NID:
+        """NID of the unit's team"""
+        return self._team
+
+    @team.setter
+    def team(self, team: NID):
+        if self._unit_index:
+            self._unit_index.change_team(self, self._team, team)
+        self._team = team
+
     @property
     def tags(self) -> Set[str]:
         """Returns all tags this unit has.
@@ -735,6 +777,7 @@ class UnitObject(Prefab):
             if self.equipped_weapon:
                 self.unequip(self.equipped_weapon, item)
             self.equipped_weapon = item
+        ltcache.touch(self)
         item_system.on_equip_item(self, item)
         skill_system.on_equip_item(self, item)
 
@@ -745,6 +788,7 @@ class UnitObject(Prefab):
                 self.equipped_accessory = swap_to
             else:
                 self.equipped_weapon = swap_to
+            ltcache.touch(self)
             skill_system.on_unequip_item(self, item)
             item_system.on_unequip_item(self, item)
 
@@ -1025,6 +1069,7 @@ class UnitObject(Prefab):
         for s in self._skills:
             skill_system.after_add_from_restore(self, s.get())
         self._visible_skills_cache.clear()
+        ltcache.touch(self)
 
         return self
 
@@ -0,0 +1,46 @@
+from __future__ import annotations
+
+from array import array
+from typing import Tuple
+
+from app.engine.pathfinding.node import Node
+from app.utilities.grid import Grid
+from app.utilities.typing import Pos
+
+class CostGrid():
+    """
+    Compact representation of a movement cost grid for a single movement group.
+    Stores the cost of entering each tile in a flat array, plus a flat
+    passability mask, using the same (x * height + y) indexing as Grid.
+
+    Unlike the Node grids, nothing here needs to be reset between searches,
+    so a flood fill can use the arrays directly.
+    """
+    __slots__ = ['width', 'height', 'costs', 'passable']
+
+    def __init__(self, size: Tuple[int, int]):
+        self.width, self.height = size
+        self.costs: array = array('d', bytes(8 * self.width * self.height))
+        self.passable: bytearray = bytearray(self.width * self.height)
+
+    @classmethod
+    def from_node_grid(cls, grid: Grid[Node]) -> CostGrid:
+        self = cls((grid.width, grid.height))
+        for idx, node in enumerate(grid.cells()):
+            self.costs[idx] = node.cost
+            self.passable[idx] = node.reachable
+        return self
+
+    def set_cost(self, pos: Pos, cost: float, reachable: bool):
+        idx = pos[0] * self.height + pos[1]
+        self.costs[idx] = cost
+        self.passable[idx] = reachable
+
+    def get_cost(self, pos: Pos) -> float:
+        return self.costs[pos[0] * self.height + pos[1]]
+
+    def is_passable(self, pos: Pos) -> bool:
+        return bool(self.passable[pos[0] * self.height + pos[1]])
+
+    def __repr__(self):
+        return f'CostGrid: {self.width}x{self.height}'
@@ -0,0 +1,135 @@
+import heapq
+from typing import Dict, Iterable, List, Tuple
+
+from app.engine.pathfinding.cost_grid import CostGrid
+from app.utilities.typing import Pos
+
+INF = float('inf')
+
+class DistanceField():
+    """
+    The cheapest cost from one start position to every position it can reach,
+    along with the path there. Lets the AI find a path to each of its possible
+    targets from a single search, instead of running A* once for every target.
+    """
+    __slots__ = ['start_pos', 'height', 'costs', 'parents']
+
+    def __init__(self, start_pos: Pos, height: int, costs: Dict[int, float], parents: Dict[int, int]):
+        self.start_pos: Pos = start_pos
+        self.height: int = height
+        self.costs: Dict[int, float] = costs  # Index: Cost to reach
+        self.parents: Dict[int, int] = parents  # Index: Index of the previous position on the path
+
+    def get_cost(self, pos: Pos) -> float:
+        return self.costs.get(pos[0] * self.height + pos[1], INF)
+
+    def _return_path(self, idx: int) -> List[Pos]:
+        path = []
+        while idx is not None:
+            path.append(divmod(idx, self.height))
+            idx = self.parents.get(idx)
+        return path
+
+    def get_path(self, goal_pos: Pos, adj_good_enough: bool = False, limit: float = None) -> List[Pos]:
+        """
+        Finds the path to the goal position, the same way `AStar.process` would.
+
+        Args:
+            goal_pos (Pos): Where to go
+            adj_good_enough (bool, optional): If set, moving adjacent to the goal position also counts as meeting its goal.
+            limit (float, optional): If set, give up on goals that cost more than this to reach,
+                counting the last step onto the goal when stopping adjacent to it
+
+        Returns:
+            List[Pos]: The path, with the goal position first and the start position last,
+                or an empty list if there is no path
+        """
+        height = self.height
+        goal_idx = goal_pos[0] * height + goal_pos[1]
+        start_idx = self.start_pos[0] * height + self.start_pos[1]
+        # Already there
+        if start_idx == goal_idx or (adj_good_enough and self._is_adjacent(self.start_pos, goal_pos)):
+            return [self.start_pos]
+
+        # (Cost including the step onto the goal, Whether it is the goal itself, Preference, Index to stop at)
+        candidates: List[Tuple[float, bool, int, int]] = []
+        if goal_idx in self.costs:
+            candidates.append((self.costs[goal_idx], True, 0, goal_idx))
+        if adj_good_enough:
+            x, y = goal_pos
+            for adj in ((x, y + 1), (x + 1, y), (x - 1, y), (x, y - 1)):
+                # Off the edge of the map positions would wrap around to another column
+                if adj[0] < 0 or not 0 <= adj[1] < height:
+                    continue
+                adj_idx = adj[0] * height + adj[1]
+                if adj_idx in self.costs:
+                    candidates.append((self.costs[adj_idx] + 1, False, self._get_cross(adj, goal_pos), adj_idx))
+        if not candidates:
+            return []
+        # The positions next to the goal are always reached before the goal itself, so they win ties.
+        # Between positions next to the goal, prefer the one closest to the straight line from the start
+        cost, _, _, idx = min(candidates)
+        if limit is not None and cost > limit:
+            return []
+        return self._return_path(idx)
+
+    def _get_cross(self, pos: Pos, goal_pos: Pos) -> int:
+        """Same nudge towards the straight line path as `AStar._get_heuristic`"""
+        dx1, dy1 = pos[0] - goal_pos[0], pos[1] - goal_pos[1]
+        dx2, dy2 = self.start_pos[0] - goal_pos[0], self.start_pos[1] - goal_pos[1]
+        return abs(dx1 * dy2 - dx2 * dy1)
+
+    def _is_adjacent(self, pos1: Pos, pos2: Pos) -> bool:
+        return abs(pos1[0] - pos2[0]) + abs(pos1[1] - pos2[1]) == 1
+
+def get_distance_field(cost_grid: CostGrid, start_pos: Pos, bounds: Tuple[int, int, int, int],
+                       blocked: Iterable[Pos] = (), max_cost: float = INF) -> DistanceField:
+    """
+    Runs Djikstra from the start position over the whole map, remembering
+    how each position was reached.
+
+    Args:
+        cost_grid (CostGrid): The movement cost grid to search
+        start_pos (Pos): Where to start from
+        bounds (Tuple[int, int, int, int]): Leftmost, Topmost, Rightmost, Bottommost valid position
+        blocked (Iterable[Pos], optional): Positions that cannot be moved through (ie, enemy units)
+        max_cost (float, optional): Treat any position that costs more than this to enter as impassable
+
+    Returns:
+        DistanceField: The cost and path to every reachable position
+    """
+    height = cost_grid.height
+    costs = cost_grid.costs
+    passable = cost_grid.passable
+    min_x, min_y, max_x, max_y = bounds
+    blocked_idxs = {x * height + y for (x, y) in blocked}
+
+    start_idx = start_pos[0] * height + start_pos[1]
+    best = {start_idx: 0}
+    parents = {}
+    closed = set()
+    open_heap = [(0, start_idx)]
+    heappush, heappop = heapq.heappush, heapq.heappop
+
+    while open_heap:
+        g, idx = heappop(open_heap)
+        if idx in closed:
+            continue  # Stale entry
+        closed.add(idx)
+        x, y = divmod(idx, height)
+        x_ok = min_x <= x <= max_x
+        y_ok = min_y <= y <= max_y
+        # Same neighbor order as AStar._get_manhattan_adj_nodes
+        for adj, in_bounds in ((idx + 1, x_ok and min_y <= y + 1 <= max_y),
+                               (idx + height, y_ok and min_x <= x + 1 <= max_x),
+                               (idx - height, y_ok and min_x <= x - 1 <= max_x),
+                               (idx - 1, x_ok and min_y <= y - 1 <= max_y)):
+            if not in_bounds or not passable[adj] or adj in closed or adj in blocked_idxs or costs[adj] > max_cost:
+                continue
+            new_g = g + costs[adj]
+            if new_g < best.get(adj, INF):
+                best[adj] = new_g
+                parents[adj] = idx
+                heappush(open_heap, (new_g, adj))
+
+    return DistanceField(start_pos, height, best, parents)
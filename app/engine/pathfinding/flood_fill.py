@@ -0,0 +1,62 @@
+import heapq
+from typing import Iterable, Set, Tuple
+
+from app.engine.pathfinding.cost_grid import CostGrid
+from app.utilities.typing import Pos
+
+INF = float('inf')
+
+def get_reachable(cost_grid: CostGrid, start_pos: Pos, movement_left: float,
+                  bounds: Tuple[int, int, int, int], blocked: Iterable[Pos] = ()) -> Set[Pos]:
+    """
+    Finds every position the start position can reach while spending at most
+    `movement_left` movement points. Returns the same set as `Djikstra.process`,
+    but works directly on the flat arrays of a CostGrid instead of Node objects,
+    so there is no per-node reset and no per-neighbor callback.
+
+    Args:
+        cost_grid (CostGrid): The movement cost grid to flood
+        start_pos (Pos): Where to start from. Always included unless movement_left is negative
+        movement_left (float): How many movement points can be spent
+        bounds (Tuple[int, int, int, int]): Leftmost, Topmost, Rightmost, Bottommost valid position
+        blocked (Iterable[Pos], optional): Positions that cannot be moved through (ie, enemy units)
+
+    Returns:
+        Set[Pos]: All reachable positions
+    """
+    height = cost_grid.height
+    costs = cost_grid.costs
+    passable = cost_grid.passable
+    min_x, min_y, max_x, max_y = bounds
+    blocked_idxs = {x * height + y for (x, y) in blocked}
+
+    start_idx = start_pos[0] * height + start_pos[1]
+    best = {start_idx: 0}
+    closed = set()
+    open_heap = [(0, start_idx)]
+    heappush, heappop = heapq.heappush, heapq.heappop
+
+    while open_heap:
+        g, idx = heappop(open_heap)
+        # Always g ordered, so leaving at the first sign of trouble will always work
+        if g > movement_left:
+            break
+        if idx in closed:
+            continue  # Stale entry
+        closed.add(idx)
+        x, y = divmod(idx, height)
+        x_ok = min_x <= x <= max_x
+        y_ok = min_y <= y <= max_y
+        # Same neighbor order as Djikstra._get_manhattan_adj_nodes
+        for adj, in_bounds in ((idx + 1, x_ok and min_y <= y + 1 <= max_y),
+                               (idx + height, y_ok and min_x <= x + 1 <= max_x),
+                               (idx - height, y_ok and min_x <= x - 1 <= max_x),
+                               (idx - 1, x_ok and min_y <= y - 1 <= max_y)):
+            if not in_bounds or not passable[adj] or adj in closed or adj in blocked_idxs:
+                continue
+            new_g = g + costs[adj]
+            if new_g < best.get(adj, INF):
+                best[adj] = new_g
+                heappush(open_heap, (new_g, adj))
+
+    return {divmod(idx, height) for idx in closed}
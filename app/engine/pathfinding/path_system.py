@@ -5,13 +5,14 @@ import functools
 
 from app.engine import equations, skill_system
 from app.engine.movement import movement_funcs
-from app.engine.pathfinding import pathfinding
+from app.engine.pathfinding import distance_field, flood_fill, pathfinding
 from app.engine.game_state import GameState
 from app.utilities.typing import Pos
 
 if TYPE_CHECKING:
     from app.engine.objects.unit import UnitObject
     from app.utilities.grid import Grid, BoundedGrid
+    from app.engine.pathfinding.cost_grid import CostGrid
     from app.engine.pathfinding.node import Node
 
 class PathSystem():
@@ -36,18 +37,8 @@ class PathSystem():
         """
         if not force and unit.finished:
             return set()
-        mtype = movement_funcs.get_movement_group(unit)
-        grid: BoundedGrid[Node] = self.game.board.get_movement_grid(mtype)
-        start_pos = unit.position
-        pathfinder = pathfinding.Djikstra(start_pos, grid)
         movement_left = unit.get_movement() if force else unit.movement_left
-
-        if skill_system.pass_through(unit):
-            can_move_through = lambda adj: True
-        else:
-            # Feed the unit's team into the function
-            can_move_through = functools.partial(self.game.board.can_move_through, unit.team)
-        valid_moves = pathfinder.process(can_move_through, movement_left)
+        valid_moves = self._flood_fill(unit, movement_left)
         valid_moves.add(unit.position)
         if witch_warp:
             witch_warp = set(skill_system.witch_warp(unit))
@@ -66,21 +57,57 @@ class PathSystem():
         """
         if unit.finished:
             return set()
-        mtype = movement_funcs.get_movement_group(unit)
-        grid: BoundedGrid[Node] = self.game.board.get_movement_grid(mtype)
-        start_pos = unit.position
-        pathfinder = pathfinding.Djikstra(start_pos, grid)
         movement_left = unit.get_movement() + unit.get_xcom_movement()
+        valid_moves = self._flood_fill(unit, movement_left)
+        return valid_moves
 
-        if skill_system.pass_through(unit):
-            can_move_through = lambda adj: True
+    def _flood_fill(self, unit: UnitObject, movement_left: float) -> Set[Pos]:
+        """Finds all positions the unit can reach from its current position
+        with the given amount of movement. Equivalent to running Djikstra over the
+        unit's movement grid, but runs on the board's flat cost arrays instead.
+        Results are remembered in the board's reachability cache
+        """
+        board = self.game.board
+        mtype = movement_funcs.get_movement_group(unit)
+        pass_through = skill_system.pass_through(unit)
+        key = (unit.nid, unit.position, mtype, movement_left, None if pass_through else unit.team)
+        valid_moves = board.reachability_cache.get(key)
+        if valid_moves is not None:
+            return valid_moves
+
+        cost_grid: CostGrid = board.get_cost_grid(mtype)
+        if pass_through:
+            blocked = set()
         else:
-            # Feed the unit's team into the function
-            can_move_through = functools.partial(self.game.board.can_move_through, unit.team)
-
-        valid_moves = pathfinder.process(can_move_through, movement_left)
+            blocked = board.get_blocked_positions(unit.team)
+        valid_moves = flood_fill.get_reachable(cost_grid, unit.position, movement_left, board.bounds, blocked)
+        board.reachability_cache.set(key, valid_moves)
         return valid_moves
 
+    def get_distance_field(self, unit: UnitObject) -> distance_field.DistanceField:
+        """Finds the cheapest path from the unit's current position to every position on the map.
+        Tiles that cost more than the unit's full movement to enter are treated as impassable.
+        Results are remembered in the board's reachability cache, so every unit
+        of the same team and movement group starting from the same position shares them
+        """
+        board = self.game.board
+        mtype = movement_funcs.get_movement_group(unit)
+        pass_through = skill_system.pass_through(unit)
+        max_cost = unit.get_movement()
+        key = (unit.position, mtype, None if pass_through else unit.team, max_cost)
+        field = board.reachability_cache.get_field(key)
+        if field is not None:
+            return field
+
+        cost_grid: CostGrid = board.get_cost_grid(mtype)
+        if pass_through:
+            blocked = set()
+        else:
+            blocked = board.get_blocked_positions(unit.team)
+        field = distance_field.get_distance_field(cost_grid, unit.position, board.bounds, blocked, max_cost)
+        board.reachability_cache.set_field(key, field)
+        return field
+
     def get_path(self, unit: UnitObject, position: Pos, ally_block: bool = False, 
                  use_limit: int = None, free_movement: bool = False) -> List[Pos]:
         """Given a unit and a goal position, find the best path for the unit to get to that goal position
@@ -171,6 +198,6 @@ class PathSystem():
                 break
         # Don't move where a unit already is, and don't make through path < 0
         # Lower the through path by one, cause we can't move that far
-        while through_path > 0 and any(other_unit.position == path[-(through_path + 1)] for other_unit in self.game.units if unit is not other_unit):
+        while through_path > 0 and any(other_unit is not unit for other_unit in self.game.unit_index.get_units_at(path[-(through_path + 1)])):
             through_path -= 1
         return path[-(through_path + 1)]  # Travel as far as we can
@@ -1,19 +1,17 @@
-import heapq
 from typing import Callable, List, Optional, Set, Tuple
 
 from app.engine import bresenham_line_algorithm
 
 from app.engine.pathfinding.node import Node
+from app.engine.pathfinding.priority_queue import PriorityQueue
 from app.utilities.grid import BoundedGrid
 from app.utilities.typing import Pos
 
 class Djikstra:
-    __slots__ = ['open', 'closed', 'grid', 'start_pos', 'start_node']
+    __slots__ = ['open', 'grid', 'start_pos', 'start_node']
 
     def __init__(self, start_pos: Pos, grid: BoundedGrid[Node]):
-        self.open: List[Node] = []
-        heapq.heapify(self.open)
-        self.closed: Set[Node] = set()
+        self.open: PriorityQueue[Node] = PriorityQueue()
         self.grid: BoundedGrid[Node] = grid
         self._reset_grid()
         self.start_pos: Pos = start_pos
@@ -41,35 +39,37 @@ class Djikstra:
 
     def process(self, can_move_through: Callable[[Pos], bool], 
                 movement_left: float) -> Set[Pos]:
-        # add starting node to open heap queue
-        heapq.heappush(self.open, (self.start_node.g, self.start_node))
+        # Each call is a fresh search
+        self.open.clear()
+        # add starting node to open queue
+        self.open.push(self.start_node, self.start_node.g)
         while self.open:
-            # pop node from heap queue
-            g, node = heapq.heappop(self.open)
+            # pop node from open queue
+            g, node = self.open.pop()
             # If we've traveled too far -- always g ordered, so leaving at the
             # first sign of trouble will always work
             if g > movement_left:
-                return {(node.x, node.y) for node in self.closed}
+                break
             # add node to closed set so we don't process it twice
-            self.closed.add(node)
+            self.open.close(node)
             # get adjacent nodes for node
             adj_nodes = self._get_adj_nodes(node)
             for adj in adj_nodes:
-                if adj.reachable and adj not in self.closed:
+                if adj.reachable and not self.open.is_closed(adj):
                     if can_move_through((adj.x, adj.y)):
-                        if (adj.g, adj) in self.open:
+                        if adj in self.open:
                             # if adj node in open list, check if current path
                             # is better than the one previously found for this adj node
                             if adj.g > node.g + adj.cost:
                                 self._update_node(adj, node)
-                                heapq.heappush(self.open, (adj.g, adj))
+                                self.open.push(adj, adj.g)
                         else:
                             self._update_node(adj, node)
-                            heapq.heappush(self.open, (adj.g, adj))
+                            self.open.push(adj, adj.g)
                     else:  # Unit is in the way
                         pass
-        # Sometimes gets here if unit is fully enclosed
-        return {(node.x, node.y) for node in self.closed}
+        # Sometimes runs out of open nodes if unit is fully enclosed
+        return {(node.x, node.y) for node in self.open.closed_items()}
 
 class AStar:
     def __init__(self, start_pos: Pos, goal_pos: Optional[Pos], grid: BoundedGrid[Node]):
@@ -88,9 +88,7 @@ class AStar:
             node.reset()
 
     def reset(self):
-        self.open: List[Node] = []
-        heapq.heapify(self.open)
-        self.closed: Set[Node] = set()
+        self.open: PriorityQueue[Node] = PriorityQueue()
         self._reset_grid()
 
     def set_goal_pos(self, goal_pos: Pos):
@@ -164,11 +162,11 @@ class AStar:
             max_movement_limit (int, optional): Defaults to 999. Treat as impassable all nodes with cost > this limit.
         """
         # Add starting node to open queue
-        heapq.heappush(self.open, (self.start_node.f, self.start_node))
+        self.open.push(self.start_node, self.start_node.f)
         while self.open:
-            f, node = heapq.heappop(self.open)
+            f, node = self.open.pop()
             # Make sure we don't process the node twice
-            self.closed.add(node)
+            self.open.close(node)
             # If this node is past the limit, just return None
             # Uses f, not g, because g will cut off if first greedy path fails
             # f only cuts off if all nodes are bad
@@ -180,17 +178,17 @@ class AStar:
             # get adjacent nodes for node
             adj_nodes = self._get_adj_nodes(node)
             for adj in adj_nodes:
-                if adj.reachable and adj not in self.closed:
+                if adj.reachable and not self.open.is_closed(adj):
                     if can_move_through((adj.x, adj.y)) and adj.cost <= max_movement_limit:
-                        if (adj.f, adj) in self.open:
+                        if adj in self.open:
                             # if adj node in open list, check if current path
                             # is better than the one previously found for this adj node
                             if adj.g > node.g + adj.cost:
                                 self._update_node(adj, node)
-                                heapq.heappush(self.open, (adj.f, adj))
+                                self.open.push(adj, adj.f)
                         else:
                             self._update_node(adj, node)
-                            heapq.heappush(self.open, (adj.f, adj))
+                            self.open.push(adj, adj.f)
                     else:  # Is blocked
                         pass
         return []
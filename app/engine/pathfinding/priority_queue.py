@@ -0,0 +1,69 @@
+import heapq
+from typing import Dict, Generic, List, Set, Tuple, TypeVar
+
+T = TypeVar('T')
+
+class PriorityQueue(Generic[T]):
+    """
+    Min-priority queue shared by the pathfinders.
+
+    Uses lazy deletion: lowering the priority of an item that is already open
+    just pushes a new heap entry, and any outdated entry is skipped when it
+    reaches the top of the heap. The state table keeps track of the current
+    priority of every open item and of which items have been closed, so
+    membership checks are O(1) instead of a scan over the heap.
+
+    Heap entries are (priority, item) tuples, so ties are broken by the items
+    themselves, the same as pushing directly onto a heapq list.
+    """
+    __slots__ = ['_heap', '_open', '_closed']
+
+    def __init__(self):
+        self._heap: List[Tuple[float, T]] = []
+        self._open: Dict[T, float] = {}  # Item: Current priority
+        self._closed: Set[T] = set()
+
+    def clear(self):
+        self._heap.clear()
+        self._open.clear()
+        self._closed.clear()
+
+    def push(self, item: T, priority: float):
+        """Adds the item to the queue, or changes its priority if it is already open"""
+        self._open[item] = priority
+        heapq.heappush(self._heap, (priority, item))
+
+    def pop(self) -> Tuple[float, T]:
+        """Removes and returns the (priority, item) pair with the lowest priority"""
+        heap, open_items = self._heap, self._open
+        while heap:
+            priority, item = heapq.heappop(heap)
+            # Skip entries whose priority has since been changed
+            if open_items.get(item) == priority:
+                del open_items[item]
+                return priority, item
+        raise IndexError("pop from an empty priority queue")
+
+    def priority(self, item: T) -> float:
+        return self._open[item]
+
+    def is_open(self, item: T) -> bool:
+        return item in self._open
+
+    def close(self, item: T):
+        self._closed.add(item)
+
+    def is_closed(self, item: T) -> bool:
+        return item in self._closed
+
+    def closed_items(self) -> Set[T]:
+        return self._closed
+
+    def __contains__(self, item: T) -> bool:
+        return item in self._open
+
+    def __len__(self) -> int:
+        return len(self._open)
+
+    def __bool__(self) -> bool:
+        return bool(self._open)
@@ -0,0 +1,76 @@
+from __future__ import annotations
+
+import logging
+from typing import TYPE_CHECKING, Dict, FrozenSet, Optional, Set, Tuple
+
+from app.utilities.typing import NID, Pos
+
+if TYPE_CHECKING:
+    from app.engine.pathfinding.distance_field import DistanceField
+
+# (Unit nid, Unit position, Movement group, Movement left, Team that is blocked by enemies or None for pass through)
+ReachabilityKey = Tuple[NID, Pos, NID, float, Optional[NID]]
+# (Start position, Movement group, Team that is blocked by enemies or None for pass through, Max cost of a single tile)
+DistanceFieldKey = Tuple[Pos, NID, Optional[NID], float]
+
+class ReachabilityCache():
+    """
+    Remembers the result of the valid moves flood fill for each unit,
+    so that the cursor, boundary, highlights, target system, and AI
+    can all ask for the same unit's valid moves without redoing the search.
+
+    Everything the flood fill depends on that belongs to the unit is part of the key.
+    Everything that belongs to the board (unit occupancy, terrain, fog of war, bounds)
+    is handled by the board calling `clear` whenever it changes.
+    Skill changes call `invalidate_unit` through `action.recalc_unit`.
+    The whole cache is also cleared at the start of every phase.
+
+    Also remembers the AI's distance fields, which depend on the same board state,
+    but only on the movement group and team of the unit rather than the unit itself.
+    """
+    def __init__(self):
+        self._cache: Dict[ReachabilityKey, FrozenSet[Pos]] = {}
+        self._fields: Dict[DistanceFieldKey, DistanceField] = {}
+        self.hits: int = 0
+        self.misses: int = 0
+
+    def get(self, key: ReachabilityKey) -> Optional[Set[Pos]]:
+        """Returns a fresh copy of the cached valid moves, since callers modify the result"""
+        moves = self._cache.get(key)
+        if moves is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return set(moves)
+
+    def set(self, key: ReachabilityKey, moves: Set[Pos]):
+        self._cache[key] = frozenset(moves)
+
+    def get_field(self, key: DistanceFieldKey) -> Optional[DistanceField]:
+        return self._fields.get(key)
+
+    def set_field(self, key: DistanceFieldKey, field: DistanceField):
+        self._fields[key] = field
+
+    def invalidate_unit(self, unit_nid: NID):
+        for key in [key for key in self._cache if key[0] == unit_nid]:
+            del self._cache[key]
+
+    def clear(self):
+        self._cache.clear()
+        self._fields.clear()
+
+    def reset_stats(self):
+        self.hits = 0
+        self.misses = 0
+
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.
+
+    def log_stats(self, label: str = ''):
+        logging.debug("Reachability cache %s: %d hits, %d misses (%.1f%% hit rate)",
+                      label, self.hits, self.misses, self.hit_rate() * 100)
+
+    def __len__(self) -> int:
+        return len(self._cache)
@@ -11,6 +11,7 @@ from app.engine.sound import get_sound_thread
 from app.engine import config as cf
 from app.engine import engine, image_mods
 from app.engine.game_state import game
+from app.engine.utils import expression_cache
 
 import logging
 
@@ -93,6 +94,11 @@ class PhaseController():
 
     def next(self):
         self.previous = self.current
+        if game.board:
+            game.board.reachability_cache.log_stats(self.get_current())
+            game.board.reachability_cache.reset_stats()
+            game.board.reachability_cache.clear()
+        expression_cache.log_stats()
         # If there are units
         if any(unit.position for unit in game.units):
             self._next()
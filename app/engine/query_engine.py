@@ -52,6 +52,14 @@ class GameQueryEngine():
         except:
             return has_pos_or_is_pos
 
+    def _on_field(self, unit) -> bool:
+        """Same check as `game.get_all_units`"""
+        return unit.position and not unit.dead and not unit.is_dying and 'Tile' not in unit.tags
+
+    def _get_units_in_area(self, x1: int, y1: int, x2: int, y2: int) -> List[UnitObject]:
+        """Units on the field within the rectangle, in the same order as `game.get_all_units`"""
+        return [unit for unit in self.game.unit_index.get_units_in_area(x1, y1, x2, y2) if self._on_field(unit)]
+
     def get_item(self, unit, item) -> Optional[ItemObject]:
         """Returns a item object by nid or uid.
 
@@ -207,7 +215,8 @@ class GameQueryEngine():
         """
         position = self._resolve_pos(position)
         if position:
-            return sorted([(unit, utils.calculate_distance(unit.position, position)) for unit in self.game.get_player_units()],
+            player_units = [unit for unit in self.game.unit_index.get_team_units('player') if self._on_field(unit)]
+            return sorted([(unit, utils.calculate_distance(unit.position, position)) for unit in player_units],
                           key=lambda pair: pair[1])[:num]
         return []
 
@@ -228,8 +237,11 @@ class GameQueryEngine():
             within the specified `dist` that match criteria.
         """
         position = self._resolve_pos(position)
+        if not position:
+            return []
         res = []
-        for unit in self.game.get_all_units():
+        x, y = position
+        for unit in self._get_units_in_area(x - dist, y - dist, x + dist, y + dist):
             if tag and not tag in unit.tags:
                 continue
             if nid and not unit.nid == nid:
@@ -238,10 +250,9 @@ class GameQueryEngine():
                 continue
             if party and not unit.party == party:
                 continue
-            if position:
-                distance = utils.calculate_distance(unit.position, position)
-                if distance <= dist:
-                    res.append(unit)
+            distance = utils.calculate_distance(unit.position, position)
+            if distance <= dist:
+                res.append(unit)
         return res
 
     def get_allies_within_distance(self, position, dist: int = 1) -> List[Tuple[UnitObject, int]]:
@@ -274,12 +285,7 @@ class GameQueryEngine():
             x1, x2 = x2, x1
         if y1 > y2:
             y1, y2 = y2, y1
-        target_units = []
-        for unit in self.game.get_all_units():
-            ux, uy = unit.position
-            if x1 <= ux <= x2 and y1 <= uy <= y2:
-                target_units.append(unit)
-        return target_units
+        return self._get_units_in_area(x1, y1, x2, y2)
 
     def get_debuff_count(self, unit) -> int:
         """Checks how many negative skills the unit has.
@@ -313,10 +319,11 @@ class GameQueryEngine():
             List[UnitObject]: all units matching the criteria in the region
         """
         region = self._resolve_to_region(region)
-        if not region:
+        if not region or not region.position:
             return []
         all_units = []
-        for unit in self.game.get_all_units():
+        x, y = region.position
+        for unit in self._get_units_in_area(x, y, x + region.size[0] - 1, y + region.size[1] - 1):
             if nid and nid != unit.nid:
                 continue
             if team and team != unit.team:
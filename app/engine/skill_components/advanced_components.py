@@ -50,6 +50,7 @@ class MultiSkill(SkillComponent):
         for subaction in subactions:
             action.execute(subaction)
             subaction.skill_obj.components.append(parent_condition)
+        unit.reset_skills_cache()
 
     # remove all child skills when the skill is removed
     def after_remove(self, unit, skill):
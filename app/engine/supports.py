@@ -1,5 +1,5 @@
 from dataclasses import dataclass
-from typing import Dict, List, Tuple
+from typing import Dict, List, Set, Tuple
 
 from app.data.database.database import DB
 from app.data.database.supports import SupportRankRequirementList, SupportRank
@@ -114,6 +114,52 @@ class SupportEffect():
 class SupportController():
     def __init__(self):
         self.support_pairs: Dict[NID, SupportPair] = {}
+        # Key: Unit Nid, Value: The support pairs with that unit in them, in database order
+        self.prefabs_by_unit: Dict[NID, List[SupportPrefab]] = {}
+        # Key: Support Pair Nid, Value: Position of the support pair in the database
+        self.prefab_order: Dict[NID, int] = {}
+        # Key: Unit Nid, Value: The support pairs in play with that unit in them
+        self.pairs_by_unit: Dict[NID, List[SupportPair]] = {}
+        self._index_prefabs()
+
+    def _index_prefabs(self):
+        for idx, prefab in enumerate(DB.support_pairs):
+            self.prefab_order[prefab.nid] = idx
+            self.prefabs_by_unit.setdefault(prefab.unit1, []).append(prefab)
+            if prefab.unit2 != prefab.unit1:
+                self.prefabs_by_unit.setdefault(prefab.unit2, []).append(prefab)
+
+    def _index_pair(self, support_pair: SupportPair):
+        self.support_pairs[support_pair.nid] = support_pair
+        unit1, unit2 = support_pair.unit1, support_pair.unit2
+        self.pairs_by_unit.setdefault(unit1, []).append(support_pair)
+        if unit2 != unit1:
+            self.pairs_by_unit.setdefault(unit2, []).append(support_pair)
+
+    def get_prefabs(self, unit_nid: NID) -> List[SupportPrefab]:
+        """
+        Every support pair in the database that the unit is part of
+        """
+        return self.prefabs_by_unit.get(unit_nid, [])
+
+    def get_prefab(self, unit1_nid: NID, unit2_nid: NID) -> SupportPrefab:
+        for prefab in self.get_prefabs(unit1_nid):
+            if (prefab.unit1 == unit1_nid and prefab.unit2 == unit2_nid) or \
+                    (prefab.unit1 == unit2_nid and prefab.unit2 == unit1_nid):
+                return prefab
+        return None
+
+    def get_shared_prefabs(self, unit_nids: Set[NID]) -> List[SupportPrefab]:
+        """
+        Every support pair in the database where both units are in unit_nids, in database order
+        """
+        prefabs = []
+        for unit_nid in unit_nids:
+            for prefab in self.get_prefabs(unit_nid):
+                # Only count each pair from its first unit
+                if prefab.unit1 == unit_nid and prefab.unit2 in unit_nids:
+                    prefabs.append(prefab)
+        return sorted(prefabs, key=lambda prefab: self.prefab_order[prefab.nid])
 
     def get(self, unit1_nid: str, unit2_nid: str) -> SupportPair:
         nid = "%s | %s" % (unit1_nid, unit2_nid)
@@ -131,7 +177,7 @@ class SupportController():
             return self.support_pairs[prefab.nid]
 
         new_support_pair = SupportPair(nid)
-        self.support_pairs[nid] = new_support_pair
+        self._index_pair(new_support_pair)
         return new_support_pair
 
     def save(self):
@@ -142,16 +188,15 @@ class SupportController():
         self = cls()
         for support_pair_dat in s_list:
             support_pair = SupportPair.restore(support_pair_dat)
-            self.support_pairs[support_pair.nid] = support_pair
+            self._index_pair(support_pair)
         return self
 
     def get_pairs(self, unit_nid: str) -> list:
         pairs = []
-        for prefab in DB.support_pairs:
-            if prefab.unit1 == unit_nid or prefab.unit2 == unit_nid:
-                if prefab.nid not in self.support_pairs:
-                    self.create_pair(prefab.nid)
-                pairs.append(self.support_pairs[prefab.nid])
+        for prefab in self.get_prefabs(unit_nid):
+            if prefab.nid not in self.support_pairs:
+                self.create_pair(prefab.nid)
+            pairs.append(self.support_pairs[prefab.nid])
         return pairs
 
     def get_bonus_pairs(self, unit_nid: str) -> list:
@@ -159,7 +204,8 @@ class SupportController():
         Only gets the pairs that could conceivably give out a support bonus
         """
         pairs = []
-        for key, pair in self.support_pairs.items():
+        for pair in self.pairs_by_unit.get(unit_nid, []):
+            key = pair.nid
             prefab = DB.support_pairs.get(key)
             if not prefab:  # In case you somehow deleted a pair!
                 logging.warning("Support Pair with key %s no longer exists in database! Skipping..." % key)
@@ -237,11 +283,11 @@ class SupportController():
             return dist <= r
 
     def get_specific_bonus(self, unit1, unit2, highest_rank):
-        for pair in DB.support_pairs:
-            if (pair.unit1 == unit1.nid and pair.unit2 == unit2.nid) or (pair.unit1 == unit2.nid and pair.unit2 == unit1.nid):
-                for support_rank_req in pair.requirements:
-                    if support_rank_req.support_rank == highest_rank:
-                        return support_rank_req
+        pair = self.get_prefab(unit1.nid, unit2.nid)
+        if pair:
+            for support_rank_req in pair.requirements:
+                if support_rank_req.support_rank == highest_rank:
+                    return support_rank_req
         return None
 
     def get_bonus(self, unit1, unit2, highest_rank) -> SupportEffect:
@@ -316,9 +362,8 @@ def increment_end_chapter_supports():
                 units.append(game.get_unit(unit.traveler))
 
         unit_nids = {unit.nid for unit in units}
-        for support_prefab in DB.support_pairs:
-            if support_prefab.unit1 in unit_nids and support_prefab.unit2 in unit_nids:
-                action.do(action.IncrementSupportPoints(support_prefab.nid, inc))
+        for support_prefab in game.supports.get_shared_prefabs(unit_nids):
+            action.do(action.IncrementSupportPoints(support_prefab.nid, inc))
 
     # Reset max number of support points and rank that can be gotten in one chapter
     for pair in game.supports.support_pairs.values():
@@ -385,11 +430,11 @@ def increment_unit_end_turn_supports(unit: UnitObject) -> List[Tuple[UnitObject,
     pairs = []
     if inc:
         dist = DB.support_constants.value('growth_range')
-        units = [u for u in game.units if u.position and not u.generic and u.team == unit.team and u is not unit]
-        unit_nids = {unit.nid for unit in units}
-        for support_prefab in DB.support_pairs:
-            if (support_prefab.unit1 in unit_nids and support_prefab.unit2 == unit.nid) or \
-               (support_prefab.unit2 in unit_nids and support_prefab.unit1 == unit.nid):
+        for support_prefab in game.supports.get_prefabs(unit.nid):
+            other_nid = support_prefab.unit2 if support_prefab.unit1 == unit.nid else support_prefab.unit1
+            other_unit = game.get_unit(other_nid)
+            if other_unit and other_unit is not unit and other_unit.position and \
+                    not other_unit.generic and other_unit.team == unit.team:
                 _increment_end_turn_supports(support_prefab, dist, inc, pairs)
                 
     return pairs
@@ -417,9 +462,8 @@ def increment_team_end_turn_supports(team: NID = 'player') -> List[Tuple[UnitObj
         dist = DB.support_constants.value('growth_range')
         units = [unit for unit in game.units if unit.position and not unit.generic and unit.team == team]
         unit_nids = {unit.nid for unit in units}
-        for support_prefab in DB.support_pairs:
-            if support_prefab.unit1 in unit_nids and support_prefab.unit2 in unit_nids:
-                _increment_end_turn_supports(support_prefab, dist, inc, pairs)
+        for support_prefab in game.supports.get_shared_prefabs(unit_nids):
+            _increment_end_turn_supports(support_prefab, dist, inc, pairs)
     return pairs
 
 def increment_end_combat_supports(combatant, target=None) -> List[Tuple[UnitObject, UnitObject]]:
@@ -434,17 +478,12 @@ def increment_end_combat_supports(combatant, target=None) -> List[Tuple[UnitObje
     pairs = []
     if inc:
         dist = DB.support_constants.value('growth_range')
-        units = [unit for unit in game.units if unit.position and not unit.generic and unit.team == combatant.team and unit is not combatant]
-        unit_nids = {unit.nid for unit in units}
-        for support_prefab in DB.support_pairs:
-            other_unit = None
-            if support_prefab.unit1 == combatant.nid and support_prefab.unit2 in unit_nids:
-                other_unit = game.get_unit(support_prefab.unit2)
-            elif support_prefab.unit2 == combatant.nid and support_prefab.unit1 in unit_nids:
-                other_unit = game.get_unit(support_prefab.unit1)
-            if not other_unit:
+        for support_prefab in game.supports.get_prefabs(combatant.nid):
+            other_nid = support_prefab.unit2 if support_prefab.unit1 == combatant.nid else support_prefab.unit1
+            other_unit = game.get_unit(other_nid)
+            if not other_unit or other_unit is combatant or not other_unit.position or \
+                    other_unit.generic or other_unit.team != combatant.team:
                 continue
-            assert other_unit.position is not None
 
             if dist == 0 and target:
                 if target.position in game.target_system.get_attackable_positions(other_unit, force=True):
@@ -465,7 +504,7 @@ def increment_supports(combatant, partner, constant: str) -> bool:
     inc = DB.support_constants.value(constant)
     success: bool = False
     if inc:
-        for support_prefab in DB.support_pairs:
+        for support_prefab in game.supports.get_prefabs(combatant.nid):
             if (support_prefab.unit1 == combatant.nid and support_prefab.unit2 == partner.nid) or \
                     (support_prefab.unit2 == combatant.nid and support_prefab.unit1 == partner.nid):
                 action.do(action.IncrementSupportPoints(support_prefab.nid, inc))
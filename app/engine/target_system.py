@@ -7,6 +7,7 @@ from app.engine import (combat_calcs, item_funcs, item_system,
                         line_of_sight, skill_system)
 from app.engine.movement import movement_funcs
 from app.engine.game_state import GameState
+from app.engine.utils.ltcache import ltcached
 from app.utilities import utils
 from app.utilities.typing import Pos
 from app.engine.combat.utils import resolve_weapon
@@ -513,14 +514,8 @@ class TargetSystem():
         if attacker.team == defender.team:  # If you are the same team. Catches components who define their own check_ally function
             return None, None
 
-        attacker_partner = None
-        defender_partner = None
-        attacker_adj_allies = self.get_adj_allies(attacker)
-        attacker_adj_allies = [ally for ally in attacker_adj_allies if ally.get_weapon() and not item_system.cannot_be_dual_strike_partner(ally, ally.get_weapon())]
-        defender_adj_allies = self.get_adj_allies(defender)
-        defender_adj_allies = [ally for ally in defender_adj_allies if ally.get_weapon() and not item_system.cannot_be_dual_strike_partner(ally, ally.get_weapon())]
-        attacker_partner = self.strike_partner_formula(attacker_adj_allies, attacker, defender, 'attack', (0, 0))
-        defender_partner = self.strike_partner_formula(defender_adj_allies, defender, attacker, 'defense', (0, 0))
+        attacker_partner = self._get_best_strike_partner(self.get_strike_partner_candidates(attacker), attacker, defender, 'attack')
+        defender_partner = self._get_best_strike_partner(self.get_strike_partner_candidates(defender), defender, attacker, 'defense')
 
         if item_system.cannot_have_dual_strike_partner(attacker, item):
             attacker_partner = None
@@ -537,6 +532,19 @@ class TargetSystem():
             return None, None
         return attacker_partner, defender_partner
 
+    @ltcached
+    def get_strike_partner_candidates(self, unit: UnitObject) -> Tuple[UnitObject, ...]:
+        """Returns the adjacent allies of the unit that could be its strike partner.
+        Remembered until the game state changes (ie, a unit moves), since the forecast
+        and the AI ask for the same unit's candidates over and over"""
+        return tuple(ally for ally in self.get_adj_allies(unit)
+                     if ally.get_weapon() and not item_system.cannot_be_dual_strike_partner(ally, ally.get_weapon()))
+
+    @ltcached
+    def _get_best_strike_partner(self, allies: Tuple[UnitObject, ...], attacker: UnitObject, defender: UnitObject,
+                                 mode: Literal['attack', 'defense', 'splash']) -> Optional[UnitObject]:
+        return self.strike_partner_formula(list(allies), attacker, defender, mode, (0, 0))
+
     def strike_partner_formula(self, allies: list[UnitObject], attacker: UnitObject, defender: UnitObject,
                                mode: Literal['attack', 'defense', 'splash'], attack_info: list[int]) -> Optional[UnitObject]:
         """This is the formula for the best choice to make when autoselecting strike partners."""
@@ -0,0 +1,116 @@
+"""
+Finds registered units by position or team, without looking at every unit in the registry.
+A unit is in a spatial bucket only while it has a position, so the buckets
+also say which units are on the map.
+
+The game owns one index, which is filled whenever units are registered.
+Each registered unit points back at the index, and its position and team
+setters tell the index whenever they change. So the index always agrees
+with unit.position, even when a unit moves without going through the board
+(walking along a path, a test arrive, an AI hypothetical move).
+
+Units are kept by their identity rather than their nid, since a unit's nid can change.
+Results come back in the order the units were registered, which is the order of game.units.
+"""
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Dict, Iterable, List, Optional, Tuple
+
+from app.utilities.typing import NID, Pos
+
+if TYPE_CHECKING:
+    from app.engine.objects.unit import UnitObject
+
+# Width and height in tiles of each spatial bucket
+UNIT_BUCKET_SIZE = 8
+
+class UnitIndex():
+    def __init__(self):
+        # Key: id of the unit, Value: When the unit was registered
+        self.order: Dict[int, int] = {}
+        self.next_order: int = 0
+        # Key: (x // UNIT_BUCKET_SIZE, y // UNIT_BUCKET_SIZE), Value: Units positioned in that bucket, by id
+        self.buckets: Dict[Tuple[int, int], Dict[int, UnitObject]] = {}
+        # Key: Team nid, Value: Units on that team, by id
+        self.teams: Dict[NID, Dict[int, UnitObject]] = {}
+
+    def reset(self, units: Iterable[UnitObject]):
+        """Called whenever the whole unit registry is replaced"""
+        for team in self.teams.values():
+            for unit in team.values():
+                unit._unit_index = None
+        self.order.clear()
+        self.next_order = 0
+        self.buckets.clear()
+        self.teams.clear()
+        for unit in units:
+            self.add(unit)
+
+    def add(self, unit: UnitObject, replaces: Optional[UnitObject] = None):
+        """
+        Adds a newly registered unit. If it replaces another unit
+        in the registry, it also takes that unit's place in the order
+        """
+        if unit._unit_index is self:
+            return
+        if replaces is not None and replaces is not unit and replaces._unit_index is self:
+            order = self.order[id(replaces)]
+            self.remove(replaces)
+        else:
+            order = self.next_order
+            self.next_order += 1
+        self.order[id(unit)] = order
+        unit._unit_index = self
+        self.teams.setdefault(unit.team, {})[id(unit)] = unit
+        self.move(unit, None, unit.position)
+
+    def remove(self, unit: UnitObject):
+        if unit._unit_index is not self:
+            return
+        self.move(unit, unit.position, None)
+        self.teams.get(unit.team, {}).pop(id(unit), None)
+        del self.order[id(unit)]
+        unit._unit_index = None
+
+    def move(self, unit: UnitObject, old_pos: Optional[Pos], new_pos: Optional[Pos]):
+        if old_pos:
+            bucket = self._get_bucket(old_pos)
+            self.buckets[bucket].pop(id(unit), None)
+            if not self.buckets[bucket]:
+                del self.buckets[bucket]
+        if new_pos:
+            self.buckets.setdefault(self._get_bucket(new_pos), {})[id(unit)] = unit
+
+    def change_team(self, unit: UnitObject, old_team: NID, new_team: NID):
+        self.teams.get(old_team, {}).pop(id(unit), None)
+        self.teams.setdefault(new_team, {})[id(unit)] = unit
+
+    def _get_bucket(self, pos: Pos) -> Tuple[int, int]:
+        return (pos[0] // UNIT_BUCKET_SIZE, pos[1] // UNIT_BUCKET_SIZE)
+
+    def _in_order(self, units: Iterable[UnitObject]) -> List[UnitObject]:
+        return sorted(units, key=lambda unit: self.order[id(unit)])
+
+    def get_units_in_area(self, x1: int, y1: int, x2: int, y2: int) -> List[UnitObject]:
+        """Every unit positioned in the rectangle from (x1, y1) to (x2, y2) inclusive"""
+        bx1, by1 = self._get_bucket((x1, y1))
+        bx2, by2 = self._get_bucket((x2, y2))
+        if (bx2 - bx1 + 1) * (by2 - by1 + 1) > len(self.buckets):
+            # Large areas are quicker to check bucket by bucket
+            buckets = [bucket for (bx, by), bucket in self.buckets.items() if bx1 <= bx <= bx2 and by1 <= by <= by2]
+        else:
+            buckets = [self.buckets.get((bx, by), {}) for bx in range(bx1, bx2 + 1) for by in range(by1, by2 + 1)]
+        units = []
+        for bucket in buckets:
+            for unit in bucket.values():
+                x, y = unit.position
+                if x1 <= x <= x2 and y1 <= y <= y2:
+                    units.append(unit)
+        return self._in_order(units)
+
+    def get_units_at(self, pos: Pos) -> List[UnitObject]:
+        return self.get_units_in_area(pos[0], pos[1], pos[0], pos[1])
+
+    def get_team_units(self, team: NID) -> List[UnitObject]:
+        """Every unit on the team, on the map or not"""
+        return self._in_order(self.teams.get(team, {}).values())
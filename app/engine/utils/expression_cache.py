@@ -0,0 +1,25 @@
+import functools
+import logging
+from types import CodeType
+
+# How many different expressions to keep compiled at once
+EXPRESSION_CACHE_SIZE = 1024
+
+@functools.lru_cache(maxsize=EXPRESSION_CACHE_SIZE)
+def compile_expression(string: str) -> CodeType:
+    """
+    Compiles an expression the same way `eval` would compile a string,
+    but only once per string. Syntax errors are not cached, so they
+    are raised again every time the expression is used
+    """
+    return compile(string, '<string>', 'eval')
+
+def clear():
+    compile_expression.cache_clear()
+
+def log_stats():
+    info = compile_expression.cache_info()
+    total = info.hits + info.misses
+    rate = info.hits / total if total else 0
+    logging.info("Compiled expressions: %d hits, %d misses (%.1f%%), %d/%d cached",
+                 info.hits, info.misses, rate * 100, info.currsize, info.maxsize)
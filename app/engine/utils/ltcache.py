@@ -1,5 +1,8 @@
 import functools
+import logging
 import uuid
+from collections import Counter
+from typing import Any, Dict, Tuple
 
 class LTCache():
     _state: uuid.UUID
@@ -45,4 +48,109 @@ def ltcached(func):
             func.cache_clear()
             prev_state = curr_state
         return func(*args, **kwargs)
-    return wrapper
\ No newline at end of file
+    return wrapper
+
+class HookCache():
+    """
+    Memoizes the results of pure skill and item hooks.
+
+    Like ltcached, every result is thrown away when the game state changes,
+    since skill conditions can read anything in the game (other units, the
+    turn count, game vars). Within one state, units and items can still change
+    outside of an action (a unit walking tile by tile, equipping an item), so
+    every unit and item also has a version that is bumped whenever it is
+    touched, and a cached result is only reused while the versions of all of
+    its arguments are unchanged. While an action is being done or reversed the
+    cache is bypassed, since the objects are in the middle of changing.
+    """
+    def __init__(self):
+        self.enabled = True
+        # The game state the cached results were computed in
+        self.state = None
+        # Key: Unit or item, Value: Number of times it has been touched
+        self.versions: Dict[Any, int] = {}
+        # Key: (Hook name, args), Value: (Versions of the args, result)
+        self.results: Dict[Tuple, Tuple[Tuple[int, ...], Any]] = {}
+        # How many actions are currently in progress
+        self.mutation_depth = 0
+        self.hits: Counter = Counter()
+        self.misses: Counter = Counter()
+
+    def touch(self, obj):
+        self.versions[obj] = self.versions.get(obj, 0) + 1
+
+    def clear(self):
+        """Throws away every cached result. Call when state that is not tied to a unit or item changes"""
+        self.versions.clear()
+        self.results.clear()
+
+    def clear_stats(self):
+        self.hits.clear()
+        self.misses.clear()
+
+    def hit_rates(self) -> Dict[str, Tuple[int, int, float]]:
+        """Returns (hits, misses, hit rate) for every cached hook that has been called"""
+        rates = {}
+        for hook_name in set(self.hits) | set(self.misses):
+            hits, misses = self.hits[hook_name], self.misses[hook_name]
+            rates[hook_name] = (hits, misses, hits / (hits + misses))
+        return rates
+
+    def log_stats(self):
+        for hook_name, (hits, misses, rate) in sorted(self.hit_rates().items()):
+            logging.info("%s: %d hits, %d misses (%.1f%%)", hook_name, hits, misses, rate * 100)
+
+HOOK_CACHE = HookCache()
+
+def set_hook_cache_enabled(enabled: bool):
+    """Turn off to debug whether a hook is not as pure as it was declared to be"""
+    HOOK_CACHE.enabled = enabled
+    HOOK_CACHE.clear()
+
+def begin_mutation():
+    HOOK_CACHE.mutation_depth += 1
+
+def end_mutation():
+    """
+    Called once an action is done. Nothing needs to be thrown away here,
+    since the game state changes right after, which clears the cache
+    """
+    HOOK_CACHE.mutation_depth -= 1
+
+def touch(obj):
+    """Call whenever a unit or item changes outside of an action"""
+    HOOK_CACHE.touch(obj)
+
+def clear_hook_cache():
+    HOOK_CACHE.clear()
+
+def hook_cached(func):
+    """
+    Decorator for pure hooks. Caches the result for each set of args
+    until one of the args is touched or the game state changes.
+    """
+    hook_name = "%s.%s" % (func.__module__.split('.')[-1], func.__name__)
+    cache = HOOK_CACHE
+    @functools.wraps(func)
+    def wrapper(*args):
+        if not cache.enabled or cache.mutation_depth:
+            return func(*args)
+        state = get_state()
+        if state != cache.state:
+            cache.clear()
+            cache.state = state
+        key = (hook_name, args)
+        versions = cache.versions
+        try:
+            stamp = tuple([versions.get(arg, 0) for arg in args])
+            entry = cache.results.get(key)
+        except TypeError:  # Unhashable args cannot be cached
+            return func(*args)
+        if entry is not None and entry[0] == stamp:
+            cache.hits[hook_name] += 1
+            return entry[1]
+        cache.misses[hook_name] += 1
+        result = func(*args)
+        cache.results[key] = (stamp, result)
+        return result
+    return wrapper
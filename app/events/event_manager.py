@@ -26,11 +26,20 @@ class EventManager():
                 event_source_nid = game.level_nid
             else:
                 event_source_nid = None
-        for event_prefab in DB.events.get(trigger.nid, event_source_nid):
+        event_prefabs = DB.events.get(trigger.nid, event_source_nid)
+        if not event_prefabs:
+            return triggered_events
+        already_triggered_events = set(game.already_triggered_events)
+        args = None
+        for event_prefab in event_prefabs:
+            # Only once events that have already happened don't need their condition checked
+            if event_prefab.nid in already_triggered_events:
+                continue
             try:
-                args = trigger.to_args()
+                if args is None:
+                    args = trigger.to_args()
                 result = evaluate.evaluate(event_prefab.condition, unit1=args.get('unit1', None), unit2=args.get('unit2', None), position=args.get('position', None), local_args=args)
-                if event_prefab.nid not in game.already_triggered_events and result:
+                if result:
                     triggered_events.append(event_prefab)
             except:
                 logging.error("Condition {%s} could not be evaluated" % event_prefab.condition)
@@ -24,6 +24,10 @@ def get_event_version(script: str) -> EventVersion.EVENT:
         return EventVersion.EVENT
 
 class EventPrefab(Prefab):
+    # Goes up whenever any event's trigger or level changes,
+    # so the event catalogs know their trigger index is out of date
+    trigger_version = 0
+
     def __init__(self, name):
         self.name = name
         self.trigger = None
@@ -35,6 +39,11 @@ class EventPrefab(Prefab):
 
         self._source: List[str] = []
 
+    def __setattr__(self, name, value):
+        if name in ('trigger', 'level_nid'):
+            EventPrefab.trigger_version += 1
+        super().__setattr__(name, value)
+
     @property
     def nid(self):
         if not self.name:
@@ -97,10 +106,56 @@ class EventCatalog(Data[EventPrefab]):
     def __init__(self, vals: List[EventPrefab] | None = None):
         super().__init__(vals)
         self.inspector = EventInspectorEngine(self)
+        # Key: (Trigger nid, Level nid), Value: The events with that trigger that can happen in that level
+        self._trigger_index: Dict[Tuple[NID, NID], List[EventPrefab]] = {}
+        self._indexed_version: int = None
+
+    def _clear_trigger_index(self):
+        self._trigger_index.clear()
+        self._indexed_version = None
 
     def get(self, trigger_nid, level_nid):
-        return [event for event in self._list if event.trigger == trigger_nid and
-                (not event.level_nid or event.level_nid == level_nid)]
+        if self._indexed_version != EventPrefab.trigger_version:
+            self._clear_trigger_index()
+            self._indexed_version = EventPrefab.trigger_version
+        key = (trigger_nid, level_nid)
+        if key not in self._trigger_index:
+            self._trigger_index[key] = [event for event in self._list if event.trigger == trigger_nid and
+                                        (not event.level_nid or event.level_nid == level_nid)]
+        return self._trigger_index[key][:]
+
+    # Anything that changes which events are in the catalog, or their order, must clear the trigger index
+    def append(self, val: EventPrefab, overwrite: bool = False):
+        super().append(val, overwrite)
+        self._clear_trigger_index()
+
+    def delete(self, val: EventPrefab):
+        super().delete(val)
+        self._clear_trigger_index()
+
+    def remove_key(self, key: NID):
+        super().remove_key(key)
+        self._clear_trigger_index()
+
+    def pop(self, idx: Optional[int] = None):
+        super().pop(idx)
+        self._clear_trigger_index()
+
+    def insert(self, idx: int, val: EventPrefab):
+        super().insert(idx, val)
+        self._clear_trigger_index()
+
+    def clear(self):
+        super().clear()
+        self._clear_trigger_index()
+
+    def sort(self, sort_func=None):
+        super().sort(sort_func)
+        self._clear_trigger_index()
+
+    def move_index(self, old_index: int, new_index: int):
+        super().move_index(old_index, new_index)
+        self._clear_trigger_index()
 
     def get_by_level(self, level_nid: Optional[NID]) -> List[EventPrefab]:
         return [event for event in self._list if (not event.level_nid or not level_nid or event.level_nid == level_nid)]
@@ -1,7 +1,8 @@
 from __future__ import annotations
 
+import functools
 import logging
-from typing import List, Optional, Tuple
+from typing import Dict, List, Optional, Tuple
 
 from app.engine.text_evaluator import TextEvaluator
 from app.events import event_commands
@@ -64,11 +65,89 @@ class IteratorInfo():
         self.iterator = EventIterator.restore(s_dict['iterator'])
         return self
 
+class CompiledScript():
+    """
+    The parsed commands of an event script, along with where each
+    conditional and loop jumps to. Shared by every run of the same script,
+    so the commands must never be changed.
+    """
+    def __init__(self, script: str):
+        self.commands: List[event_commands.EventCommand] = event_commands.parse_script_to_commands(script)
+        # Key: Index of an if, elif, else or for, Value: Index just past the end of its block
+        self.ends: Dict[int, int] = {}
+        # Key: Index of an if or elif, Value: (Whether it's an elif, Index to go to if the conditional is false)
+        self.next_clauses: Dict[int, Tuple[bool, int]] = {}
+
+    def find_end(self, index: int) -> int:
+        """given an index of an if, elif, else, for, or while command,
+        gets the index of the end of the entire block.
+        """
+        if index not in self.ends:
+            self.ends[index] = self._find_end(index)
+        return self.ends[index]
+
+    def _find_end(self, index: int) -> int:
+        base_conditional = self.commands[index]
+        start_command = 'if'
+        end_command = 'end'
+        if base_conditional.nid in ('if', 'elif', 'else'):
+            pass
+        elif base_conditional.nid == 'for':
+            start_command = 'for'
+            end_command = 'endf'
+        else:
+            raise TypeError("%s is not a conditional command" % str(base_conditional))
+        level = 0
+        curr_index = index + 1
+        while curr_index < len(self.commands):
+            curr_command = self.commands[curr_index]
+            if curr_command.nid == start_command:
+                level += 1
+            elif curr_command.nid == end_command:
+                if level == 0:
+                    return curr_index + 1
+                else:
+                    level -= 1
+            curr_index += 1
+        raise SyntaxError("Line %d: %s has no corresponding terminator" % (index, str(base_conditional)))
+
+    def find_next_clause(self, index: int) -> Tuple[bool, int]:
+        """Given an index of an if or elif, returns where to go if it is false:
+        either (True, index of the next elif), or (False, index just past the next else or end)"""
+        if index not in self.next_clauses:
+            self.next_clauses[index] = self._find_next_clause(index)
+        return self.next_clauses[index]
+
+    def _find_next_clause(self, index: int) -> Tuple[bool, int]:
+        level = 0
+        curr_index = index + 1
+        while(curr_index) < len(self.commands):
+            curr_command = self.commands[curr_index]
+            if level == 0:
+                if curr_command.nid in ('elif',):
+                    return True, curr_index
+                elif curr_command.nid in ('end', 'else'):
+                    return False, curr_index + 1
+            if curr_command.nid == 'if':
+                level += 1
+            elif curr_command.nid == 'end':
+                level -= 1
+            curr_index += 1
+        # have not found end clause
+        # maybe throw instead?
+        raise SyntaxError("Line %d: %s has no corresponding terminator" % (index, str(self.commands[index])))
+
+@functools.lru_cache(maxsize=256)
+def compile_script(script: str) -> CompiledScript:
+    """Each script is only parsed once. Editing a script changes its text, so it gets parsed again"""
+    return CompiledScript(script)
+
 class EventProcessor():
     def __init__(self, nid: NID, script: str, text_evaluator: TextEvaluator):
         self.nid = nid
         self.script = script
-        self.commands: List[event_commands.EventCommand] = event_commands.parse_script_to_commands(script)
+        self.compiled_script: CompiledScript = compile_script(script)
+        self.commands: List[event_commands.EventCommand] = self.compiled_script.commands
         self.command_pointer = 0
 
         self.logger = logging.getLogger()
@@ -107,52 +186,17 @@ class EventProcessor():
         truth = self._get_truth(base_conditional)
         if truth:
             return index + 1
-        # not true, so seek next clause
-        level = 0
-        curr_index = index + 1
-        while(curr_index) < len(self.commands):
-            curr_command = self.commands[curr_index]
-            if level == 0:
-                if curr_command.nid in ('elif',):
-                    return self._jump_conditional(curr_index)
-                elif curr_command.nid in ('end', 'else'):
-                    return curr_index + 1
-            if curr_command.nid == 'if':
-                level += 1
-            elif curr_command.nid == 'end':
-                level -= 1
-            curr_index += 1
-        # have not found end clause
-        # maybe throw instead?
-        raise SyntaxError("Line %d: %s has no corresponding terminator" % (index, str(base_conditional)))
+        # not true, so go to the next clause
+        is_elif, next_index = self.compiled_script.find_next_clause(index)
+        if is_elif:
+            return self._jump_conditional(next_index)
+        return next_index
 
     def _find_end(self, index: int) -> int:
         """given an index of an if, elif, else, for, or while command,
         gets the index of the end of the entire block.
         """
-        base_conditional = self.commands[index]
-        start_command = 'if'
-        end_command = 'end'
-        if base_conditional.nid in ('if', 'elif', 'else'):
-            pass
-        elif base_conditional.nid == 'for':
-            start_command = 'for'
-            end_command = 'endf'
-        else:
-            raise TypeError("%s is not a conditional command" % str(base_conditional))
-        level = 0
-        curr_index = index + 1
-        while curr_index < len(self.commands):
-            curr_command = self.commands[curr_index]
-            if curr_command.nid == start_command:
-                level += 1
-            elif curr_command.nid == end_command:
-                if level == 0:
-                    return curr_index + 1
-                else:
-                    level -= 1
-            curr_index += 1
-        raise SyntaxError("Line %d: %s has no corresponding terminator" % (index, str(base_conditional)))
+        return self.compiled_script.find_end(index)
 
     def _build_iterator(self, index: int, command: event_commands.EventCommand) -> IteratorInfo:
         iterator_nid = command.parameters['Nid']
@@ -218,7 +262,8 @@ class EventProcessor():
             self.command_pointer += 1
             # evaluate and process command
             parameters, flags = event_commands.convert_parse(command, self._evaluate_all)
-            return command.__class__(parameters, flags, command.display_values)
+            # The parsed command is shared with every other run of this script, so don't share its flags
+            return command.__class__(parameters, set(flags), command.display_values)
 
     def finished(self):
         return self.command_pointer >= len(self.commands)
@@ -1,3 +1,4 @@
+from functools import lru_cache
 from typing import Dict, Type
 from app.events.event_prefab import get_event_version
 from app.events.event_version import EventVersion
@@ -10,9 +11,24 @@ VERSION_MAP: Dict[EventVersion, Type[SWSCompilerV1]] = {
     EventVersion.PYEV1: SWSCompilerV1
 }
 
+# How many (event, source, command pointer) compilations to keep around
+COMPILED_EVENT_CACHE_SIZE = 128
+
 class Compiler():
     @staticmethod
     def compile(event_name: str, script: str, command_pointer: int = 0) -> CompiledEvent:
+        """
+        Compiled events are shared between every processor running the same
+        event source from the same command pointer, so they must not be modified
+        """
+        return _compile_event(event_name, script, command_pointer)
+
+    @staticmethod
+    def clear_cache():
+        _compile_event.cache_clear()
+
+    @staticmethod
+    def compile_uncached(event_name: str, script: str, command_pointer: int = 0) -> CompiledEvent:
         version = get_event_version(script)
         if not version in VERSION_MAP:
             raise ValueError("In event %s: Unknown python event version: '%s'" %(event_name, version))
@@ -30,3 +46,9 @@ class Compiler():
         sws_compiler = VERSION_MAP[version]
         sentinel_script = sws_compiler(script).compile_sws()
         return AnalyzerPostComp.postcomp(sentinel_script)
+
+@lru_cache(maxsize=COMPILED_EVENT_CACHE_SIZE)
+def _compile_event(event_name: str, script: str, command_pointer: int) -> CompiledEvent:
+    # The event version is read from the script itself, so the source is enough to
+    # tell which compiler it needs
+    return Compiler.compile_uncached(event_name, script, command_pointer)
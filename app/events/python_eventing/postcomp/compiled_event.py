@@ -1,7 +1,9 @@
 from dataclasses import dataclass
+from functools import cached_property
 import sys
 import traceback
-from typing import Generator
+from types import CodeType
+from typing import Generator, List
 from app.engine.evaluate import get_context
 from app.engine.game_state import GameState
 from app.events.python_eventing.errors import InvalidPythonError
@@ -14,9 +16,18 @@ class CompiledEvent():
     source: str         # original source code of event
     compiled: str       # pythonic source code of event
 
+    @cached_property
+    def code(self) -> CodeType:
+        # filename must stay "<string>" so errors can be traced back to the event source
+        return compile(self.compiled, '<string>', 'exec')
+
+    @cached_property
+    def source_lines(self) -> List[str]:
+        return self.source.split('\n')
+
     def get_runnable(self, game: GameState, context: dict=None) -> Generator:
         exec_context = get_context(game=game, local_args=context)
-        exec(self.compiled, exec_context)
+        exec(self.code, exec_context)
         # possibility that there are some errors in python script
         try:
             gen = exec_context[EVENT_GEN_NAME]()
@@ -26,9 +37,8 @@ class CompiledEvent():
             _, _, exc_tb = sys.exc_info()
             exception_lineno = traceback.extract_tb(exc_tb)[-1][1]
             diff_lines = self._num_diff_lines()
-            source_as_lines = self.source.split('\n')
             true_lineno = exception_lineno - diff_lines
-            failing_line = source_as_lines[true_lineno - 1]
+            failing_line = self.source_lines[true_lineno - 1]
             exc = InvalidPythonError(self.event, true_lineno, failing_line)
             exc.what = str(e)
             raise exc from e
@@ -36,4 +46,4 @@ class CompiledEvent():
 
     def _num_diff_lines(self):
         generator_idx = self.compiled.index(EVENT_GEN_NAME)
-        return self.compiled[:generator_idx].count('\n') + 1
\ No newline at end of file
+        return self.compiled[:generator_idx].count('\n') + 1
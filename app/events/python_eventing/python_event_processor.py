@@ -1,5 +1,4 @@
 from __future__ import annotations
-from functools import lru_cache
 
 import sys
 import traceback
@@ -19,13 +18,11 @@ class PythonEventProcessor():
         self.source = source
         self.curr_cmd_idx = curr_cmd_idx
         self.is_finished = False
-        self._compiled_script = Compiler.compile(nid, source, 0)
+        self._compiled_script = Compiler.compile(nid, source, curr_cmd_idx)
         self._executable = self._compiled_script.get_runnable(game, context)
 
-    @lru_cache()
     def get_source_line(self, line: int) -> str:
-        as_lines = self.source.split('\n')
-        return as_lines[line]
+        return self._compiled_script.source_lines[line]
 
     def get_current_line(self) -> int:
         return self._executable.gi_frame.f_lineno - self._executable.gi_code.co_firstlineno - 1
@@ -76,8 +73,4 @@ class PythonEventProcessor():
     def restore(cls, s_dict, game: GameState) -> PythonEventProcessor:
         source = s_dict['source']
         nid = s_dict['nid']
-        self = cls(nid, source, game)
-        self.curr_cmd_idx = s_dict['curr_cmd_idx']
-        self._compiled_script = Compiler.compile(nid, source, self.curr_cmd_idx)
-        self._executable = self._compiled_script.get_runnable(game)
-        return self
+        return cls(nid, source, game, s_dict['curr_cmd_idx'])
@@ -0,0 +1,68 @@
+"""
+Micro-benchmark for the skill and item hook dispatch used by combat_calcs.
+
+Not part of the unit test suite (does not match test*.py).
+Run with `python -m app.tests.bench_combat_calcs`
+"""
+import time
+from unittest.mock import patch
+
+from app.data.database.database import DB
+from app.data.serialization.versions import CURRENT_SERIALIZATION_VERSION
+from app.engine.codegen import source_generator
+
+def scan_item_hook_components(unit, item, hook_name: str) -> list:
+    """What every item hook used to do: check every component for the hook"""
+    from app.engine import item_system
+    return [component for component in item_system.get_all_components(unit, item) if component.defines(hook_name)]
+
+def scan_item_own_hook_components(item, hook_name: str) -> list:
+    return [component for component in item.components if component.defines(hook_name)]
+
+def scan_skill_hook_components(unit, *hook_names: str) -> list:
+    """What every skill hook used to do: check every component of every skill for the hook"""
+    from app.engine import skill_system
+    return skill_system.find_hook_components(unit.skills, hook_names)
+
+def time_it(func, num_trials: int) -> float:
+    start = time.perf_counter_ns()
+    for _ in range(num_trials):
+        func()
+    end = time.perf_counter_ns()
+    return (end - start) / 1e3 / num_trials
+
+def run(num_trials: int = 2000):
+    DB.load('testing_proj.ltproj', CURRENT_SERIALIZATION_VERSION)
+    source_generator.generate_component_system_source()
+    from app.engine import combat_calcs, equations
+    from app.engine.objects.item import ItemObject
+    from app.engine.objects.unit import UnitObject
+    equations.clear()
+
+    unit = UnitObject.from_prefab(DB.units.get('Eirika'))
+    target = UnitObject.from_prefab(DB.units.get('Seth'))
+    item = ItemObject.from_prefab(DB.items.get('Rapier'))
+    item.owner_nid = unit.nid
+    def_item = ItemObject.from_prefab(DB.items.get('Iron_Lance'))
+    def_item.owner_nid = target.nid
+
+    def hit():
+        return combat_calcs.compute_hit(unit, target, item, def_item, 'attack', (0, 0))
+
+    def damage():
+        return combat_calcs.compute_damage(unit, target, item, def_item, 'attack', (0, 0))
+
+    print("%-16s %14s %14s %8s" % ("Function", "scan (us)", "indexed (us)", "Speedup"))
+    for name, func in (('compute_hit', hit), ('compute_damage', damage)):
+        with patch('app.engine.item_system.get_hook_components', scan_item_hook_components), \
+             patch('app.engine.item_system.get_item_hook_components', scan_item_own_hook_components), \
+             patch('app.engine.skill_system.get_hook_components', scan_skill_hook_components):
+            before_value = func()
+            before = time_it(func, num_trials)
+        after_value = func()
+        after = time_it(func, num_trials)
+        assert before_value == after_value, "%s changed from %s to %s" % (name, before_value, after_value)
+        print("%-16s %14.1f %14.1f %7.2fx" % (name, before, after, before / after))
+
+if __name__ == '__main__':
+    run()
@@ -0,0 +1,82 @@
+"""
+Micro-benchmark for the pathfinders on large maps.
+
+Not part of the unit test suite (does not match test*.py).
+Run with `python -m app.tests.bench_pathfinding`
+"""
+import random
+import time
+from typing import List, Tuple
+
+from app.engine.pathfinding import flood_fill, pathfinding
+from app.engine.pathfinding.cost_grid import CostGrid
+from app.engine.pathfinding.node import Node
+from app.utilities.grid import BoundedGrid
+from app.utilities.typing import Pos
+
+def build_grid(width: int, height: int, seed: int = 0) -> BoundedGrid[Node]:
+    """Random map with plains, forests (2), mountains (3), and walls (99)"""
+    r = random.Random(seed)
+    grid = BoundedGrid((width, height), (0, 0, width - 1, height - 1))
+    for x in range(width):
+        for y in range(height):
+            roll = r.random()
+            if roll < 0.1 and 0 < x < width - 1:
+                cost = 99
+            elif roll < 0.25:
+                cost = 3
+            elif roll < 0.45:
+                cost = 2
+            else:
+                cost = 1
+            grid.append(Node(x, y, cost < 99, cost))
+    return grid
+
+def path_cost(grid: BoundedGrid[Node], path: List[Pos]) -> float:
+    # Path is reversed, and the start position is free
+    return sum(grid.get(pos).cost for pos in path[:-1])
+
+def time_it(func, num_trials: int) -> Tuple[float, object]:
+    start = time.perf_counter_ns()
+    for _ in range(num_trials):
+        out = func()
+    end = time.perf_counter_ns()
+    return (end - start) / 1e6 / num_trials, out
+
+def run(sizes=(30, 60, 120), num_trials: int = 10):
+    can_move_through = lambda pos: True
+    print("%-8s %-12s %12s %10s" % ("Size", "Algorithm", "ms/search", "Result"))
+    for size in sizes:
+        grid = build_grid(size, size)
+        start, goal = (0, 0), (size - 1, size - 1)
+
+        def astar():
+            return pathfinding.AStar(start, goal, grid).process(can_move_through)
+
+        def astar_limit():
+            return pathfinding.AStar(start, goal, grid).process(can_move_through, limit=size)
+
+        def thetastar():
+            return pathfinding.ThetaStar(start, goal, grid).process(can_move_through)
+
+        def djikstra():
+            return pathfinding.Djikstra(start, grid).process(can_move_through, 15)
+
+        cost_grid = CostGrid.from_node_grid(grid)
+
+        def flood():
+            return flood_fill.get_reachable(cost_grid, start, 15, grid.bounds)
+
+        ms, path = time_it(astar, num_trials)
+        print("%-8s %-12s %12.3f %10s" % ("%dx%d" % (size, size), "AStar", ms, "cost=%d" % path_cost(grid, path)))
+        ms, path = time_it(astar_limit, num_trials)
+        print("%-8s %-12s %12.3f %10s" % ("", "AStar limit", ms, "len=%d" % len(path)))
+        ms, path = time_it(thetastar, num_trials)
+        print("%-8s %-12s %12.3f %10s" % ("", "ThetaStar", ms, "len=%d" % len(path)))
+        ms, moves = time_it(djikstra, num_trials)
+        print("%-8s %-12s %12.3f %10s" % ("", "Djikstra", ms, "moves=%d" % len(moves)))
+        ms, moves = time_it(flood, num_trials)
+        print("%-8s %-12s %12.3f %10s" % ("", "Flood fill", ms, "moves=%d" % len(moves)))
+
+if __name__ == '__main__':
+    run()
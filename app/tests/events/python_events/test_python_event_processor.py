@@ -5,6 +5,7 @@ from pathlib import Path
 from unittest.mock import MagicMock
 
 from app.events import event_commands
+from app.events.python_eventing.compiler import Compiler
 from app.events.python_eventing.python_event_processor import PythonEventProcessor
 from app.tests.mocks.mock_game import get_mock_game
 
@@ -156,3 +157,20 @@ class PythonEventProcessorUnitTests(unittest.TestCase):
         next_command = processor4_second.fetch_next_command()
         self.assertTrue(isinstance(next_command, event_commands.Alert))
         self.assertEqual(next_command.parameters['String'], 'ExecutingWhile')
+
+    def test_compiled_event_is_shared(self):
+        script_path = Path(__file__).parent / 'data' / 'test_save_event_state.pyevent'
+        script_source = script_path.read_text()
+        Compiler.clear_cache()
+        processor = PythonEventProcessor('test_save_event_state', script_source, self.mock_game)
+        processor2 = PythonEventProcessor('test_save_event_state', script_source, self.mock_game)
+        self.assertIs(processor._compiled_script, processor2._compiled_script)
+        self.assertIsNot(processor._executable, processor2._executable)
+
+        # Resuming from a different command needs its own compilation
+        processor.fetch_next_command()
+        restored = PythonEventProcessor.restore(processor.save(), self.mock_game)
+        self.assertIsNot(processor._compiled_script, restored._compiled_script)
+        self.assertEqual(restored._compiled_script.compiled,
+                         Compiler.compile_uncached('test_save_event_state', script_source, 1).compiled)
+        self.assertEqual(script_source.split('\n')[2], restored.get_source_line(2))
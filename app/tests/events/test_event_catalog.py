@@ -0,0 +1,36 @@
+import unittest
+
+from app.events.event_prefab import EventCatalog, EventPrefab
+
+class EventCatalogTests(unittest.TestCase):
+    def create_event(self, name, trigger, level_nid=None) -> EventPrefab:
+        event = EventPrefab(name)
+        event.trigger = trigger
+        event.level_nid = level_nid
+        return event
+
+    def test_get(self):
+        catalog = EventCatalog()
+        level_start = self.create_event('Start', 'level_start', '0')
+        global_start = self.create_event('Start', 'level_start')
+        other_level = self.create_event('Start', 'level_start', '1')
+        wait = self.create_event('Wait', 'unit_wait', '0')
+        for event in (level_start, global_start, other_level, wait):
+            catalog.append(event)
+
+        self.assertEqual([level_start, global_start], catalog.get('level_start', '0'))
+        self.assertEqual([global_start], catalog.get('level_start', None))
+        self.assertEqual([wait], catalog.get('unit_wait', '0'))
+        self.assertEqual([], catalog.get('combat_end', '0'))
+
+        # Changes to the catalog or to an event's trigger are picked up
+        catalog.move_index(1, 0)
+        self.assertEqual([global_start, level_start], catalog.get('level_start', '0'))
+        wait.trigger = 'level_start'
+        self.assertEqual([global_start, level_start, wait], catalog.get('level_start', '0'))
+        self.assertEqual([], catalog.get('unit_wait', '0'))
+        catalog.delete(level_start)
+        self.assertEqual([global_start, wait], catalog.get('level_start', '0'))
+
+if __name__ == '__main__':
+    unittest.main()
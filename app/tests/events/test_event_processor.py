@@ -132,6 +132,18 @@ class EventProcessorUnitTests(unittest.TestCase):
         self.assertEqual(next_command.parameters['SpeakerOrStyle'], 'Eirika')
         self.assertEqual(next_command.parameters['Text'], "My name is Eirika.")
 
+    def test_compiled_script_is_shared(self):
+        script_path = Path(__file__).parent / 'test_files' / 'processor' / 'conditionals.event'
+        processor = EventProcessor('conditionals', script_path.read_text(), self.text_evaluator)
+        processor._jump_conditional(8)
+        self.assertEqual((True, 11), processor.compiled_script.next_clauses[8])
+        self.assertEqual(15, processor.compiled_script.ends[11])
+
+        # Another run of the same script reuses the commands and their jumps
+        other_processor = EventProcessor('conditionals', script_path.read_text(), self.text_evaluator)
+        self.assertIs(processor.compiled_script, other_processor.compiled_script)
+        self.assertIs(processor.commands, other_processor.commands)
+
     def test_iterative_event_does_not_exceed_stack(self):
         script_path = Path(__file__).parent / 'test_files' / 'processor' / 'empty_iteration.event'
         processor = EventProcessor('long', script_path.read_text(), self.text_evaluator)
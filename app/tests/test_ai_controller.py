@@ -0,0 +1,230 @@
+import unittest
+from unittest.mock import MagicMock, patch
+
+from app.data.serialization.versions import CURRENT_SERIALIZATION_VERSION
+from app.engine.objects.skill import SkillObject
+from app.engine.objects.unit import UnitObject, UnitSkill
+from app.engine.source_type import SourceType
+from app.utilities.data import Data
+
+class HypotheticalPositionTests(unittest.TestCase):
+    def setUp(self):
+        from app.data.database.database import DB
+        DB.load('testing_proj.ltproj', CURRENT_SERIALIZATION_VERSION)
+        self.unit = UnitObject('enemy')
+        self.unit.position = (0, 0)
+        self.personal_skill = SkillObject('personal', 'Personal', '', None, (0, 0), Data())
+        self.unit.set_skill_list([UnitSkill(self.personal_skill, 'enemy', SourceType.PERSONAL)])
+        # Key: Position, Value: The terrain skill at that position
+        self.terrain_skills = {pos: SkillObject('terrain%d%d' % pos, 'Terrain', '', None, (0, 0), Data())
+                               for pos in [(0, 0), (1, 0), (2, 0)]}
+        self.unit.add_skill(self.terrain_skills[(0, 0)], (0, 0), SourceType.TERRAIN)
+
+    def mock_game(self) -> MagicMock:
+        game = MagicMock()
+        def leave(unit, test=False):
+            skill = self.terrain_skills[unit.position]
+            unit.remove_skill(skill, unit.position, SourceType.TERRAIN)
+            unit.position = None
+        def arrive(unit, pos, test=False):
+            unit.position = pos
+            unit.add_skill(self.terrain_skills[pos], pos, SourceType.TERRAIN)
+        game.leave = MagicMock(side_effect=leave)
+        game.arrive = MagicMock(side_effect=arrive)
+        return game
+
+    def test_move(self):
+        from app.engine.ai_controller import HypotheticalPosition
+        game = self.mock_game()
+        with patch('app.engine.ai_controller.game', game):
+            hypothetical = HypotheticalPosition(self.unit)
+            self.assertEqual((0, 0), self.unit.position)
+            self.assertEqual([self.terrain_skills[(0, 0)]], [s.get() for s in hypothetical.position_skills[(0, 0)]])
+            hypothetical.move((1, 0))
+            self.assertEqual((1, 0), self.unit.position)
+            self.assertEqual([self.personal_skill, self.terrain_skills[(1, 0)]], self.unit.all_skills)
+
+            hypothetical.move((2, 0))
+            self.assertEqual([self.personal_skill, self.terrain_skills[(2, 0)]], self.unit.all_skills)
+
+            # Skills gained elsewhere are kept while moving around
+            other_skill = SkillObject('other', 'Other', '', None, (0, 0), Data())
+            self.unit.add_skill(other_skill)
+            hypothetical.move((0, 0))
+            self.assertEqual((0, 0), self.unit.position)
+            self.assertEqual([self.personal_skill, self.terrain_skills[(0, 0)], other_skill], self.unit.all_skills)
+
+            # Positions that were already visited are remembered
+            hypothetical.move((1, 0))
+            self.assertEqual([self.personal_skill, other_skill, self.terrain_skills[(1, 0)]], self.unit.all_skills)
+            self.assertEqual(1, game.leave.call_count)
+            self.assertEqual(2, game.arrive.call_count)
+
+    def test_move_back_keeps_skill_order(self):
+        from app.engine.ai_controller import HypotheticalPosition
+        game = self.mock_game()
+        later_skill = SkillObject('later', 'Later', '', None, (0, 0), Data())
+        self.unit.add_skill(later_skill)
+        orig_skills = self.unit.get_skill_list()
+        with patch('app.engine.ai_controller.game', game):
+            hypothetical = HypotheticalPosition(self.unit)
+            self.assertEqual(orig_skills, self.unit.get_skill_list())
+            hypothetical.move((1, 0))
+            self.assertEqual([self.personal_skill, later_skill, self.terrain_skills[(1, 0)]], self.unit.all_skills)
+            hypothetical.move((0, 0))
+            self.assertEqual(orig_skills, self.unit.get_skill_list())
+
+    def test_position_signature(self):
+        from app.engine.ai_controller import HypotheticalPosition, PrimaryAI
+        from app.engine.skill_components.conditional_components import Condition
+        from app.tests.mocks.mock_game import get_mock_game
+        game = self.mock_game()
+        game.supports.get_bonus_pairs = MagicMock(return_value=[])
+        conditional_skill = SkillObject('conditional', 'Conditional', '', None, (0, 0), Data([Condition('unit.position == (2, 0)')]))
+        self.unit.add_skill(conditional_skill)
+        target = MagicMock()
+        target.position = (1, 1)
+        target.skills = []
+        with patch('app.engine.ai_controller.game', game), \
+                patch('app.engine.game_state.game', get_mock_game()), \
+                patch('app.engine.combat_calcs.get_support_rank_bonus') as get_support_rank_bonus:
+            ai = PrimaryAI.__new__(PrimaryAI)
+            ai.unit = self.unit
+            ai.hypothetical = HypotheticalPosition(self.unit)
+            ai.support_partners = {}
+            # The skills from the original position are known before the unit ever leaves it
+            orig_signature = ai.get_position_signature(target, (0, 0))
+            self.assertEqual(1, len(orig_signature[0]))
+            self.assertEqual(((), ()), orig_signature[1])
+
+            ai.hypothetical.move((2, 0))
+            signature = ai.get_position_signature(target, (2, 0))
+            self.assertEqual(((conditional_skill.uid,), ()), signature[1])
+            self.assertEqual(orig_signature[2], signature[2])
+            # Nobody has a support partner, so bonuses are never looked for
+            get_support_rank_bonus.assert_not_called()
+
+class AIPlanTests(unittest.TestCase):
+    def mock_unit(self, nid, position, hp=20, team='enemy') -> MagicMock:
+        unit = MagicMock()
+        unit.nid = nid
+        unit.position = position
+        unit.team = team
+        unit.get_hp = MagicMock(return_value=hp)
+        unit.get_mana = MagicMock(return_value=0)
+        unit.tags = set()
+        unit.skills = []
+        unit.items = []
+        unit.equipped_weapon = None
+        unit.equipped_accessory = None
+        return unit
+
+    def mock_game(self, units) -> MagicMock:
+        game = MagicMock()
+        game.units = units
+        game.game_vars = {}
+        game.level_vars = {}
+        game.level.regions = []
+        return game
+
+    def test_is_valid(self):
+        from app.engine.ai_planner import AIPlan, take_snapshot
+        planner = self.mock_unit('planner', (0, 0))
+        near = self.mock_unit('near', (3, 0), team='player')
+        far = self.mock_unit('far', (20, 20), team='player')
+        game = self.mock_game([planner, near, far])
+        with patch('app.engine.ai_planner.game', game):
+            plan = AIPlan('planner', (0, 0), 0, (3, 0), (2, 0), None, True, 5, take_snapshot())
+            self.assertTrue(plan.is_valid(planner))
+
+            # Changes out of reach do not matter
+            far.position = (20, 19)
+            self.assertTrue(plan.is_valid(planner))
+
+            # But changes within reach do
+            near.get_hp.return_value = 10
+            self.assertFalse(plan.is_valid(planner))
+            near.get_hp.return_value = 20
+            self.assertTrue(plan.is_valid(planner))
+            near.skills = [MagicMock(uid=1)]
+            self.assertFalse(plan.is_valid(planner))
+            near.skills = []
+
+            # Including units moving into reach
+            far.position = (1, 1)
+            self.assertFalse(plan.is_valid(planner))
+            far.position = (20, 19)
+
+            # Any change to the planning unit itself matters
+            planner.equipped_weapon = MagicMock(uid=2)
+            self.assertFalse(plan.is_valid(planner))
+            planner.equipped_weapon = None
+            self.assertTrue(plan.is_valid(planner))
+
+            # As do changes to the level vars
+            game.level_vars['Alarm'] = True
+            self.assertFalse(plan.is_valid(planner))
+
+    def test_is_valid_without_reach(self):
+        from app.engine.ai_planner import AIPlan, take_snapshot
+        planner = self.mock_unit('planner', (0, 0))
+        far = self.mock_unit('far', (20, 20), team='player')
+        game = self.mock_game([planner, far])
+        with patch('app.engine.ai_planner.game', game):
+            # Moving towards a far away target can depend on units anywhere on the map
+            plan = AIPlan('planner', (0, 0), 0, None, (5, 5), None, True, None, take_snapshot())
+            self.assertTrue(plan.is_valid(planner))
+            far.tags = {'Boss'}
+            self.assertFalse(plan.is_valid(planner))
+
+class AIContextTests(unittest.TestCase):
+    def mock_unit(self, nid, position, team='player', tags=()) -> MagicMock:
+        unit = MagicMock()
+        unit.nid = nid
+        unit.position = position
+        unit.team = team
+        unit.tags = set(tags)
+        unit.klass = 'Knight'
+        unit.name = nid
+        unit.faction = None
+        unit.party = None
+        return unit
+
+    def test_filter_by_spec(self):
+        from app.engine.ai_context import AIContext
+        from app.engine.utils import ltcache
+        from app.engine.utils.ltcache import LTCache
+        boss = self.mock_unit('boss', (0, 0), 'enemy', tags=['Boss'])
+        grunt = self.mock_unit('grunt', (1, 0), 'enemy')
+        tile = self.mock_unit('tile', (1, 0), 'enemy', tags=['Tile'])
+        hero = self.mock_unit('hero', (2, 0))
+        game = MagicMock()
+        game.units = [boss, grunt, tile, hero]
+        game.board.get_units = lambda pos: [u for u in game.units if u.position == pos]
+        with patch('app.engine.ai_context.game', game), \
+                patch('app.engine.utils.ltcache.LT_CACHE', LTCache()):
+            context = AIContext()
+            positions = context.get_all_positions()
+            self.assertEqual([(0, 0), (1, 0), (1, 0), (2, 0)], positions)
+            self.assertEqual([(0, 0)], context.filter_by_spec(positions, ('Tag', 'Boss'), False))
+            self.assertEqual([(1, 0), (1, 0), (2, 0)], context.filter_by_spec(positions, ('Tag', 'Boss'), True))
+            self.assertEqual([(2, 0)], context.filter_by_spec(positions, ('Team', 'enemy'), True))
+            # Inverted, a shared position is kept as long as one of its units does not match
+            self.assertEqual([(0, 0), (1, 0), (1, 0), (2, 0)], context.filter_by_spec(positions, ('Tag', 'Tile'), True))
+            self.assertEqual([(1, 0), (1, 0), (2, 0)], context.filter_by_spec(positions, ('Name', 'boss'), True))
+
+            # Units moving are only noticed once the context is invalidated
+            hero.position = (3, 0)
+            self.assertEqual((2, 0), context.get_all_positions()[-1])
+            context.invalidate()
+            self.assertEqual((3, 0), context.get_all_positions()[-1])
+
+            # Neither are tags changing, until the game state changes
+            hero.tags.add('Boss')
+            self.assertEqual([(0, 0)], context.filter_by_spec(positions, ('Tag', 'Boss'), False))
+            ltcache.alter_state()
+            positions = context.get_all_positions()
+            self.assertEqual([(0, 0), (3, 0)], context.filter_by_spec(positions, ('Tag', 'Boss'), False))
+
+if __name__ == '__main__':
+    unittest.main()
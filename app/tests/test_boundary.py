@@ -0,0 +1,117 @@
+import unittest
+from unittest.mock import MagicMock, patch
+
+from app.data.serialization.versions import CURRENT_SERIALIZATION_VERSION
+from app.tests.mocks.mock_object import Object
+
+class BoundaryTests(unittest.TestCase):
+    """
+    Tests that the boundary only recalculates the ranges that
+    could have changed, and only once per flush
+    """
+    def setUp(self):
+        from app.data.database.database import DB
+        DB.load('testing_proj.ltproj', CURRENT_SERIALIZATION_VERSION)
+        from app.engine.boundary import BoundaryInterface
+        self.DB = DB
+
+        self.units = []
+        self.game = MagicMock()
+        self.game.units = self.units
+        self.game.get_unit = lambda nid: next((unit for unit in self.units if unit.nid == nid), None)
+        self.game.board.check_bounds = lambda pos: 0 <= pos[0] < 10 and 0 <= pos[1] < 10
+        self.game.path_system.get_valid_moves = MagicMock(side_effect=self.get_valid_moves)
+        self.game.target_system.get_all_attackable_positions_weapons = \
+            lambda unit, valid_moves, force: self.get_neighbors(valid_moves) | set(valid_moves)
+        self.game.target_system.get_all_attackable_positions_spells = lambda unit, valid_moves, force: set()
+        patcher = patch('app.engine.boundary.game', self.game)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        self.boundary = BoundaryInterface(10, 10)
+        self.enemy = self.add_unit('enemy', (2, 2), 'enemy')
+        self.player = self.add_unit('player', (3, 2), 'player')
+        self.boundary.reset()
+
+    def add_unit(self, nid, position, team):
+        unit = Object(nid=nid, position=position, team=team, ai_group=None, get_ai=lambda: None)
+        self.units.append(unit)
+        return unit
+
+    def get_neighbors(self, positions):
+        neighbors = set()
+        for (x, y) in positions:
+            neighbors |= {(x, y - 1), (x - 1, y), (x + 1, y), (x, y + 1)}
+        return {pos for pos in neighbors if self.game.board.check_bounds(pos)}
+
+    def get_valid_moves(self, unit, force=False):
+        """Two tiles of movement, blocked by any unit not allied to the mover"""
+        blocked = {other.position for other in self.units if other.position and
+                   other.team not in self.DB.teams.get_allies(unit.team)}
+        valid_moves = {unit.position}
+        frontier = {unit.position}
+        for _ in range(2):
+            frontier = self.get_neighbors(frontier) - blocked - valid_moves
+            valid_moves |= frontier
+        return valid_moves
+
+    def leave(self, unit):
+        self.boundary.leave(unit)
+        unit.position = None
+
+    def arrive(self, unit, pos):
+        unit.position = pos
+        self.boundary.arrive(unit)
+
+    def in_range(self, pos) -> bool:
+        return self.enemy.nid in self.boundary.grids['attack'][pos[0] * 10 + pos[1]]
+
+    def test_range_grows_when_blocker_leaves(self):
+        self.assertFalse(self.in_range((5, 2)))
+        self.leave(self.player)
+        # Nothing is recalculated until the flush
+        self.assertIn(self.enemy.nid, self.boundary.pending_units)
+        self.assertFalse(self.in_range((5, 2)))
+        self.boundary.flush()
+        self.assertTrue(self.in_range((5, 2)))
+        self.assertFalse(self.boundary.pending_units)
+
+    def test_range_shrinks_when_enemy_arrives(self):
+        self.leave(self.player)
+        self.boundary.flush()
+        self.assertTrue(self.in_range((5, 2)))
+        self.arrive(self.player, (3, 2))
+        self.boundary.flush()
+        self.assertFalse(self.in_range((5, 2)))
+
+    def test_arrival_on_frontier_keeps_range(self):
+        self.leave(self.player)
+        self.boundary.flush()
+        self.game.path_system.get_valid_moves.reset_mock()
+        # Just past the enemy's valid moves, so it is marked, but its valid moves do not change
+        self.arrive(self.player, (5, 2))
+        self.assertIn(self.enemy.nid, self.boundary.pending_units)
+        with patch.object(self.boundary, '_add_unit') as add_unit:
+            self.boundary.flush()
+            add_unit.assert_not_called()
+        self.assertEqual(1, self.game.path_system.get_valid_moves.call_count)
+        self.assertTrue(self.in_range((5, 2)))
+
+    def test_ally_arrival_ignored(self):
+        ally = self.add_unit('ally', None, 'enemy')
+        self.arrive(ally, (2, 3))
+        self.assertEqual({ally.nid}, self.boundary.pending_units)
+
+    def test_moves_collapse_into_one_flush(self):
+        self.game.path_system.get_valid_moves.reset_mock()
+        for pos in [(3, 3), (2, 4), (1, 2)]:
+            self.leave(self.player)
+            self.arrive(self.player, pos)
+        self.assertEqual(0, self.game.path_system.get_valid_moves.call_count)
+        self.boundary.flush()
+        self.assertEqual(1, self.game.path_system.get_valid_moves.call_count)
+        self.assertFalse(self.in_range((0, 2)))
+        self.assertTrue(self.in_range((5, 2)))
+
+if __name__ == '__main__':
+    unittest.main()
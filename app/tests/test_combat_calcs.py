@@ -143,4 +143,19 @@ class CombatCalcTests(unittest.TestCase):
         self.attacker.can_be_seen = False
         self.check_counter(False, "Should not counter without LOS")
         DB.constants.get("line_of_sight").set_value(False)
-        self.check_counter(True, "Should counter if LOS is disabled, even if no LOS")
\ No newline at end of file
+        self.check_counter(True, "Should counter if LOS is disabled, even if no LOS")
+
+class CombatStatSnapshotTests(unittest.TestCase):
+    def test_stats_computed_once(self):
+        from app.engine.combat_calcs import CombatStatSnapshot
+        unit, target, item, def_item = MagicMock(), MagicMock(), MagicMock(), MagicMock()
+        with patch('app.engine.combat_calcs.accuracy', MagicMock(return_value=80)) as accuracy, \
+                patch('app.engine.combat_calcs.get_support_rank_bonus', MagicMock(return_value=([], []))) as support:
+            snapshot = CombatStatSnapshot(unit, item, target, def_item)
+            self.assertEqual(80, snapshot.accuracy)
+            self.assertEqual(80, snapshot.accuracy)
+            accuracy.assert_called_once_with(unit, item)
+            self.assertEqual([], snapshot.unit_support_bonuses)
+            self.assertEqual([], snapshot.target_support_bonuses)
+            self.assertEqual([], snapshot.unit_support_bonuses)
+            self.assertEqual([call(unit, target), call(target, unit)], support.call_args_list)
@@ -0,0 +1,35 @@
+import unittest
+from unittest.mock import MagicMock
+
+from app.data.serialization.versions import CURRENT_SERIALIZATION_VERSION
+
+class EquationParserTests(unittest.TestCase):
+    def setUp(self):
+        from app.data.database.database import DB
+        DB.load('testing_proj.ltproj', CURRENT_SERIALIZATION_VERSION)
+        from app.engine.equations import Parser
+        self.parser = Parser()
+        self.unit = MagicMock()
+        self.unit.stats = {stat.nid: 10 for stat in DB.stats}
+        self.unit.stat_bonus = MagicMock(return_value=1)
+        self.unit.tags = []
+
+    def test_dependencies(self):
+        self.assertEqual({'SKL', 'LCK'}, self.parser.dependencies['HIT'])
+        self.assertEqual({'HP', 'STR', 'MAG', 'SKL', 'SPD', 'LCK', 'DEF', 'RES'}, self.parser.stat_dependencies['RATING'])
+        self.assertEqual(set(), self.parser.stat_dependencies['CRIT_MULT'])
+
+    def test_each_stat_fetched_once(self):
+        self.assertEqual(27, self.parser.get('HIT', self.unit))
+        self.assertEqual(2, self.unit.stat_bonus.call_count)
+        self.assertEqual(11, self.parser.hitpoints(self.unit))
+
+        # Sub equations share the stats already looked up
+        self.unit.stat_bonus.reset_mock()
+        self.assertEqual(27 + 11 * 3, self.parser.get_expression('HIT + SKL + SKL + LCK', self.unit))
+        self.assertEqual(['SKL', 'LCK'], [call.args[0] for call in self.unit.stat_bonus.call_args_list])
+        # Expressions asking for a float are not rounded down
+        self.assertEqual(7.5, self.parser.get_expression('float(15) / 2', self.unit))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,35 @@
+import unittest
+
+from app.engine import evaluate
+from app.engine.utils import expression_cache
+from app.tests.mocks.mock_game import get_mock_game
+
+class EvaluateTests(unittest.TestCase):
+    def setUp(self):
+        self.game = get_mock_game()
+        expression_cache.clear()
+
+    def test_compiled_once(self):
+        self.assertEqual(3, evaluate.evaluate('1 + 2', game=self.game))
+        self.assertEqual(3, evaluate.evaluate(' 1 + 2 ', game=self.game))
+        info = expression_cache.compile_expression.cache_info()
+        self.assertEqual((1, 1), (info.hits, info.misses))
+        with self.assertRaises(SyntaxError):
+            evaluate.evaluate('1 +', game=self.game)
+
+    def test_context(self):
+        unit = object()
+        self.assertIs(unit, evaluate.evaluate('target', unit2=unit, game=self.game))
+        self.assertEqual([2], evaluate.evaluate('[x * y for x in [1]]', local_args={'y': 2}, game=self.game))
+        # Query functions are available, and win over the per call names
+        self.assertEqual(self.game.query_engine.func_dict['game'], evaluate.evaluate('game', game=self.game))
+        self.assertTrue(callable(evaluate.evaluate('get_units_in_area', game=self.game)))
+        # Names assigned by one expression do not leak into the next
+        self.assertEqual(5, evaluate.evaluate('(z := 5)', game=self.game))
+        with self.assertRaises(NameError):
+            evaluate.evaluate('z', game=self.game)
+        with self.assertRaises(NameError):
+            evaluate.evaluate('y', game=self.game)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -344,6 +344,122 @@ class ItemSkillComponentTests(unittest.TestCase):
         self.assertEqual(25, item_system.crit(mock_unit, mock_item))
         self.assertEqual(4, item_system.modify_weapon_triangle(mock_unit, mock_item))
 
+    def test_skill_hook_index(self):
+        from app.data.database.database import DB
+        from app.data.serialization.versions import CURRENT_SERIALIZATION_VERSION
+        from app.engine import skill_system
+        from app.engine.objects.unit import UnitObject
+        DB.load('testing_proj.ltproj', CURRENT_SERIALIZATION_VERSION)
+        unit = UnitObject('player')
+        vantage_skill = SkillObject("vantage", "Vantage", "Vantage", None, (0, 0), Data([Vantage()]))
+        tag_skill = SkillObject("tag", "Tag", "Tag", None, (0, 0), Data([SkillTag(['skill'])]))
+        unit.add_skill(tag_skill)
+        self.assertFalse(skill_system.vantage(unit))
+
+        # Adding a skill throws away the index
+        unit.add_skill(vantage_skill)
+        self.assertTrue(skill_system.vantage(unit))
+        self.assertEqual([(vantage_skill, vantage_skill.components.get('vantage'))],
+                         skill_system.get_hook_components(unit, 'vantage'))
+        self.assertIn(('vantage',), unit.skills.hook_index)
+
+        # As does removing one
+        unit.remove_skill(vantage_skill, None)
+        self.assertFalse(skill_system.vantage(unit))
+        self.assertEqual([], skill_system.get_hook_components(unit, 'vantage'))
+
+    def test_item_hook_index(self):
+        damage, hit = Damage(10), Hit(90)
+        item = ItemObject("test", "Test", "Test", None, (0, 0), Data([damage]))
+        self.assertEqual([damage], item.get_hook_components('damage'))
+        self.assertEqual([], item.get_hook_components('hit'))
+
+        # Changing the components requires resetting the index
+        item.components.append(hit)
+        item.reset_hook_index()
+        self.assertEqual([hit], item.get_hook_components('hit'))
+
+    def test_pure_hook_cache(self):
+        from app.engine import item_system
+        from app.engine.utils import ltcache
+        lt_cache = ltcache.LT_CACHE
+        ltcache.LT_CACHE = ltcache.LTCache()
+        self.addCleanup(setattr, ltcache, 'LT_CACHE', lt_cache)
+        ltcache.clear_hook_cache()
+        ltcache.HOOK_CACHE.clear_stats()
+        unit = MagicMock()
+        item = ItemObject("test", "Test", "Test", None, (0, 0), Data([MultiTarget(2)]))
+        self.assertEqual(2, item_system.num_targets(unit, item))
+        self.assertEqual(2, item_system.num_targets(unit, item))
+        self.assertEqual((1, 1, 0.5), ltcache.HOOK_CACHE.hit_rates()['item_system.num_targets'])
+
+        # Changing the item without touching it leaves the stale result
+        item.components.append(MultiTarget(3), overwrite=True)
+        item.reset_hook_index()
+        self.assertEqual(2, item_system.num_targets(unit, item))
+        ltcache.touch(item)
+        self.assertEqual(3, item_system.num_targets(unit, item))
+
+        # Nothing is cached while an action is in progress
+        ltcache.begin_mutation()
+        item.components.append(MultiTarget(4), overwrite=True)
+        item.reset_hook_index()
+        self.assertEqual(4, item_system.num_targets(unit, item))
+        ltcache.end_mutation()
+        ltcache.alter_state()
+        self.assertEqual(4, item_system.num_targets(unit, item))
+
+        # Or when the cache is turned off
+        ltcache.set_hook_cache_enabled(False)
+        item.components.append(MultiTarget(5), overwrite=True)
+        item.reset_hook_index()
+        self.assertEqual(5, item_system.num_targets(unit, item))
+        ltcache.set_hook_cache_enabled(True)
+
+    def test_pure_hook_cache_conditional_skill(self):
+        from app.data.database.database import DB
+        from app.data.serialization.versions import CURRENT_SERIALIZATION_VERSION
+        from app.engine import skill_system
+        from app.engine.objects.unit import UnitObject
+        from app.engine.skill_components.conditional_components import Condition
+        from app.engine.skill_components.movement_components import Pass
+        from app.engine.utils import ltcache
+        from app.tests.mocks.mock_game import get_mock_game
+        DB.load('testing_proj.ltproj', CURRENT_SERIALIZATION_VERSION)
+        lt_cache = ltcache.LT_CACHE
+        ltcache.LT_CACHE = ltcache.LTCache()
+        self.addCleanup(setattr, ltcache, 'LT_CACHE', lt_cache)
+        ltcache.clear_hook_cache()
+
+        unit = UnitObject('player')
+        ally = UnitObject('player')
+        ally.position = (1, 1)
+        game = get_mock_game()
+        game.get_unit = lambda nid: ally
+        game.turncount = 1
+        self.addCleanup(patch.stopall)
+        patch('app.engine.game_state.game', game).start()
+
+        # The condition reads another unit, which can change without touching this one
+        pass_skill = SkillObject("pass", "Pass", "Pass", None, (0, 0),
+                                 Data([Pass(), Condition("game.get_unit('Ally').position == (1, 1)")]))
+        unit.add_skill(pass_skill)
+        self.assertTrue(skill_system.pass_through(unit))
+        self.assertTrue(skill_system.pass_through(unit))
+        ally.position = (2, 1)
+        ltcache.alter_state()  # As any action that moves the ally would
+        self.assertFalse(skill_system.pass_through(unit))
+
+        # As can the turn count
+        unit.remove_skill(pass_skill, None)
+        turn_skill = SkillObject("turn", "Turn", "Turn", None, (0, 0),
+                                 Data([Pass(), Condition("game.turncount >= 5")]))
+        unit.add_skill(turn_skill)
+        self.assertFalse(skill_system.pass_through(unit))
+        game.turncount = 5
+        ltcache.alter_state()
+        self.assertTrue(skill_system.pass_through(unit))
+
     def test_item_tags(self):
         mock_item = ItemObject("test", "Test", "Test", None, (0, 0), Data([ItemTag(['weapon'])]))
         self.assertTrue('weapon' in mock_item.tags)
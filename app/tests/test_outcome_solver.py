@@ -0,0 +1,92 @@
+import unittest
+from unittest.mock import MagicMock, patch
+
+from app.data.database.difficulty_modes import RNGOption
+from app.data.serialization.versions import CURRENT_SERIALIZATION_VERSION
+
+class OutcomeSolverTests(unittest.TestCase):
+    def setUp(self):
+        from app.data.database.database import DB
+        DB.load('testing_proj.ltproj', CURRENT_SERIALIZATION_VERSION)
+        self.attacker = self.mock_unit('attacker', (0, 0))
+        self.defender = self.mock_unit('defender', (0, 1))
+        self.aweapon = MagicMock(data={})
+        self.dweapon = MagicMock(data={})
+        # Key: Unit nid, Value: (Hit, Damage, Number of attack phases)
+        self.stats = {'attacker': (50, 5, 2), 'defender': (50, 5, 1)}
+        self.vantage = False
+
+        game = MagicMock()
+        game.rng_mode = RNGOption.CLASSIC
+        self.patchers = [
+            patch('app.engine.combat.outcome_solver.game', game),
+            patch('app.engine.combat.solver.game', game),
+            patch('app.engine.combat_calcs.compute_hit', lambda unit, *args, **kwargs: self.stats[unit.nid][0]),
+            patch('app.engine.combat_calcs.compute_damage', lambda unit, *args, **kwargs: self.stats[unit.nid][1]),
+            patch('app.engine.combat_calcs.compute_attack_phases', lambda unit, *args: self.stats[unit.nid][2]),
+            patch('app.engine.combat_calcs.compute_crit', lambda *args: 0),
+            patch('app.engine.combat_calcs.compute_multiattacks', lambda *args: 1),
+            patch('app.engine.combat_calcs.can_counterattack', lambda *args: True),
+            patch('app.engine.item_funcs.available', lambda *args: True),
+            patch('app.engine.skill_system.vantage', lambda unit: self.vantage and unit is self.defender),
+            patch('app.engine.skill_system.disvantage', lambda unit: False),
+            patch('app.engine.skill_system.desperation', lambda unit: False),
+            patch('app.engine.skill_system.ignore_dying_in_combat', lambda unit: False),
+            patch('app.engine.skill_system.crit_anyway', lambda unit: False),
+        ]
+        for patcher in self.patchers:
+            patcher.start()
+
+    def tearDown(self):
+        for patcher in self.patchers:
+            patcher.stop()
+
+    def mock_unit(self, nid, position) -> MagicMock:
+        unit = MagicMock()
+        unit.nid = nid
+        unit.position = position
+        unit.strike_partner = None
+        unit.get_hp = MagicMock(return_value=10)
+        return unit
+
+    def solve(self):
+        from app.engine.combat.outcome_solver import OutcomeSolver
+        return OutcomeSolver(self.attacker, self.aweapon, self.defender, self.dweapon).solve()
+
+    def test_chance_roll_below(self):
+        from app.engine.combat.outcome_solver import chance_roll_below
+        self.assertEqual(chance_roll_below(0), 0)
+        self.assertAlmostEqual(chance_roll_below(70), 0.7)
+        self.assertAlmostEqual(chance_roll_below(69.5), 0.7)
+        self.assertEqual(chance_roll_below(100), 1)
+        # True hit makes good odds better and bad odds worse
+        self.assertGreater(chance_roll_below(70, 2), 0.7)
+        self.assertLess(chance_roll_below(30, 2), 0.3)
+        self.assertGreater(chance_roll_below(70, 3), chance_roll_below(70, 2))
+
+    def test_double(self):
+        # Attacker, then defender, then attacker again, and nobody can die before the last strike
+        outcome = self.solve()
+        expected = {(10, 10): .125, (10, 5): .25, (10, 0): .125, (5, 10): .125, (5, 5): .25, (5, 0): .125}
+        self.assertEqual(expected.keys(), outcome.hp_distribution.keys())
+        for hps, chance in expected.items():
+            self.assertAlmostEqual(chance, outcome.hp_distribution[hps])
+        self.assertAlmostEqual(0.25, outcome.defender_death_chance)
+        self.assertAlmostEqual(0, outcome.attacker_death_chance)
+        self.assertAlmostEqual(5, outcome.expected_damage_to_defender)
+        self.assertAlmostEqual(2.5, outcome.expected_damage_to_attacker)
+
+    def test_death_ends_combat(self):
+        self.stats['attacker'] = (100, 10, 2)
+        outcome = self.solve()
+        self.assertEqual({(10, 0): 1.}, outcome.hp_distribution)
+
+        # Unless the defender gets to strike first
+        self.vantage = True
+        self.stats['defender'] = (100, 10, 1)
+        outcome = self.solve()
+        self.assertEqual({(0, 10): 1.}, outcome.hp_distribution)
+        self.assertEqual(1, outcome.attacker_death_chance)
+
+if __name__ == '__main__':
+    unittest.main()
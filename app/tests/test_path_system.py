@@ -7,6 +7,7 @@ from app.engine.target_system import TargetSystem
 from app.engine.objects.unit import UnitObject
 from app.engine.pathfinding.path_system import PathSystem
 from app.engine.pathfinding.node import Node
+from app.engine.unit_index import UnitIndex
 
 from app.utilities.grid import Grid
 
@@ -30,6 +31,7 @@ class PathSystemTests(unittest.TestCase):
         self.game.board = GameBoard(tilemap)
         self.game.board.bounds = (0, 0, 28, 28)
         self.game.units = []
+        self.game.unit_index = UnitIndex()
 
         self.player_unit = UnitObject('player')
         self.player_unit.klass = 'Citizen'
@@ -56,6 +58,36 @@ class PathSystemTests(unittest.TestCase):
             self.assertGreater(len(valid_moves), 0, 'get_valid_moves did not return a valid move')
             self.assertIn((1, 1), valid_moves, 'current position is not valid_moves')
 
+    def test_valid_moves_cache(self):
+        with patch('app.engine.equations.parser.movement') as movement_mock, \
+             patch('app.engine.objects.unit.UnitObject.movement_left', new_callable=PropertyMock) as movement_left_mock:
+            movement_instance = movement_mock.return_value
+            movement_instance.method.return_value = 5
+            movement_left_mock.return_value = 5
+
+            cache = self.game.board.reachability_cache
+            valid_moves = self.path_system.get_valid_moves(self.player_unit)
+            self.assertEqual(cache.misses, 1)
+            self.assertEqual(cache.hits, 0)
+
+            # Callers modify the result, which should not affect the cache
+            valid_moves.add((20, 20))
+            new_valid_moves = self.path_system.get_valid_moves(self.player_unit)
+            self.assertEqual(cache.hits, 1, 'Repeated query was not a cache hit')
+            self.assertNotIn((20, 20), new_valid_moves, 'Cached result was modified by caller')
+
+            # Board changes invalidate the cache
+            other_unit = UnitObject('other')
+            other_unit.team = 'player'
+            self.game.board.set_unit((1, 2), other_unit)
+            self.assertEqual(len(cache), 0, 'Moving a unit did not invalidate the cache')
+            self.path_system.get_valid_moves(self.player_unit)
+            self.assertEqual(cache.misses, 2)
+
+            # As do skill changes
+            cache.invalidate_unit(self.player_unit.nid)
+            self.assertEqual(len(cache), 0)
+
     def test_get_path(self):
         goal = (28, 14)
 
@@ -1,7 +1,9 @@
 import unittest
 
 from app.utilities.grid import BoundedGrid
-from app.engine.pathfinding import node, pathfinding
+from app.engine.pathfinding import distance_field, flood_fill, node, pathfinding
+from app.engine.pathfinding.cost_grid import CostGrid
+from app.engine.pathfinding.priority_queue import PriorityQueue
 
 class PathfindingTests(unittest.TestCase):
     """
@@ -69,6 +71,48 @@ x   x   x   x   x   x   x   x   x
         self.assertNotIn((3, 6), valid_moves, 'Ignored wall')
         self.assertNotIn((3, 6), valid_moves, 'Ignored wall')
 
+    def test_flood_fill(self):
+        can_move_through = lambda x: True
+        # Flood fill should exactly match Djikstra
+        for grid, start in ((self.simple_grid, (5, 5)), (self.complex_grid, (1, 7)), (self.complex_grid, (5, 5))):
+            cost_grid = CostGrid.from_node_grid(grid)
+            for movement_left in (-1, 0, 1, 3, 5, 8, 99):
+                expected = pathfinding.Djikstra(start, grid).process(can_move_through, movement_left)
+                valid_moves = flood_fill.get_reachable(cost_grid, start, movement_left, grid.bounds)
+                self.assertEqual(valid_moves, expected, 'Flood fill does not match Djikstra')
+
+        # Blocked positions
+        blocked = {(5, 4), (4, 5), (6, 5)}
+        can_move_through = lambda x: x not in blocked
+        expected = pathfinding.Djikstra((5, 5), self.simple_grid).process(can_move_through, 4)
+        cost_grid = CostGrid.from_node_grid(self.simple_grid)
+        valid_moves = flood_fill.get_reachable(cost_grid, (5, 5), 4, self.simple_grid.bounds, blocked)
+        self.assertEqual(valid_moves, expected, 'Flood fill does not match Djikstra when blocked')
+        self.assertNotIn((5, 4), valid_moves, 'Moved through blocked position')
+        self.assertNotIn((5, 3), valid_moves, 'Moved around blocked position too cheaply')
+
+    def test_priority_queue(self):
+        queue = PriorityQueue()
+        queue.push('a', 5)
+        queue.push('b', 3)
+        queue.push('c', 4)
+        self.assertIn('a', queue)
+        self.assertEqual(len(queue), 3)
+        # Decrease key
+        queue.push('a', 1)
+        self.assertEqual(queue.priority('a'), 1)
+        self.assertEqual(len(queue), 3, 'Changing priority should not add a new item')
+        self.assertEqual(queue.pop(), (1, 'a'))
+        self.assertNotIn('a', queue)
+        queue.close('a')
+        self.assertTrue(queue.is_closed('a'))
+        self.assertEqual(queue.pop(), (3, 'b'))
+        self.assertEqual(queue.pop(), (4, 'c'))
+        # The outdated entry for 'a' should have been skipped
+        self.assertFalse(queue)
+        with self.assertRaises(IndexError):
+            queue.pop()
+
     def test_astar(self):
         # Test the simple grid with no limit
         pathfinder = pathfinding.AStar((5, 5), None, self.simple_grid)
@@ -98,6 +142,35 @@ x   x   x   x   x   x   x   x   x
         path = pathfinder.process(can_move_through, adj_good_enough=True)
         self.assertEqual(path[0], (7, 8), f'Did not find the best end: {path}')
 
+    def test_distance_field(self):
+        can_move_through = lambda x: True
+        # Should find paths just as good as AStar to every goal
+        for grid, start in ((self.simple_grid, (5, 5)), (self.complex_grid, (1, 7))):
+            field = distance_field.get_distance_field(CostGrid.from_node_grid(grid), start, grid.bounds)
+            pathfinder = pathfinding.AStar(start, None, grid)
+            for goal in [(x, y) for x in range(grid.width) for y in range(grid.height) if grid.check_bounds((x, y))]:
+                for adj_good_enough in (False, True):
+                    for limit in (None, 4, 7):
+                        pathfinder.set_goal_pos(goal)
+                        expected = pathfinder.process(can_move_through, adj_good_enough=adj_good_enough, limit=limit)
+                        pathfinder.reset()
+                        path = field.get_path(goal, adj_good_enough, limit)
+                        self.assertEqual(len(path), len(expected), f'Path to {goal} is not as good as AStar: {path} {expected}')
+                        if path:
+                            self.assertEqual(path[-1], start, 'Did not start at the beginning')
+
+        # Test the complex grid with adj_good_enough
+        field = distance_field.get_distance_field(CostGrid.from_node_grid(self.complex_grid), (1, 7), self.complex_grid.bounds)
+        self.assertEqual(field.get_path((7, 7), adj_good_enough=True)[0], (7, 8), 'Did not find the best end')
+        self.assertEqual(field.get_path((7, 7), limit=7), [], 'Somehow found an impossible path')
+        self.assertEqual(field.get_path((1, 7)), [(1, 7)], 'Should already be at the goal')
+
+        # Blocked positions and expensive tiles
+        field = distance_field.get_distance_field(CostGrid.from_node_grid(self.complex_grid), (1, 7), self.complex_grid.bounds,
+                                                  blocked={(1, 8)}, max_cost=1)
+        self.assertEqual(field.get_path((2, 9)), [], 'Moved through blocked position or tiles that cost too much')
+        self.assertEqual(field.get_path((2, 5)), [(2, 5), (1, 5), (1, 6), (1, 7)])
+
     def test_thetastar(self):
         # Test the simple grid
         pathfinder = pathfinding.ThetaStar((5, 5), (1, 1), self.simple_grid)
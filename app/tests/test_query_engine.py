@@ -48,5 +48,42 @@ class QueryEngineTests(unittest.TestCase):
         res = self.query_engine._resolve_pos(eirika_obj)
         self.assertEqual(res, TEST_POS)
 
+    def test_get_units_within_distance(self):
+        from app.data.database.database import DB
+        from app.data.serialization.versions import CURRENT_SERIALIZATION_VERSION
+        from app.engine.objects.unit import UnitObject
+        from app.engine.unit_index import UnitIndex
+        DB.load('testing_proj.ltproj', CURRENT_SERIALIZATION_VERSION)
+        units = []
+        for nid, position, team in [('far', (15, 15), 'player'), ('edge', (8, 6), 'enemy'),
+                                    ('near', (5, 5), 'player'), ('tie', (5, 5), 'player'), ('away', None, 'player')]:
+            unit = UnitObject(nid)
+            unit.klass = 'Citizen'
+            unit.position = position
+            unit.team = team
+            units.append(unit)
+        self.game.unit_index = UnitIndex()
+        self.game.unit_index.reset(units)
+
+        res = self.query_engine.get_units_within_distance((6, 5), 3)
+        self.assertEqual(['edge', 'near', 'tie'], [unit.nid for unit in res])
+        res = self.query_engine.get_units_within_distance((6, 5), 3, team='enemy')
+        self.assertEqual(['edge'], [unit.nid for unit in res])
+        res = self.query_engine.get_units_in_area((16, 16), (6, 6))
+        self.assertEqual(['far', 'edge'], [unit.nid for unit in res])
+        # Ties keep the order of the units in the game
+        self.assertEqual(['near', 'tie'], [unit.nid for unit, _ in self.query_engine.get_closest_allies((0, 0), 2)])
+
+        # A unit's own position is what counts, even when it moves without the board knowing
+        units[0].position = (6, 6)
+        units[4].position = (6, 4)
+        res = self.query_engine.get_units_within_distance((6, 5), 3)
+        self.assertEqual(['far', 'edge', 'near', 'tie', 'away'], [unit.nid for unit in res])
+        units[1].team = 'player'
+        units[1].dead = True
+        res = self.query_engine.get_units_within_distance((6, 5), 3, team='enemy')
+        self.assertEqual([], res)
+        self.assertEqual(['far', 'near', 'tie', 'away'], [unit.nid for unit, _ in self.query_engine.get_closest_allies((6, 5), 5)])
+
 if __name__ == '__main__':
     unittest.main()
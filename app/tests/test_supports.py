@@ -0,0 +1,42 @@
+import unittest
+from unittest.mock import MagicMock, patch
+
+from app.data.serialization.versions import CURRENT_SERIALIZATION_VERSION
+
+class SupportControllerTests(unittest.TestCase):
+    def setUp(self):
+        from app.data.database.database import DB
+        DB.load('testing_proj.ltproj', CURRENT_SERIALIZATION_VERSION)
+        self.game = MagicMock()
+        self.patcher = patch('app.engine.supports.game', self.game)
+        self.patcher.start()
+
+    def tearDown(self):
+        self.patcher.stop()
+
+    def test_get_pairs(self):
+        from app.engine.supports import SupportController
+        controller = SupportController()
+        self.assertEqual(['Eirika | Seth', 'Seth | Franz'], [pair.nid for pair in controller.get_pairs('Seth')])
+        self.assertEqual([], controller.get_pairs('Nobody'))
+        self.assertEqual('Seth | Franz', controller.get_prefab('Franz', 'Seth').nid)
+        self.assertIsNone(controller.get_prefab('Eirika', 'Franz'))
+
+        # Only pairs that have been created can give out bonuses
+        self.assertEqual(['Eirika | Seth'], [pair.nid for pair in controller.get_bonus_pairs('Eirika')])
+        self.assertEqual([], controller.get_bonus_pairs('Gilliam'))
+        controller.create_pair('Franz | Gilliam')
+        self.assertEqual(['Franz | Gilliam'], [pair.nid for pair in controller.get_bonus_pairs('Gilliam')])
+
+        # The index survives saving and restoring
+        controller = SupportController.restore(controller.save())
+        self.assertEqual(['Seth | Franz', 'Franz | Gilliam'], [pair.nid for pair in controller.get_bonus_pairs('Franz')])
+
+    def test_get_shared_prefabs(self):
+        from app.engine.supports import SupportController
+        controller = SupportController()
+        shared = controller.get_shared_prefabs({'Franz', 'Gilliam', 'Seth', 'Vanessa'})
+        self.assertEqual(['Seth | Franz', 'Franz | Gilliam'], [prefab.nid for prefab in shared])
+
+if __name__ == '__main__':
+    unittest.main()
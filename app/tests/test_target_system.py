@@ -9,6 +9,7 @@ from app.engine.objects.item import ItemObject
 from app.engine.game_board import GameBoard
 
 from app.engine.target_system import TargetSystem
+from app.engine.utils import ltcache
 from app.tests.mocks.mock_game import get_mock_game
 from app.engine.objects.unit import UnitObject
 
@@ -170,5 +171,26 @@ class TargetSystemUnitTests(unittest.TestCase):
         targets = self.target_system.targets_in_range(self.player_unit, weapon)
         self.assertEqual(len(targets), 0)
 
+    def test_get_strike_partner_candidates(self):
+        """
+        Only adjacent allies with a weapon can be strike partners
+        """
+        lt_cache = ltcache.LT_CACHE
+        ltcache.LT_CACHE = ltcache.LTCache()
+        self.addCleanup(setattr, ltcache, 'LT_CACHE', lt_cache)
+        self.player_unit.position = (1, 1)
+        self.ally_unit.position = (1, 2)
+        self.enemy_unit.position = (2, 1)
+        for unit in (self.player_unit, self.ally_unit, self.enemy_unit):
+            self.game.board.set_unit(unit.position, unit)
+            unit.get_weapon = MagicMock(return_value=None)
+
+        self.assertEqual((), self.target_system.get_strike_partner_candidates(self.player_unit))
+        self.ally_unit.get_weapon.return_value = self.mock_weapon(None, 1, 1)
+        # Candidates are remembered until the game state changes
+        self.assertEqual((), self.target_system.get_strike_partner_candidates(self.player_unit))
+        ltcache.alter_state()
+        self.assertEqual((self.ally_unit, ), self.target_system.get_strike_partner_candidates(self.player_unit))
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,55 @@
+import unittest
+
+from app.engine.game_state import GameState
+from app.engine.objects.unit import UnitObject
+
+class UnitIndexTests(unittest.TestCase):
+    def setUp(self):
+        self.game = GameState()
+        self.units = []
+        for nid, position, team in [('a', (1, 1), 'player'), ('b', (9, 9), 'enemy'), ('c', None, 'player')]:
+            unit = UnitObject(nid)
+            unit.position = position
+            unit.team = team
+            self.units.append(unit)
+            self.game.register_unit(unit)
+        self.index = self.game.unit_index
+
+    def test_follows_positions_and_teams(self):
+        a, b, c = self.units
+        self.assertEqual([a, b], self.index.get_units_in_area(0, 0, 20, 20))
+        self.assertEqual([a, c], self.index.get_team_units('player'))
+        # Moving without the board still updates the index
+        a.position = (30, 30)
+        c.position = (2, 2)
+        self.assertEqual([b, c], self.index.get_units_in_area(0, 0, 20, 20))
+        self.assertEqual([a], self.index.get_units_at((30, 30)))
+        b.team = 'player'
+        self.assertEqual([a, b, c], self.index.get_team_units('player'))
+        self.assertEqual([], self.index.get_team_units('enemy'))
+
+    def test_follows_registry(self):
+        a, b, c = self.units
+        self.game.unregister_unit(b)
+        self.assertEqual([a], self.index.get_units_in_area(0, 0, 20, 20))
+        # Unregistered units no longer update the index
+        b.position = (1, 1)
+        self.assertEqual([a], self.index.get_units_at((1, 1)))
+
+        # A unit registered under an existing nid takes its place in the order
+        new_a = UnitObject('a')
+        new_a.position = (3, 3)
+        self.game.register_unit(new_a)
+        self.assertEqual(self.game.units, self.index.get_team_units('player'))
+        self.assertEqual([new_a], self.index.get_units_in_area(0, 0, 20, 20))
+        a.position = (4, 4)
+        self.assertEqual([new_a], self.index.get_units_in_area(0, 0, 20, 20))
+
+        # Replacing the whole registry rebuilds the index
+        self.game.unit_registry = {b.nid: b}
+        self.assertEqual([b], self.index.get_units_in_area(0, 0, 20, 20))
+        new_a.position = (5, 5)
+        self.assertEqual([b], self.index.get_units_in_area(0, 0, 20, 20))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -66,7 +66,9 @@ def find_and_run_project():
                 main(name)
 
 if __name__ == '__main__':
-    import logging, traceback
+    import logging, multiprocessing, traceback
+    # AI planning workers are spawned from this script, including in frozen builds
+    multiprocessing.freeze_support()
     from app import lt_log
     success = lt_log.create_logger()
     if not success: